@@ -1,6 +1,8 @@
 import datetime
 import time
 
+import numpy
+
 from PyQt5.QtWidgets import QApplication
 from pkg_resources import resource_string
 
@@ -14,12 +16,13 @@ from design.ui.controllers.world_controller import WorldController
 from design.ui.views.vertices_view import VerticesView
 from design.ui.views.world_view import WorldView
 from design.ui.views.painting_view import PaintingView
-from design.vision import constants
-from design.vision.world_utils import calculate_norm
+from design.vision.camera import Camera, format_capture_summary
 from design.vision.world_vision import WorldVision
-from design.vision.exceptions import RobotNotFound, GameMapNotFound, DrawingZoneNotFound, PositionGap
+from design.vision.exceptions import RobotNotFound, GameMapNotFound, DrawingZoneNotFound
+from design.base_station.pose_tracker import PoseTracker
 from design.telemetry.commands import CommandHandler
 from design.telemetry.packets import Packet, PacketType
+from design.utils.tracing import format_summary, tracer
 from PyQt5.QtCore import QTimer
 from collections import deque
 from design.ui.controllers.painting_controller import PaintingController
@@ -37,9 +40,11 @@ class MainStation(QApplication):
                                PacketType.COMMAND: self.handle_command,
                                PacketType.FIGURE_IMAGE: self.handle_figure_image,
                                PacketType.FIGURE_VERTICES: self.handle_figure_vertices,
-                               PacketType.PATH: self.handle_received_path}
-        self.last_robot_information = None
+                               PacketType.PATH: self.handle_received_path,
+                               PacketType.STATISTICS: self.handle_statistics}
+        self.pose_tracker = PoseTracker()
         self.setup_interface()
+        self.restore_static_items()
 
         self.last_time = time.time()
 
@@ -127,13 +132,16 @@ class MainStation(QApplication):
         self.main_controller.update_console_log("ONBOARD IMAGE VERTICES RECEIVED")
         self.vertices_controller.update_path(vertices)
 
+    def handle_statistics(self, statistics: dict):
+        self.main_controller.update_console_log("ROBOT VISION TIMINGS\n{}".format(format_summary(statistics)))
+
     def handle_received_path(self, path: deque):
-        new_path = list(path)
-        path_converted = []
-        for coordinate in new_path:
-            path_converted.append(
-                self.main_vision.converter.get_pixel_coordinates_translated(coordinate[1], coordinate[0], 0))
-        self.world_controller.update_path(path_converted)
+        if not path:
+            return
+        # The robot uses the swapped axes (see `change_axes`)
+        swapped_path = [coordinate[::-1] for coordinate in path]
+        path_converted = self.main_vision.converter.get_pixel_coordinates_translated_array(swapped_path, 0)
+        self.world_controller.update_path([tuple(pixel) for pixel in path_converted.tolist()])
 
     def send_game_map(self):
         game_map_found = False
@@ -142,10 +150,12 @@ class MainStation(QApplication):
                 self.game_map = self.main_vision.get_world_game_map()
                 game_map_found = True
                 self.change_axes()
-                self.main_controller.update_console_log("GAME MAP FOUND \n {}".format(self.game_map))
+                self.main_controller.update_console_log("GAME MAP FOUND IN {} CAPTURES \n {}".format(
+                    self.main_vision.consensus_captures["game_items"], self.game_map))
                 game_map_packet = Packet(packet_type=PacketType.GAME_MAP, packet_data=self.game_map)
                 self.telemetry.put_command(game_map_packet)
                 self.draw_game_map_on_ui()
+                self.log_statistics()
 
             except GameMapNotFound:
                 print("Game map not found")
@@ -183,34 +193,37 @@ class MainStation(QApplication):
 
     def send_robot_position(self):
         try:
-            self.game_map["robot"] = self.main_vision.detect_robot_fast()
-
-            self.evaluate_position_gap([self.game_map["robot"][0], time.time()])
-
-            self.game_map["robot"][0] = self.game_map["robot"][0][::-1]
-            self.game_map["robot"][1] = 90 - self.game_map["robot"][1]
-
-            if self.robot_has_started:
-                information = self.game_map["robot"]
-                information.append(datetime.datetime.now())
-                packet = Packet(packet_type=PacketType.POSITION, packet_data=information)
-                self.telemetry.put_command(packet)
-
-            self.world_controller.update_robot_position([self.main_vision.game_map_pixels["robot"][0]],
-                                                        self.main_vision.game_map_pixels["base_robot"])
-            self.world_controller.update_real_path(self.main_vision.game_map_pixels["base_robot"])
+            position, orientation = self.main_vision.detect_robot_fast()
+            if self.pose_tracker.update(position, orientation, self.main_vision.last_robot_detection_time):
+                self.world_controller.update_robot_position([self.main_vision.game_map_pixels["robot"][0]],
+                                                            self.main_vision.game_map_pixels["base_robot"])
+                self.world_controller.update_real_path(self.main_vision.game_map_pixels["base_robot"])
+            else:
+                print("Robot position rejected")
             self.world_controller.update_world_image(self.main_vision.actual_frame)
 
         except RobotNotFound:
             print("Robot not found")
-            pass
-        except PositionGap:
-            print("Gap")
-            pass
+
+        # The predicted pose is sent even when the detection failed, so one
+        # bad frame does not starve the robot of positions
+        send_time = time.monotonic()
+        if not self.pose_tracker.is_tracking(send_time):
+            return
+        position, orientation, covariance = self.pose_tracker.predict_pose(send_time)
+        self.game_map["robot"] = [position[::-1], 90 - orientation]
+        if self.robot_has_started:
+            information = [self.game_map["robot"][0],
+                           self.game_map["robot"][1],
+                           datetime.datetime.now(),
+                           change_covariance_axes(covariance).tolist()]
+            packet = Packet(packet_type=PacketType.POSITION, packet_data=information)
+            self.telemetry.put_command(packet)
 
     def start_cycle_timer(self):
         self.main_controller.activate_timer()
         self.main_controller.update_console_log("READY TO START NEW CYCLE")
+        self.pose_tracker.reset()
         self.robot_timer.timeout.connect(self.send_robot_position)
         self.robot_timer.setInterval(250)
         if not self.robot_timer.isActive():
@@ -232,6 +245,8 @@ class MainStation(QApplication):
                 try:
                     if self.main_vision.detect_static_items():
                         drawing_zone_found = True
+                        self.main_controller.update_console_log("DRAWING ZONE FOUND IN {} CAPTURES".format(
+                            self.main_vision.consensus_captures["drawing_zone"]))
                     self.draw_game_map_on_ui(True)
                     self.world_view.fit_to_image()
                     self.main_view.ui.detect_static_items_btn.setEnabled(False)
@@ -240,23 +255,32 @@ class MainStation(QApplication):
                     print("DrawingZoneNotFound")
                     continue
 
+    def restore_static_items(self):
+        if self.main_vision.restore_static_items():
+            self.main_controller.update_console_log("STATIC ITEMS RESTORED")
+            self.draw_game_map_on_ui(True)
+            self.world_view.fit_to_image()
+
     def send_new_game_map(self):
         if self.main_model.send_new_game_map_flag:
             self.main_model.send_new_game_map_flag = False
             self.main_controller.update_console_log("SENDING GAME MAP")
             self.send_game_map()
 
-    def evaluate_position_gap(self, new_position: list):
-        if self.last_robot_information:
-            max_gap = constants.ROBOT_SPEED * (abs(new_position[1] - self.last_robot_information[1]))
-            gap = calculate_norm(new_position[0][0],
-                                 new_position[0][1],
-                                 self.last_robot_information[0][0],
-                                 self.last_robot_information[0][1])
-            if gap > max_gap:
-                print("Detected gap {} < {}".format(gap, max_gap))
-                raise PositionGap
-            else:
-                self.last_robot_information = new_position
-        else:
-            self.last_robot_information = new_position
+    def log_statistics(self):
+        statistics = tracer.take_summary()
+        if statistics:
+            self.main_controller.update_console_log("WORLD VISION TIMINGS\n{}".format(format_summary(statistics)))
+        camera = self.main_vision.camera
+        if isinstance(camera, Camera):
+            self.main_controller.update_console_log("WORLD CAMERA CAPTURE\n{}".format(
+                format_capture_summary(camera.summarize_capture())))
+
+
+def change_covariance_axes(covariance):
+    """Return the covariance of the (y, x, 90 - heading) pose sent to the robot
+       from the covariance of the (x, y, heading) pose."""
+    axes_change = numpy.array([[0, 1, 0],
+                               [1, 0, 0],
+                               [0, 0, -1]])
+    return axes_change @ covariance @ axes_change.T
@@ -0,0 +1,130 @@
+import numpy
+
+from typing import Tuple
+
+#: The standard deviations of the robot's accelerations (in cm/s² and °/s²)
+POSITION_ACCELERATION_DEVIATION = 20
+HEADING_ACCELERATION_DEVIATION = 180
+#: The standard deviations of the world camera's measurements (in cm and °)
+POSITION_MEASUREMENT_DEVIATION = 1.5
+HEADING_MEASUREMENT_DEVIATION = 3
+#: The standard deviations of the initial velocities (in cm/s and °/s)
+INITIAL_SPEED_DEVIATION = 15
+INITIAL_ANGULAR_SPEED_DEVIATION = 45
+#: The squared Mahalanobis distance above which a measurement is rejected
+#: (the 99.9 % quantile of the chi-squared distribution with 3 degrees of
+#: freedom)
+INNOVATION_GATE = 16.27
+#: The consecutive rejections after which the tracker restarts on the next
+#: measurement, since the robot was probably moved
+MAXIMUM_CONSECUTIVE_REJECTIONS = 4
+#: The time (in seconds) after the last accepted measurement during which
+#: the pose is still predicted
+MAXIMUM_PREDICTION_TIME = 1.0
+
+
+class PoseTracker:
+    """Constant velocity Kalman filter of the robot's pose.
+
+    The state is (x, y, heading) and their velocities, the positions in
+    centimeters and the heading in degrees. The measurements whose innovation
+    is too unlikely are rejected instead of corrupting the state.
+    """
+
+    def __init__(self) -> None:
+        self.state = None
+        self.covariance = None
+        self.timestamp = None
+        self.consecutive_rejections = 0
+        self.measurement_matrix = numpy.hstack((numpy.eye(3), numpy.zeros((3, 3))))
+        self.measurement_covariance = numpy.diag([POSITION_MEASUREMENT_DEVIATION ** 2,
+                                                  POSITION_MEASUREMENT_DEVIATION ** 2,
+                                                  HEADING_MEASUREMENT_DEVIATION ** 2])
+
+    @property
+    def is_initialized(self) -> bool:
+        return self.state is not None
+
+    def is_tracking(self, timestamp: float) -> bool:
+        """Return whether the pose can still be predicted at the given time."""
+        return self.is_initialized and timestamp - self.timestamp <= MAXIMUM_PREDICTION_TIME
+
+    def reset(self):
+        self.state = None
+        self.covariance = None
+        self.timestamp = None
+        self.consecutive_rejections = 0
+
+    def update(self, position: Tuple[float, float], heading: float, timestamp: float) -> bool:
+        """Correct the state with a measured pose.
+
+        :param position: The measured (x, y) position
+        :param heading: The measured heading
+        :param timestamp: The monotonic time of the measurement
+        :returns: Whether the measurement was accepted
+        """
+        measurement = numpy.array([position[0], position[1], heading], dtype=float)
+        if not self.is_initialized or self.consecutive_rejections >= MAXIMUM_CONSECUTIVE_REJECTIONS:
+            self._initialize(measurement, timestamp)
+            return True
+
+        state, covariance = self.predict(max(timestamp, self.timestamp))
+        innovation = measurement - self.measurement_matrix @ state
+        innovation[2] = wrap_angle(innovation[2])
+        innovation_covariance = self.measurement_matrix @ covariance @ self.measurement_matrix.T + \
+            self.measurement_covariance
+        if innovation @ numpy.linalg.solve(innovation_covariance, innovation) > INNOVATION_GATE:
+            self.consecutive_rejections += 1
+            return False
+
+        gain = covariance @ self.measurement_matrix.T @ numpy.linalg.inv(innovation_covariance)
+        self.state = state + gain @ innovation
+        # Keep the heading in the measurements' range of angles
+        self.state[2] = heading + wrap_angle(self.state[2] - heading)
+        self.covariance = (numpy.eye(6) - gain @ self.measurement_matrix) @ covariance
+        self.timestamp = max(timestamp, self.timestamp)
+        self.consecutive_rejections = 0
+        return True
+
+    def predict(self, timestamp: float) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the state and its covariance extrapolated to the given time
+           (the tracker is not modified)."""
+        elapsed_time = timestamp - self.timestamp
+        transition = numpy.eye(6)
+        transition[:3, 3:] = elapsed_time * numpy.eye(3)
+        state = transition @ self.state
+        covariance = transition @ self.covariance @ transition.T + calculate_process_covariance(elapsed_time)
+        return state, covariance
+
+    def predict_pose(self, timestamp: float) -> Tuple[Tuple[float, float], float, numpy.ndarray]:
+        """Return the (x, y) position, the heading and their 3x3 covariance
+           at the given time."""
+        state, covariance = self.predict(timestamp)
+        return (float(state[0]), float(state[1])), float(state[2]), covariance[:3, :3]
+
+    def _initialize(self, measurement: numpy.ndarray, timestamp: float):
+        self.state = numpy.concatenate((measurement, numpy.zeros(3)))
+        self.covariance = numpy.diag(numpy.concatenate((numpy.diag(self.measurement_covariance),
+                                                        [INITIAL_SPEED_DEVIATION ** 2,
+                                                         INITIAL_SPEED_DEVIATION ** 2,
+                                                         INITIAL_ANGULAR_SPEED_DEVIATION ** 2])))
+        self.timestamp = timestamp
+        self.consecutive_rejections = 0
+
+
+def calculate_process_covariance(elapsed_time: float) -> numpy.ndarray:
+    """Return the covariance that random accelerations add to the state
+       during the elapsed time."""
+    variances = numpy.array([POSITION_ACCELERATION_DEVIATION ** 2,
+                             POSITION_ACCELERATION_DEVIATION ** 2,
+                             HEADING_ACCELERATION_DEVIATION ** 2])
+    covariance = numpy.zeros((6, 6))
+    covariance[:3, :3] = numpy.diag(variances * elapsed_time ** 4 / 4)
+    covariance[:3, 3:] = covariance[3:, :3] = numpy.diag(variances * elapsed_time ** 3 / 2)
+    covariance[3:, 3:] = numpy.diag(variances * elapsed_time ** 2)
+    return covariance
+
+
+def wrap_angle(angle: float) -> float:
+    """Return the equivalent angle within [-180, 180[ degrees."""
+    return (angle + 180) % 360 - 180
@@ -7,6 +7,7 @@ from design.pathfinding.pathfinder import Pathfinder
 from design.pathfinding.antenna_information import AntennaInformation
 from design.pathfinding.servo_wheels_manager import ServoWheelsManager
 from design.telemetry.packets import PacketType, Packet
+from design.utils.tracing import format_summary, tracer
 
 
 class Brain():
@@ -63,11 +64,21 @@ class Brain():
                     elif isinstance(exit_telemetry, Packet):
                         self.base_station.put_command(exit_telemetry)
 
+                self.report_statistics()
+
                 if self.current_status == Step.STANBY:
                     self.base_station.put_command(ready_packet)
                     main_sequence_has_started = False
                     self.reinitialize_for_next_cycle()
 
+    def report_statistics(self):
+        """Log the traced stages' durations and send them to the base
+           station when stages were traced since the last report."""
+        statistics = tracer.take_summary()
+        if statistics:
+            self.logger.log("Statistics:\n{0}".format(format_summary(statistics)))
+            self.base_station.put_command(Packet(PacketType.STATISTICS, statistics))
+
     def reinitialize_for_next_cycle(self):
         self.logger.log("Reinitializing for next cycle")
         self.pathfinder.reinitialize()
@@ -15,6 +15,7 @@ class PacketType(Enum):
     GAME_MAP = 5
     COMMAND = 6
     NOTIFICATION = 7
+    STATISTICS = 8
 
 
 class Packet:
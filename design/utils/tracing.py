@@ -0,0 +1,165 @@
+"""Measure the time spent in the stages of the vision pipelines.
+
+The durations are recorded in fixed-size histograms, so tracing a long run
+does not grow the memory. The tracing is off by default: a disabled stage
+is a shared no-op context manager and a disabled traced function is called
+directly.
+"""
+import time
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+from typing import Dict, Optional
+
+import numpy
+
+#: The shortest and the longest measured durations (in seconds)
+HISTOGRAM_MINIMUM_DURATION = 1e-5
+HISTOGRAM_MAXIMUM_DURATION = 100
+HISTOGRAM_BINS_PER_DECADE = 10
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+class DurationHistogram:
+    """Logarithmic histogram of durations.
+
+    The percentiles are the upper bounds of the bins where they fall, so
+    they are accurate to a bin's width (about 25 % of the duration).
+    """
+
+    def __init__(self) -> None:
+        decades = numpy.log10(HISTOGRAM_MAXIMUM_DURATION / HISTOGRAM_MINIMUM_DURATION)
+        self.bounds = numpy.logspace(numpy.log10(HISTOGRAM_MINIMUM_DURATION),
+                                     numpy.log10(HISTOGRAM_MAXIMUM_DURATION),
+                                     int(decades * HISTOGRAM_BINS_PER_DECADE) + 1).tolist()
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, duration: float):
+        self.counts[bisect_left(self.bounds, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.maximum = max(self.maximum, duration)
+
+    def calculate_percentile(self, percentile: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = percentile / 100 * self.count
+        cumulative_count = 0
+        for index, count in enumerate(self.counts):
+            cumulative_count += count
+            if cumulative_count >= rank:
+                break
+        upper_bound = self.bounds[index] if index < len(self.bounds) else self.maximum
+        return min(upper_bound, self.maximum)
+
+    def summarize(self) -> Dict[str, float]:
+        """Return the count and the mean, percentiles and maximum durations
+           (in milliseconds)."""
+        summary = {'count': self.count,
+                   'mean_ms': 1000 * self.total / self.count if self.count else 0.0,
+                   'max_ms': 1000 * self.maximum}
+        for percentile in SUMMARY_PERCENTILES:
+            summary['p{0}_ms'.format(percentile)] = 1000 * self.calculate_percentile(percentile)
+        return summary
+
+
+class _Stage:
+    def __init__(self, tracer: 'Tracer', name: str) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.start_time = None
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.tracer.record(self.name, time.perf_counter() - self.start_time)
+
+
+class _DisabledStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        pass
+
+
+_DISABLED_STAGE = _DisabledStage()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.histograms = {}
+        self._has_new_records = False
+        self._lock = Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def stage(self, name: str):
+        """Return a context manager measuring the duration of its block.
+
+        :param name: The name of the stage
+        """
+        if not self.enabled:
+            return _DISABLED_STAGE
+        return _Stage(self, name)
+
+    def traced(self, function):
+        """Decorate a function to measure the duration of its calls (named
+           after its qualified name)."""
+        name = function.__qualname__
+
+        @wraps(function)
+        def traced_function(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            with _Stage(self, name):
+                return function(*args, **kwargs)
+
+        return traced_function
+
+    def record(self, name: str, duration: float):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = DurationHistogram()
+            self.histograms[name].record(duration)
+            self._has_new_records = True
+
+    def summarize(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: histogram.summarize() for name, histogram in self.histograms.items()}
+
+    def take_summary(self) -> Optional[Dict[str, Dict[str, float]]]:
+        """Return the summary when stages were recorded since the last taken
+           summary, otherwise ``None``."""
+        with self._lock:
+            if not self._has_new_records:
+                return None
+            self._has_new_records = False
+        return self.summarize()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self._has_new_records = False
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    """Return one line per stage of a :meth:`Tracer.summarize` summary."""
+    return '\n'.join('{0}: {1[count]} calls, mean {1[mean_ms]:.1f} ms, p50 {1[p50_ms]:.1f} ms, '
+                     'p95 {1[p95_ms]:.1f} ms, p99 {1[p99_ms]:.1f} ms, max {1[max_ms]:.1f} ms'.format(name, stage)
+                     for name, stage in sorted(summary.items()))
+
+
+#: The tracer of the process
+tracer = Tracer()
+traced = tracer.traced
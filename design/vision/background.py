@@ -0,0 +1,122 @@
+import cv2
+import numpy
+
+from typing import List
+
+from design.vision.blobs import find_blobs
+from design.vision.change_detection import Window, merge_windows
+from design.vision.constants import (BACKGROUND_PYRAMID_LEVEL,
+                                     BACKGROUND_THRESHOLD,
+                                     BACKGROUND_MINIMAL_AREA,
+                                     BACKGROUND_WINDOW_MARGIN,
+                                     BACKGROUND_MAXIMAL_CANDIDATES)
+from design.vision.frame import Frame
+
+
+class BackgroundModel:
+    """Running median of the gray table without its moving objects.
+
+    Each update moves the background one gray level towards the capture (the
+    approximate median filter), so an object crossing the table barely
+    affects it while lighting changes are followed. The model is kept at a
+    pyramid level since only the objects' blobs are needed. The regions
+    hidden by objects when the model is learned are not part of the
+    background until an update sees them uncovered.
+    """
+
+    def __init__(self, pyramid_level: int = BACKGROUND_PYRAMID_LEVEL) -> None:
+        self.pyramid_level = pyramid_level
+        self.background = None
+        self.unlearned = None
+        self.offset = None
+        self.shape = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.background is not None
+
+    def reset(self):
+        self.background = None
+        self.unlearned = None
+        self.offset = None
+        self.shape = None
+
+    def is_made_for(self, frame: Frame) -> bool:
+        """Return whether the frame covers the region of the model."""
+        return self.is_ready and (frame.offset, frame.shape) == (self.offset, self.shape)
+
+    def learn(self, frame: Frame, ignored_windows=()):
+        """Start the model from a frame.
+
+        :param frame: A frame of the model's region
+        :param ignored_windows: The (left, top, right, bottom) windows of the
+                                objects on the table (in capture
+                                coordinates), learned by the later updates
+        """
+        self.background = self._get_gray(frame).copy()
+        self.offset = frame.offset
+        self.shape = frame.shape
+        self.unlearned = numpy.zeros(self.background.shape, bool)
+        for left, top, right, bottom in ignored_windows:
+            left, top, right, bottom = self._scale_window((left, top, right, bottom))
+            self.unlearned[top:bottom, left:right] = True
+
+    def update(self, frame: Frame, ignored_windows=()):
+        """Move the background towards the frame.
+
+        :param frame: A frame of the model's region
+        :param ignored_windows: The (left, top, right, bottom) windows of the
+                                moving objects (in capture coordinates), where
+                                the background is kept
+        """
+        gray = self._get_gray(frame)
+        brighter = numpy.greater(gray, self.background).view(numpy.uint8)
+        darker = numpy.less(gray, self.background).view(numpy.uint8)
+        ignored = numpy.zeros(gray.shape, bool)
+        for left, top, right, bottom in ignored_windows:
+            left, top, right, bottom = self._scale_window((left, top, right, bottom))
+            ignored[top:bottom, left:right] = True
+        brighter[ignored] = 0
+        darker[ignored] = 0
+        self.background += brighter
+        self.background -= darker
+
+        if self.unlearned.any():
+            uncovered = self.unlearned & ~ignored
+            self.background[uncovered] = gray[uncovered]
+            self.unlearned &= ignored
+
+    def find_foreground_windows(self, frame: Frame) -> List[Window]:
+        """Return the windows around the largest objects that are not part of
+           the background.
+
+        :param frame: A frame of the model's region
+        :returns: The (left, top, right, bottom) windows (in capture
+                  coordinates)
+        """
+        difference = cv2.absdiff(self._get_gray(frame), self.background)
+        _, foreground = cv2.threshold(difference, BACKGROUND_THRESHOLD, 255, cv2.THRESH_BINARY)
+        foreground[self.unlearned] = 0
+        foreground = cv2.morphologyEx(foreground, cv2.MORPH_OPEN, numpy.ones((3, 3), numpy.uint8))
+        blobs = find_blobs(foreground).filter_by_area(BACKGROUND_MINIMAL_AREA)
+        order = numpy.argsort(-blobs.areas, kind='stable')[:BACKGROUND_MAXIMAL_CANDIDATES]
+
+        scale = 2 ** self.pyramid_level
+        offset_x, offset_y = self.offset
+        windows = []
+        for left, top, width, height in blobs.boxes[order].tolist():
+            windows.append((left * scale + offset_x - BACKGROUND_WINDOW_MARGIN,
+                            top * scale + offset_y - BACKGROUND_WINDOW_MARGIN,
+                            (left + width) * scale + offset_x + BACKGROUND_WINDOW_MARGIN,
+                            (top + height) * scale + offset_y + BACKGROUND_WINDOW_MARGIN))
+        return merge_windows(windows)
+
+    def _get_gray(self, frame: Frame) -> numpy.ndarray:
+        return cv2.cvtColor(frame.get_pyramid_image(self.pyramid_level), cv2.COLOR_BGR2GRAY)
+
+    def _scale_window(self, window: Window) -> Window:
+        scale = 2 ** self.pyramid_level
+        offset_x, offset_y = self.offset
+        left, top, right, bottom = window
+        return (max((left - offset_x) // scale, 0), max((top - offset_y) // scale, 0),
+                max(-(-(right - offset_x) // scale), 0), max(-(-(bottom - offset_y) // scale), 0))
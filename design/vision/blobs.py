@@ -0,0 +1,56 @@
+import math
+
+import cv2
+import numpy
+
+from typing import Tuple
+
+
+class Blobs:
+    """The connected components of a binary image.
+
+    Every attribute holds one row per blob, so the filters select the blobs
+    with array operations instead of looping over them.
+    """
+
+    def __init__(self, centroids: numpy.ndarray, areas: numpy.ndarray, boxes: numpy.ndarray) -> None:
+        #: The (x, y) center of mass of the blobs' pixels
+        self.centroids = centroids
+        #: The number of pixels of the blobs
+        self.areas = areas
+        #: The (left, top, width, height) bounding boxes of the blobs
+        self.boxes = boxes
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    @property
+    def radii(self) -> numpy.ndarray:
+        """Half the longest side of the bounding boxes, measured between the
+           centers of the extreme pixels like ``cv2.minEnclosingCircle``."""
+        return (self.boxes[:, 2:].max(axis=1) - 1) / 2
+
+    def select(self, mask: numpy.ndarray) -> 'Blobs':
+        return Blobs(self.centroids[mask], self.areas[mask], self.boxes[mask])
+
+    def filter_by_area(self, minimum: float = 0, maximum: float = math.inf) -> 'Blobs':
+        return self.select((minimum < self.areas) & (self.areas < maximum))
+
+    def filter_by_radius(self, minimum: float = 0, maximum: float = math.inf) -> 'Blobs':
+        radii = self.radii
+        return self.select((minimum < radii) & (radii < maximum))
+
+
+def find_blobs(binary_image: numpy.ndarray, offset: Tuple[int, int] = (0, 0), connectivity: int = 8) -> Blobs:
+    """Find the connected components of the non zero pixels of the image.
+
+    :param binary_image: The single channel image to label
+    :param offset: The position of the image's top left pixel, added to the
+                   blobs' coordinates
+    :param connectivity: The connectivity (4 or 8) of the blobs' pixels
+    :returns: The blobs (without the background)
+    """
+    _, _, stats, centroids = cv2.connectedComponentsWithStats(binary_image, connectivity=connectivity)
+    boxes = stats[1:, :cv2.CC_STAT_AREA].copy()
+    boxes[:, :2] += offset
+    return Blobs(centroids[1:] + offset, stats[1:, cv2.CC_STAT_AREA], boxes)
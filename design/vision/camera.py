@@ -1,18 +1,63 @@
 import cv2
+import numpy
 
-from typing import Any, Iterator
-from subprocess import call
+import time
+from threading import Condition, Event, Lock, Thread
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from design.utils.tracing import DurationHistogram
+from design.vision.frame_store import FrameStoreWriter
+
+DEFAULT_FRAME_BUFFER_SIZE = 16
+#: The maximum time (in seconds) to wait for a frame from the capture thread
+FRAME_TIMEOUT = 2.0
+#: The time (in seconds) the capture thread waits after a failed read
+CAPTURE_RETRY_DELAY = 0.01
+#: The consecutive failed reads after which the capture thread stops
+MAXIMUM_CAPTURE_FAILURES = 100
+#: The settings' controls of the device and their capture properties
+DEVICE_CONTROLS = (('brightness', cv2.CAP_PROP_BRIGHTNESS),
+                   ('contrast', cv2.CAP_PROP_CONTRAST),
+                   ('saturation', cv2.CAP_PROP_SATURATION),
+                   ('gain', cv2.CAP_PROP_GAIN),
+                   ('exposure', cv2.CAP_PROP_EXPOSURE),
+                   ('white_balance_temperature', cv2.CAP_PROP_WB_TEMPERATURE))
+
+#: The controls last applied to the device of every port, since the device
+#: keeps them between the openings of the camera
+_applied_device_controls = {}
 
 
 class Camera:
+    """A camera, optionally capturing in a thread.
+
+    :param recording_directory: Where the captured frames are recorded for a
+                                :class:`design.vision.replay.ReplayCamera`
+                                (not recorded when ``None``)
+    """
+
     def __init__(self,
                  port: int,
                  settings: 'CameraSettings',
-                 manual_configuration: bool = False) -> None:
+                 manual_configuration: bool = False,
+                 threaded_capture: bool = False,
+                 frame_buffer_size: int = DEFAULT_FRAME_BUFFER_SIZE,
+                 recording_directory: str = None) -> None:
         self.camera = None
         self.manual_configuration = manual_configuration
         self.port = port
         self.settings = settings
+        self.threaded_capture = threaded_capture
+        self.frame_buffer_size = frame_buffer_size
+        self.frame_buffer = None
+        self._capture_thread = None
+        self._stop_capture = Event()
+        self.recording_directory = recording_directory
+        self.recorder = None
+        #: The capture format the device accepted (see
+        #: :meth:`read_capture_format`)
+        self.capture_format = None
+        self.capture_statistics = CaptureStatistics()
 
     def __enter__(self) -> 'Camera':
         self.open()
@@ -21,50 +66,174 @@ class Camera:
     def open(self):
         self.camera = cv2.VideoCapture(self.port)
         self.set_camera_settings()
+        self.capture_format = self.read_capture_format()
+        self.capture_statistics.reset()
+        if self.recording_directory:
+            self.recorder = FrameStoreWriter(self.recording_directory)
+        if self.threaded_capture:
+            self.start_capture_thread()
 
     def __exit__(self, exception_type, exception_value, exception_traceback):
+        if exception_type is not None:
+            self._forget_device_controls()
         self.close()
 
     def close(self):
-        self.camera.release()
+        try:
+            self.stop_capture_thread()
+            if not self.camera.isOpened():
+                # The device was lost (or never opened) and may have reset
+                # its controls
+                self._forget_device_controls()
+            self.camera.release()
+        except Exception:
+            self._forget_device_controls()
+            raise
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def start_capture_thread(self):
+        self.frame_buffer = FrameRingBuffer(self.frame_buffer_size)
+        self._stop_capture.clear()
+        self._capture_thread = Thread(target=self._capture_frames, daemon=True)
+        self._capture_thread.start()
+
+    def stop_capture_thread(self):
+        if self._capture_thread:
+            self._stop_capture.set()
+            self._capture_thread.join()
+            self._capture_thread = None
+
+    def _capture_frames(self):
+        frame = None
+        failures = 0
+        while not self._stop_capture.is_set() and self.camera.isOpened():
+            grab_start = time.monotonic()
+            picture_taken, picture = self.camera.read(frame)
+            if picture_taken:
+                failures = 0
+                timestamp = time.monotonic()
+                self.capture_statistics.record(timestamp - grab_start, timestamp)
+                self._record(picture, timestamp)
+                frame = self.frame_buffer.put(picture, timestamp)
+            else:
+                # An opened device may fail to read without blocking (e.g.
+                # once unplugged), so the thread backs off and then gives up
+                failures += 1
+                if failures >= MAXIMUM_CAPTURE_FAILURES:
+                    break
+                self._stop_capture.wait(CAPTURE_RETRY_DELAY)
 
     def take_pictures(self, pictures_number: int) -> Iterator[Any]:
-        if self.camera and self.camera.isOpened():
+        if self.frame_buffer:
+            yield from self.take_fresh_pictures(pictures_number)
+        elif self.camera and self.camera.isOpened():
             for _ in range(pictures_number):
                 yield from self.take_picture()
 
     def stream_pictures(self) -> Iterator[Any]:
-        while self.camera and self.camera.isOpened():
+        while self.camera and self.camera.isOpened() and (not self.frame_buffer or self.is_capturing()):
             yield from self.take_picture()
 
+    def is_capturing(self) -> bool:
+        """Return whether the capture thread still fills the frame buffer."""
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
     def take_picture(self):
-        picture_taken, picture = self.camera.read()
-        if picture_taken:
+        if self.frame_buffer:
+            # The buffer keeps the frames of a stopped capture thread, which
+            # would show a frozen scene
+            if not self.is_capturing():
+                return
+            _, picture = self.frame_buffer.get_latest_frame(FRAME_TIMEOUT, max_age=FRAME_TIMEOUT)
+            if picture is not None:
+                yield picture
+        else:
+            grab_start = time.monotonic()
+            picture_taken, picture = self.camera.read()
+            if picture_taken:
+                timestamp = time.monotonic()
+                self.capture_statistics.record(timestamp - grab_start, timestamp)
+                self._record(picture, timestamp)
+                yield picture
+
+    def take_fresh_pictures(self, pictures_number: int) -> Iterator[Any]:
+        """Yield the next pictures captured after this call.
+
+        :param pictures_number: The number of pictures to yield
+        """
+        last_timestamp = time.monotonic()
+        for _ in range(pictures_number):
+            if not self.is_capturing():
+                return
+            timestamp, picture = self.frame_buffer.wait_for_frame_newer_than(last_timestamp, FRAME_TIMEOUT)
+            if picture is None:
+                return
+            last_timestamp = timestamp
             yield picture
 
+    def get_latest_picture(self) -> Tuple[float, Optional[numpy.ndarray]]:
+        return self.frame_buffer.get_latest_frame()
+
+    def get_pictures_newer_than(self, timestamp: float) -> List[Tuple[float, numpy.ndarray]]:
+        return self.frame_buffer.get_frames_newer_than(timestamp)
+
+    def _record(self, picture: numpy.ndarray, timestamp: float):
+        if self.recorder:
+            self.recorder.write(picture, timestamp)
+
     def set_camera_settings(self):
+        # The pixel format must be chosen before the resolution, which
+        # depends on it
+        if self.settings.fourcc:
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.settings.fourcc))
         self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.settings.width)
         self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.settings.height)
+        if self.settings.fps:
+            self.camera.set(cv2.CAP_PROP_FPS, self.settings.fps)
+        if self.settings.buffer_size:
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, self.settings.buffer_size)
         if self.manual_configuration:
             self.camera.set(cv2.CAP_PROP_SETTINGS, True)
         else:
-            self._set_camera_settings()
-
-    def _set_camera_settings(self):
-        program_string = ('uvcdynctrl -s '
-                          '\'Brightness\' {0} '
-                          '\'Contrast\' {1} '
-                          '\'Saturation\' {2} '
-                          '\'Gain\' {3} '
-                          '\'Exposure (Absolute)\' {4} '
-                          '\'White Balance Temperature\' {5}').format(
-            self.settings.brightness,
-            self.settings.contrast,
-            self.settings.saturation,
-            self.settings.gain,
-            self.settings.exposure,
-            self.settings.white_balance_temperature)
-        call(program_string, shell=True)
+            self._set_device_controls()
+
+    def _set_device_controls(self):
+        """Apply the settings' controls to the device, unless they were the
+           last ones applied to it."""
+        controls = tuple(getattr(self.settings, name) for name, _ in DEVICE_CONTROLS)
+        if _applied_device_controls.get(self.port) == controls:
+            return
+        controls_applied = [self.camera.set(capture_property, value)
+                            for (_, capture_property), value in zip(DEVICE_CONTROLS, controls)]
+        # A control the device rejected is applied again at the next opening
+        if all(controls_applied) and self.camera.isOpened():
+            _applied_device_controls[self.port] = controls
+        else:
+            self._forget_device_controls()
+
+    def _forget_device_controls(self):
+        """Make the next opening apply the controls, since the device's
+           ones are unknown."""
+        _applied_device_controls.pop(self.port, None)
+
+    def read_capture_format(self) -> Dict[str, Any]:
+        """Return the format the device actually captures, which may differ
+           from the requested one."""
+        fourcc = int(self.camera.get(cv2.CAP_PROP_FOURCC))
+        return {'fourcc': ''.join(chr((fourcc >> shift) & 0xFF) for shift in (0, 8, 16, 24)),
+                'width': int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                'height': int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                'fps': self.camera.get(cv2.CAP_PROP_FPS),
+                'buffer_size': int(self.camera.get(cv2.CAP_PROP_BUFFERSIZE))}
+
+    def summarize_capture(self) -> Dict[str, Any]:
+        """Return the capture format and the frame rate and grab latency
+           measured since the camera was opened."""
+        summary = dict(self.capture_format or {})
+        summary.update(self.capture_statistics.summarize())
+        return summary
 
 
 class CameraSettings:
@@ -77,3 +246,123 @@ class CameraSettings:
         self.white_balance_temperature = kwargs.get('white_balance_temperature', 4000)
         self.width = kwargs.get('width', 640)
         self.height = kwargs.get('height', 480)
+        #: The four characters code of the pixel format (e.g. ``'MJPG'`` or
+        #: ``'YUYV'``, the device's default when ``None``)
+        self.fourcc = kwargs.get('fourcc', None)
+        #: The frames queued by the driver (its default when ``None``)
+        self.buffer_size = kwargs.get('buffer_size', None)
+        #: The requested frame rate (the device's default when ``None``)
+        self.fps = kwargs.get('fps', None)
+
+
+class CaptureStatistics:
+    """The frame rate and the grab latency (the time spent reading a frame)
+       measured on the captured frames."""
+
+    def __init__(self) -> None:
+        self.grab_durations = DurationHistogram()
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self._lock = Lock()
+
+    def record(self, grab_duration: float, timestamp: float):
+        with self._lock:
+            self.grab_durations.record(grab_duration)
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            self.last_timestamp = timestamp
+
+    @property
+    def frames_per_second(self) -> float:
+        if self.grab_durations.count < 2 or self.last_timestamp == self.first_timestamp:
+            return 0.0
+        return (self.grab_durations.count - 1) / (self.last_timestamp - self.first_timestamp)
+
+    def summarize(self) -> Dict[str, Any]:
+        """Return the frames count, the measured frame rate and the grab
+           latency's summary (see :meth:`DurationHistogram.summarize`)."""
+        with self._lock:
+            return {'frames': self.grab_durations.count,
+                    'measured_fps': self.frames_per_second,
+                    'grab_latency': self.grab_durations.summarize()}
+
+    def reset(self):
+        with self._lock:
+            self.grab_durations = DurationHistogram()
+            self.first_timestamp = None
+            self.last_timestamp = None
+
+
+def format_capture_summary(summary: Dict[str, Any]) -> str:
+    """Return a line describing a :meth:`Camera.summarize_capture` summary."""
+    line = '{0[frames]} frames at {0[measured_fps]:.1f} fps, grab latency mean {1[mean_ms]:.1f} ms, ' \
+           'p95 {1[p95_ms]:.1f} ms'.format(summary, summary['grab_latency'])
+    if 'fourcc' in summary:
+        line = '{0[fourcc]} {0[width]}x{0[height]} at {0[fps]:g} fps (buffer of {0[buffer_size]}): '.format(
+            summary) + line
+    return line
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of frames filled by a capture thread.
+
+    The frames are allocated once: the producer reads into a spare frame that
+    is swapped with the oldest slot, so no frame is allocated per capture.
+    The consumers get copies since the slots are recycled.
+    """
+
+    def __init__(self, size: int = DEFAULT_FRAME_BUFFER_SIZE) -> None:
+        self.size = size
+        self.frames = [None] * size
+        self.timestamps = numpy.full(size, -numpy.inf)
+        self.frames_count = 0
+        self._condition = Condition()
+
+    def put(self, frame: numpy.ndarray, timestamp: float) -> Optional[numpy.ndarray]:
+        """Store the frame in the oldest slot.
+
+        :param frame: The captured frame
+        :param timestamp: The monotonic capture time of the frame
+        :returns: The recycled frame in which the next capture can be read
+                  (``None`` until the ring is full)
+        """
+        with self._condition:
+            index = self.frames_count % self.size
+            recycled_frame = self.frames[index]
+            self.frames[index] = frame
+            self.timestamps[index] = timestamp
+            self.frames_count += 1
+            self._condition.notify_all()
+        return recycled_frame
+
+    def get_latest_frame(self,
+                         timeout: float = 0,
+                         max_age: float = numpy.inf) -> Tuple[float, Optional[numpy.ndarray]]:
+        """Return the latest frame, waiting for one if it is missing.
+
+        :param timeout: The maximum time (in seconds) to wait
+        :param max_age: The maximum time (in seconds) since the frame was
+                        captured
+        """
+        return self.wait_for_frame_newer_than(time.monotonic() - max_age, timeout)
+
+    def wait_for_frame_newer_than(self,
+                                  timestamp: float,
+                                  timeout: float = 0) -> Tuple[float, Optional[numpy.ndarray]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._get_latest_timestamp() > timestamp, timeout)
+            if self._get_latest_timestamp() <= timestamp:
+                return timestamp, None
+            index = (self.frames_count - 1) % self.size
+            return self.timestamps[index], self.frames[index].copy()
+
+    def get_frames_newer_than(self, timestamp: float) -> List[Tuple[float, numpy.ndarray]]:
+        with self._condition:
+            return [(self.timestamps[index], self.frames[index].copy())
+                    for index in numpy.argsort(self.timestamps)
+                    if self.timestamps[index] > timestamp]
+
+    def _get_latest_timestamp(self) -> float:
+        if not self.frames_count:
+            return -numpy.inf
+        return self.timestamps[(self.frames_count - 1) % self.size]
@@ -0,0 +1,83 @@
+import cv2
+import numpy
+
+from typing import List, Tuple
+
+from design.vision.blobs import find_blobs
+from design.vision.constants import (CHANGE_DETECTION_THRESHOLD,
+                                     CHANGE_DETECTION_MINIMAL_AREA,
+                                     CHANGE_DETECTION_MAXIMAL_FRACTION)
+from design.vision.exceptions import SceneChanged
+
+Window = Tuple[int, int, int, int]
+
+
+def find_changed_regions(reference_gray: numpy.ndarray,
+                         gray: numpy.ndarray,
+                         offset: Tuple[int, int] = (0, 0),
+                         ignored_windows=()) -> List[Window]:
+    """Find the regions where a gray image differs from a reference.
+
+    :param reference_gray: The reference image
+    :param gray: The image to compare, of the reference's shape
+    :param offset: The position of the images' top left pixel in the capture
+    :param ignored_windows: The (left, top, right, bottom) windows where the
+                            changes are ignored (in capture coordinates)
+    :returns: The (left, top, right, bottom) bounding boxes of the changes
+              (in capture coordinates)
+    :raises SceneChanged: When too much of the image changed for the changes
+                          to be local
+    """
+    if reference_gray.shape != gray.shape:
+        raise SceneChanged('The images do not cover the same region')
+
+    difference = cv2.absdiff(cv2.GaussianBlur(reference_gray, (5, 5), 0), cv2.GaussianBlur(gray, (5, 5), 0))
+    _, changes = cv2.threshold(difference, CHANGE_DETECTION_THRESHOLD, 255, cv2.THRESH_BINARY)
+    offset_x, offset_y = offset
+    for left, top, right, bottom in ignored_windows:
+        changes[max(top - offset_y, 0):max(bottom - offset_y, 0), max(left - offset_x, 0):max(right - offset_x, 0)] = 0
+
+    if numpy.count_nonzero(changes) > CHANGE_DETECTION_MAXIMAL_FRACTION * changes.size:
+        raise SceneChanged('Too much of the image changed')
+
+    # Join the parts of a same change that the threshold split
+    changes = cv2.dilate(changes, numpy.ones((9, 9), numpy.uint8))
+    blobs = find_blobs(changes, offset).filter_by_area(CHANGE_DETECTION_MINIMAL_AREA)
+    return [(left, top, left + width, top + height) for left, top, width, height in blobs.boxes.tolist()]
+
+
+def calculate_points_window(points, margin: int) -> Window:
+    """Return the bounding box of the points grown by the margin."""
+    points = numpy.asarray(points).reshape(-1, 2)
+    left, top = points.min(axis=0) - margin
+    right, bottom = points.max(axis=0) + margin
+    return int(left), int(top), int(right), int(bottom)
+
+
+def are_windows_overlapping(window1: Window, window2: Window) -> bool:
+    left1, top1, right1, bottom1 = window1
+    left2, top2, right2, bottom2 = window2
+    return left1 < right2 and left2 < right1 and top1 < bottom2 and top2 < bottom1
+
+
+def is_point_in_window(point, window: Window) -> bool:
+    x, y = point
+    left, top, right, bottom = window
+    return left <= x < right and top <= y < bottom
+
+
+def merge_windows(windows: List[Window]) -> List[Window]:
+    """Replace the overlapping windows by their bounding box."""
+    merged_windows = []
+    for window in windows:
+        overlapping_windows = [window]
+        while overlapping_windows:
+            for other in overlapping_windows[1:]:
+                merged_windows.remove(other)
+            corners = numpy.array(overlapping_windows)
+            window = (*corners[:, :2].min(axis=0).tolist(), *corners[:, 2:].max(axis=0).tolist())
+            overlapping_windows = [other for other in merged_windows if are_windows_overlapping(window, other)]
+            if overlapping_windows:
+                overlapping_windows.insert(0, window)
+        merged_windows.append(window)
+    return merged_windows
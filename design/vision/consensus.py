@@ -0,0 +1,225 @@
+import numpy
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial import distance
+
+from design.vision.constants import (MAXIMUM_ANGLE_BETWEEN_SIMILAR_ANGLES,
+                                     MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES,
+                                     NUMBER_OF_CAPTURES_TO_COMPARE,
+                                     REQUIRED_CONSENSUS_SUPPORT)
+from design.vision.exceptions import ConsensusNotReached
+
+MISMATCHED_ORIENTATIONS_COST = 1e9
+
+
+class SequentialConsensus:
+    """Fuse the information found in captures processed one at a time.
+
+    No more captures are needed once enough of them agree (``is_reached``)
+    or once the remaining captures can no longer make enough of them agree
+    (``is_impossible``).
+    """
+
+    def __init__(self, find_consensus, are_similar,
+                 required_support: int = REQUIRED_CONSENSUS_SUPPORT,
+                 maximum_captures: int = NUMBER_OF_CAPTURES_TO_COMPARE) -> None:
+        self.find_consensus = find_consensus
+        self.are_similar = are_similar
+        self.required_support = required_support
+        self.maximum_captures = maximum_captures
+        self.information = []
+        #: The number of captures similar to each capture (itself included)
+        self.supports = []
+        #: The number of processed captures, the ones where nothing was found
+        #: included
+        self.captures_count = 0
+
+    def add(self, information):
+        similarities = [self.are_similar(other, information) for other in self.information]
+        self.supports = [support + is_similar for support, is_similar in zip(self.supports, similarities)]
+        self.supports.append(1 + sum(similarities))
+        self.information.append(information)
+        self.captures_count += 1
+
+    def add_failure(self):
+        self.captures_count += 1
+
+    @property
+    def best_support(self) -> int:
+        return max(self.supports, default=0)
+
+    @property
+    def is_reached(self) -> bool:
+        return self.best_support >= self.required_support
+
+    @property
+    def is_impossible(self) -> bool:
+        remaining_captures = self.maximum_captures - self.captures_count
+        return self.best_support + remaining_captures < self.required_support
+
+    def get_consensus(self):
+        """Return the fused information of the largest group of similar
+           captures and the number of captures in that group."""
+        return self.find_consensus(self.information)
+
+
+def create_robot_consensus(**kwargs) -> SequentialConsensus:
+    return SequentialConsensus(find_robot_consensus, are_robots_similar, **kwargs)
+
+
+def create_drawing_zone_consensus(**kwargs) -> SequentialConsensus:
+    return SequentialConsensus(find_drawing_zone_consensus, are_drawing_zones_similar, **kwargs)
+
+
+def create_obstacles_consensus(**kwargs) -> SequentialConsensus:
+    return SequentialConsensus(find_obstacles_consensus, are_captured_obstacles_similar, **kwargs)
+
+
+def find_robot_consensus(robot_information):
+    """Fuse the robot's information found in many captures.
+
+    :param robot_information: The ``[(x, y), orientation]`` of every capture
+    :returns: The fused information of the largest group of similar
+              captures and the number of captures in that group
+    """
+    _check_information_exists(robot_information)
+    positions, orientations = _split_robot_information(robot_information)
+    members = find_largest_cluster(calculate_robot_similarities(positions, orientations))
+
+    x, y = numpy.median(positions[members], axis=0)
+    reference_orientation = orientations[members[0]]
+    orientation = calculate_angle_differences(reference_orientation + numpy.median(
+        calculate_angle_differences(orientations[members], reference_orientation)), 0)
+    return [(int(round(x)), int(round(y))), round(float(orientation), 2)], len(members)
+
+
+def find_drawing_zone_consensus(drawing_zone_information):
+    """Fuse the drawing zone's vertices found in many captures.
+
+    :param drawing_zone_information: The ordered vertices of every capture
+    :returns: The fused vertices of the largest group of similar captures
+              and the number of captures in that group
+    """
+    _check_information_exists(drawing_zone_information)
+    vertices = numpy.array(drawing_zone_information, dtype=float)
+    members = find_largest_cluster(calculate_drawing_zone_similarities(vertices))
+
+    fused_vertices = numpy.round(numpy.median(vertices[members], axis=0)).astype(int)
+    return [tuple(vertex) for vertex in fused_vertices.tolist()], len(members)
+
+
+def find_obstacles_consensus(obstacles_information):
+    """Fuse the obstacles found in many captures.
+
+    :param obstacles_information: The ``[[x, y], orientation]`` of every
+                                  obstacle for every capture
+    :returns: The fused obstacles of the largest group of similar captures
+              and the number of captures in that group
+    """
+    _check_information_exists(obstacles_information)
+    members = find_largest_cluster(calculate_obstacles_similarities(obstacles_information))
+    reference = obstacles_information[members[0]]
+    reference_positions, reference_orientations = _split_obstacles_information(reference)
+
+    aligned_positions = []
+    for member in members:
+        positions, orientations = _split_obstacles_information(obstacles_information[member])
+        reference_indices, indices = match_obstacles(reference_positions, reference_orientations,
+                                                     positions, orientations)
+        aligned_positions.append(positions[indices[numpy.argsort(reference_indices)]])
+
+    fused_positions = numpy.round(numpy.median(aligned_positions, axis=0)).astype(int)
+    return [[position, orientation] for position, orientation
+            in zip(fused_positions.tolist(), reference_orientations)], len(members)
+
+
+def find_largest_cluster(similarities: numpy.ndarray) -> numpy.ndarray:
+    """Find the capture similar to the most captures.
+
+    :param similarities: The symmetric matrix telling if two captures are
+                         similar
+    :returns: The indices of that capture and of the captures similar to it
+              (the former comes first)
+    """
+    center = numpy.argmax(similarities.sum(axis=1))
+    neighbours = numpy.flatnonzero(similarities[center])
+    return numpy.concatenate(([center], neighbours[neighbours != center]))
+
+
+def are_robots_similar(robot_information1, robot_information2) -> bool:
+    positions, orientations = _split_robot_information([robot_information1, robot_information2])
+    return bool(calculate_robot_similarities(positions, orientations)[0, 1])
+
+
+def are_drawing_zones_similar(drawing_zone_information1, drawing_zone_information2) -> bool:
+    vertices = numpy.array([drawing_zone_information1, drawing_zone_information2], dtype=float)
+    return bool(calculate_drawing_zone_similarities(vertices)[0, 1])
+
+
+def are_captured_obstacles_similar(obstacles_information1, obstacles_information2) -> bool:
+    return bool(calculate_obstacles_similarities([obstacles_information1, obstacles_information2])[0, 1])
+
+
+def calculate_robot_similarities(positions: numpy.ndarray, orientations: numpy.ndarray) -> numpy.ndarray:
+    close_positions = distance.cdist(positions, positions) < MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES
+    close_orientations = numpy.abs(calculate_angle_differences(orientations[:, numpy.newaxis],
+                                                               orientations[numpy.newaxis, :]))
+    return close_positions & (close_orientations < MAXIMUM_ANGLE_BETWEEN_SIMILAR_ANGLES)
+
+
+def calculate_drawing_zone_similarities(vertices: numpy.ndarray) -> numpy.ndarray:
+    vertices_distances = numpy.max([distance.cdist(vertices[:, i], vertices[:, i])
+                                    for i in range(vertices.shape[1])], axis=0)
+    return vertices_distances <= MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES
+
+
+def calculate_obstacles_similarities(obstacles_information) -> numpy.ndarray:
+    split_information = [_split_obstacles_information(information) for information in obstacles_information]
+    number_of_captures = len(split_information)
+    similarities = numpy.eye(number_of_captures, dtype=bool)
+    for i in range(number_of_captures):
+        for j in range(i + 1, number_of_captures):
+            if len(split_information[i][0]) == len(split_information[j][0]):
+                similarities[i, j] = similarities[j, i] = are_obstacles_matching(*split_information[i],
+                                                                                 *split_information[j])
+    return similarities
+
+
+def are_obstacles_matching(positions1, orientations1, positions2, orientations2) -> bool:
+    indices1, indices2 = match_obstacles(positions1, orientations1, positions2, orientations2)
+    matched_distances = numpy.linalg.norm(positions1[indices1] - positions2[indices2], axis=1)
+    if not numpy.array_equal(orientations1[indices1], orientations2[indices2]):
+        return False
+    return bool(numpy.all(matched_distances <= MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES))
+
+
+def match_obstacles(positions1, orientations1, positions2, orientations2):
+    """Pair the obstacles of two captures minimizing the total distance.
+
+    Obstacles with different orientations are only paired as a last resort.
+    """
+    costs = distance.cdist(positions1, positions2)
+    costs[orientations1[:, numpy.newaxis] != orientations2[numpy.newaxis, :]] = MISMATCHED_ORIENTATIONS_COST
+    return linear_sum_assignment(costs)
+
+
+def calculate_angle_differences(angles1, angles2):
+    """Return the signed differences (in degrees within [-180, 180[) between
+       the angles."""
+    return (numpy.asarray(angles1) - angles2 + 180) % 360 - 180
+
+
+def _split_robot_information(robot_information):
+    positions = numpy.array([information[0] for information in robot_information], dtype=float)
+    orientations = numpy.array([information[1] for information in robot_information], dtype=float)
+    return positions, orientations
+
+
+def _split_obstacles_information(obstacles_information):
+    positions = numpy.array([information[0] for information in obstacles_information], dtype=float).reshape(-1, 2)
+    orientations = numpy.array([information[1] for information in obstacles_information])
+    return positions, orientations
+
+
+def _check_information_exists(list_of_information):
+    if not list_of_information:
+        raise ConsensusNotReached('There is no information to fuse')
@@ -29,6 +29,9 @@ DRAWING_ZONE_MAX_AREA = 300000
 OBSTACLE_MIN_RADIUS = 20
 OBSTACLE_MAX_RADIUS = 60
 OBSTACLES_WHITE_CIRCLE_MIN_RADIUS = 30
+OBSTACLES_TOP_CIRCLE_MIN_DISTANCE = 200  # in pixels, between the centers of two tops
+PYRAMID_REFINEMENT_MARGIN = 2  # in pixels of the coarsest pyramid level
+OBSTACLES_TOP_CIRCLE_VOTES = 100  # edge pixels of a top circle at full resolution
 
 MIN_ROBOT_CIRCLE_RADIUS = 10
 MIN_DISTANCE_BETWEEN_ROBOT_TOP_CIRCLES = 60
@@ -46,6 +49,7 @@ ROBOT_TRIANGLE_MINIMAL_AREA = 1600  # put at least 2000 for 23 cm height, at lea
 ROBOT_TRIANGLE_MAXIMAL_AREA = 2300
 
 NUMBER_OF_CAPTURES_TO_COMPARE = 10
+REQUIRED_CONSENSUS_SUPPORT = 3  # similar captures after which no more captures are taken
 
 OBSTACLES_HEIGHT = 41
 ROBOT_HEIGHT = 15
@@ -55,3 +59,35 @@ TABLE_HEIGHT = 112
 
 ROBOT_SPEED = 15  # cm/s
 CROP_MARGIN = 10  # pixels
+
+ROBOT_TRACKING_MARGIN = 80  # pixels, covers the robot's markers around its center
+ROBOT_TRACKING_WINDOW_GROWTH = 2
+ROBOT_TRACKING_GROWTH_STEPS = 2
+ROBOT_FLOW_MARGIN = 60  # pixels, around the markers where the optical flow is computed
+ROBOT_FLOW_REDETECTION_INTERVAL = 10  # tracked frames after which the robot is detected again
+ROBOT_FLOW_MAXIMAL_ERROR = 1.0  # pixels, between a marker and its position tracked back
+ROBOT_FLOW_MAXIMAL_SIDE_CHANGE = 0.15  # relative change of the markers' triangle sides
+
+CHANGE_DETECTION_THRESHOLD = 30  # gray levels
+CHANGE_DETECTION_MINIMAL_AREA = 150  # pixels
+CHANGE_DETECTION_MAXIMAL_FRACTION = 0.25  # of the table, above it the whole map is detected again
+OBSTACLE_FOOTPRINT_MARGIN = 60  # pixels, around an obstacle's top and base
+ROBOT_FOOTPRINT_MARGIN = 120  # pixels, around the robot's center
+
+BACKGROUND_PYRAMID_LEVEL = 2  # the background is modelled on the image halved twice
+BACKGROUND_THRESHOLD = 25  # gray levels, between the background and a foreground pixel
+BACKGROUND_MINIMAL_AREA = 40  # pixels of the background's level, of a foreground blob
+BACKGROUND_WINDOW_MARGIN = 40  # pixels, around a foreground blob where the robot is searched
+BACKGROUND_MAXIMAL_CANDIDATES = 5  # foreground blobs searched for the robot
+
+RECTIFIED_PIXELS_PER_CENTIMETER = 4  # of the top-down views of the table
+RECTIFIED_TABLE_MARGIN = 5  # cm, around the table in the top-down views
+# The pixel thresholds above at the tables' scale of about 6 pixels/cm
+ROBOT_MARKER_MINIMAL_RADIUS = 1.5  # cm
+ROBOT_MARKERS_MINIMAL_AREA = 40  # cm², of the markers' triangle
+ROBOT_MARKERS_MAXIMAL_AREA = 60  # cm²
+
+STATIC_SCENE_EDGE_SAMPLES = 50  # per edge of the drawing zone
+STATIC_SCENE_EDGE_TOLERANCE = 4  # pixels, between a sample and the green border
+STATIC_SCENE_MINIMAL_EDGE_SUPPORT = 0.8  # fraction of the samples on the green border
+STATIC_SCENE_MAXIMAL_REPROJECTION_ERROR = 2  # pixels
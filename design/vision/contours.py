@@ -7,10 +7,13 @@ from math import inf
 from operator import truediv
 from typing import Tuple
 
+from design.utils.tracing import traced, tracer
+
 from .constants import (PAINTING_FRAME_LOWER_GREEN,
                         PAINTING_FRAME_UPPER_GREEN,
                         WARPED_IMAGE_DIMENSIONS)
 from .exceptions import PaintingFrameNotFound
+from .segmentation import PAINTING_FRAME_GREEN, get_color_segmenter
 from .utils import StdErrOutputDisplayManager
 
 
@@ -20,7 +23,11 @@ class PaintingFrameFinder:
                  color_upper_range=PAINTING_FRAME_UPPER_GREEN):
         self.color_lower_range = color_lower_range
         self.color_upper_range = color_upper_range
+        self.segmenter = get_color_segmenter(((PAINTING_FRAME_GREEN,
+                                               tuple(color_lower_range),
+                                               tuple(color_upper_range)),))
 
+    @traced
     def find_frame_coordinates(self, image):
         with StdErrOutputDisplayManager():
             try:
@@ -31,7 +38,8 @@ class PaintingFrameFinder:
                                             'coordinates.')
 
     def _find_frame_coordinates(self, image):
-        mask = self._find_painting_frame_mask(image)
+        with tracer.stage('PaintingFrameFinder.mask'):
+            mask = self._find_painting_frame_mask(image)
         _, contours, hierarchy = cv2.findContours(mask,
 
                                                   cv2.RETR_TREE,
@@ -53,10 +61,7 @@ class PaintingFrameFinder:
 
     def _find_painting_frame_mask(self, image):
         blurred_image = cv2.GaussianBlur(image, (5, 5), 0)
-        image_hsv = cv2.cvtColor(blurred_image, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(image_hsv,
-                           self.color_lower_range,
-                           self.color_upper_range)
+        mask = self.segmenter.segment(blurred_image, PAINTING_FRAME_GREEN)
 
         kernel = np.ones((9, 9), np.uint8)
         return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
@@ -3,16 +3,21 @@ import json
 import cv2
 import math
 from design.vision.constants import TOP_GAP_FROM_DRAWING_ZONE, LEFT_GAP_FROM_DRAWING_ZONE
+from design.vision.undistortion import undistort_points
 from design.vision.world_utils import convert_to_degrees, calculate_angle
 
 DEFAULT_CALIBRATION_JSON_FILE_PATH = "config/calibration_information_"
+DEFAULT_LOOKUP_MAP_FILE_PATH = "config/calibration_information_{}_lookup_map_{}_{}x{}.npz"
 
 
 class Converter:
-    def __init__(self, table_number):
+    def __init__(self, table_number, lookup_map_resolution=None):
+        self.table_number = table_number
         self.intrinsic_matrix = None
         self.rotation_vector = None
         self.translation_vector = None
+        #: The lens distortion (none when the calibration does not have any)
+        self.distortion_coefficients = np.zeros(5)
 
         self.extract_calibration_information_from_json(table_number)
 
@@ -24,6 +29,12 @@ class Converter:
         self.translation_x = 0
         self.translation_y = 0
 
+        self.inverse_plane_homographies = {}
+        #: The (width, height) of the frames for which pixel to world lookup
+        #: maps are kept (``None`` disables them)
+        self.lookup_map_resolution = lookup_map_resolution
+        self.lookup_maps = {}
+
     def extract_calibration_information_from_json(self, table_number):
         file_path = "{}{}.json".format(DEFAULT_CALIBRATION_JSON_FILE_PATH, table_number)
         with open(file_path) as data_file:
@@ -31,31 +42,124 @@ class Converter:
             self.intrinsic_matrix = data["intrinsic_matrix"]
             self.rotation_vector = data["rotation_vector"]
             self.translation_vector = data["translation_vector"]
+            self.distortion_coefficients = np.asarray(data.get("distortion_coefficients", self.distortion_coefficients),
+                                                      dtype=np.float64).ravel()
 
     def get_world_coordinates(self, height, u, v):
-        a1 = [[] for _ in range(0, 4)]
-        a2 = [[] for _ in range(0, 4)]
-        a3 = [0, 0, 1, height]
-
-        for i in range(0, 4):
-            a1[i] = self.complete_matrix[0][i] - (u * self.complete_matrix[2][i])
-            a2[i] = self.complete_matrix[1][i] - (v * self.complete_matrix[2][i])
-
-        new_coordinate = -1 * (
-            a1[3] * np.cross(np.array(a2)[0:3],
-                             np.array(a3)[0:3]) +
-            a2[3] * np.cross(np.array(a3)[0:3],
-                             np.array(a1)[0:3]) +
-            a3[3] * np.cross(np.array(a1)[0:3],
-                             np.array(a2)[0:3])) / np.dot(np.array(a1[0:3]),
-                                                          np.cross(np.array(a2[0:3]),
-                                                                   np.array(a3[0:3])))
-        return new_coordinate[0:2]
+        return self.get_world_coordinates_array(height, [(u, v)])[0]
+
+    def get_world_coordinates_array(self, height, pixels):
+        pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
+        heights = np.broadcast_to(np.asarray(height, dtype=np.float64), (len(pixels),))
+
+        world_coordinates = np.empty((len(pixels), 2))
+        for plane_height in np.unique(heights):
+            indices = heights == plane_height
+            if self.lookup_map_resolution:
+                world_coordinates[indices] = self.look_up_world_coordinates(plane_height, pixels[indices])
+            else:
+                world_coordinates[indices] = self.project_on_plane(plane_height, pixels[indices])
+        return world_coordinates
+
+    def project_on_plane(self, height, pixels):
+        if self.is_distorted():
+            pixels = undistort_points(pixels, self.intrinsic_matrix, self.distortion_coefficients)
+        homogeneous_pixels = np.column_stack((pixels, np.ones(len(pixels))))
+        plane_coordinates = homogeneous_pixels @ self.get_inverse_plane_homography(height).T
+        return plane_coordinates[:, :2] / plane_coordinates[:, 2:]
+
+    def look_up_world_coordinates(self, height, pixels):
+        """Interpolate the world coordinates of the pixels between the four
+           nearest cells of the lookup map, so the fractional pixels are not
+           rounded."""
+        map_x, map_y = self.get_lookup_map(height)
+        lefts, tops = np.floor(pixels).astype(int).T
+        inside_map = (0 <= lefts) & (lefts < map_x.shape[1] - 1) & (0 <= tops) & (tops < map_x.shape[0] - 1)
+        lefts, tops = lefts[inside_map], tops[inside_map]
+        weights_x, weights_y = (pixels[inside_map] - np.column_stack((lefts, tops))).T
+
+        world_coordinates = np.empty((len(pixels), 2))
+        for axis, lookup_map in enumerate((map_x, map_y)):
+            top_left, top_right = lookup_map[tops, lefts], lookup_map[tops, lefts + 1]
+            bottom_left, bottom_right = lookup_map[tops + 1, lefts], lookup_map[tops + 1, lefts + 1]
+            top_values = top_left + (top_right - top_left) * weights_x
+            bottom_values = bottom_left + (bottom_right - bottom_left) * weights_x
+            world_coordinates[inside_map, axis] = top_values + (bottom_values - top_values) * weights_y
+        world_coordinates[~inside_map] = self.project_on_plane(height, pixels[~inside_map])
+        return world_coordinates
+
+    def get_pixel_coordinates_array(self, coordinates, height):
+        return self.get_image_coordinates_array(coordinates, height).astype(int)
+
+    def get_image_coordinates_array(self, coordinates, height):
+        """Project world coordinates on the image without truncating the
+           pixel coordinates."""
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        heights = np.broadcast_to(np.asarray(height, dtype=np.float64), (len(coordinates),))
+        if self.is_distorted() and len(coordinates):
+            pixel_coordinates, _ = cv2.projectPoints(np.column_stack((coordinates, -heights)),
+                                                     np.asarray(self.rotation_vector, dtype=np.float64),
+                                                     np.asarray(self.translation_vector, dtype=np.float64),
+                                                     np.asarray(self.intrinsic_matrix, dtype=np.float64),
+                                                     self.distortion_coefficients)
+            return pixel_coordinates.reshape(-1, 2)
+        homogeneous_coordinates = np.column_stack((coordinates, -heights, np.ones(len(coordinates))))
+
+        pixel_coordinates = homogeneous_coordinates @ np.asarray(self.complete_matrix).T
+        return pixel_coordinates[:, :2] / pixel_coordinates[:, 2:]
+
+    def is_distorted(self):
+        return bool(np.any(self.distortion_coefficients))
+
+    def calculate_plane_homography(self, height):
+        # Like `get_world_coordinates`, a height `h` lies on the plane `z = -h`
+        complete_matrix = np.asarray(self.complete_matrix)
+        return np.column_stack((complete_matrix[:, 0],
+                                complete_matrix[:, 1],
+                                complete_matrix[:, 3] - complete_matrix[:, 2] * height))
+
+    def get_inverse_plane_homography(self, height):
+        height = float(height)
+        if height not in self.inverse_plane_homographies:
+            self.inverse_plane_homographies[height] = np.linalg.inv(self.calculate_plane_homography(height))
+        return self.inverse_plane_homographies[height]
+
+    def get_lookup_map(self, height):
+        height = float(height)
+        if height not in self.lookup_maps:
+            self.lookup_maps[height] = self.load_lookup_map(height)
+        return self.lookup_maps[height]
+
+    def load_lookup_map(self, height):
+        width, frame_height = self.lookup_map_resolution
+        file_path = DEFAULT_LOOKUP_MAP_FILE_PATH.format(self.table_number, height, width, frame_height)
+        try:
+            with np.load(file_path) as data:
+                if np.allclose(data["complete_matrix"], self.complete_matrix) and \
+                        np.allclose(data["distortion_coefficients"], self.distortion_coefficients):
+                    return data["map_x"], data["map_y"]
+        except (OSError, KeyError, ValueError):
+            pass
+
+        map_x, map_y = self.calculate_lookup_map(height)
+        try:
+            np.savez(file_path, map_x=map_x, map_y=map_y, complete_matrix=self.complete_matrix,
+                     distortion_coefficients=self.distortion_coefficients)
+        except OSError:
+            pass
+        return map_x, map_y
+
+    def calculate_lookup_map(self, height):
+        width, frame_height = self.lookup_map_resolution
+        rows, columns = np.mgrid[0:frame_height, 0:width]
+        pixels = np.column_stack((columns.ravel(), rows.ravel()))
+        world_coordinates = self.project_on_plane(height, pixels).astype(np.float32)
+        return (world_coordinates[:, 0].reshape(frame_height, width),
+                world_coordinates[:, 1].reshape(frame_height, width))
 
     def get_pixel_coordinates(self, x, y, z):
-        pixel_coordinates = np.dot(self.complete_matrix, np.array([x, y, z, 1]))
-        new_pixel = pixel_coordinates[:2] / pixel_coordinates[2]
-        return int(new_pixel[0]), int(new_pixel[1])
+        # A point at `z` lies at the height `-z` (see `calculate_plane_homography`)
+        return tuple(self.get_pixel_coordinates_array([(x, y)], -z)[0].tolist())
 
     def set_origin(self, x_translation, y_translation):
         self.translation_x = -x_translation
@@ -66,9 +170,18 @@ class Converter:
         return [world_coordinate[0] + self.translation_x, world_coordinate[1] + self.translation_y]
 
     def get_pixel_coordinates_translated(self, x, y, z):
-        new_x = x - self.translation_x
-        new_y = y - self.translation_y
-        return self.get_pixel_coordinates(new_x, new_y, z)
+        return tuple(self.get_pixel_coordinates_translated_array([(x, y)], -z)[0].tolist())
+
+    def get_world_coordinates_translated_array(self, height, pixels):
+        return self.get_world_coordinates_array(height, pixels) + (self.translation_x, self.translation_y)
+
+    def get_pixel_coordinates_translated_array(self, coordinates, height):
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        return self.get_pixel_coordinates_array(coordinates - (self.translation_x, self.translation_y), height)
+
+    def get_image_coordinates_translated_array(self, coordinates, height):
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        return self.get_image_coordinates_array(coordinates - (self.translation_x, self.translation_y), height)
 
 
 def set_top_left_world_game_zone_coordinate(top_left_coordinate, table_angle: float):
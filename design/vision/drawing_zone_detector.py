@@ -2,8 +2,11 @@ import cv2
 import numpy
 import math
 import design.vision.constants as constants
+from design.utils.tracing import traced
 from design.vision.exceptions import DrawingZoneNotFound
-from design.vision.world_utils import apply_segmentation, calculate_minimal_box_area
+from design.vision.frame import Frame, to_frame
+from design.vision.segmentation import GREEN
+from design.vision.world_utils import calculate_minimal_box_area
 
 
 class DrawingZoneDetector:
@@ -19,21 +22,23 @@ class DrawingZoneDetector:
 
         return transformed_image
 
-    def __apply_image_transformations(self, image: numpy.ndarray):
-        thresh_image = apply_segmentation(image, constants.MIN_GREEN, constants.MAX_GREEN)
+    def __apply_image_transformations(self, frame: Frame):
+        thresh_image = frame.get_class_mask(GREEN)
         smooth_image = cv2.GaussianBlur(thresh_image, (5, 5), 0)
         morph_image = self.apply_morphological_transformations(smooth_image)
         return morph_image
 
-    def __find_drawing_zone_contours(self, image: numpy.ndarray):
-        pretreated_image = self.__apply_image_transformations(image)
-        _, contours, _ = cv2.findContours(pretreated_image, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    def __find_drawing_zone_contours(self, frame: Frame):
+        pretreated_image = self.__apply_image_transformations(frame)
+        _, contours, _ = cv2.findContours(pretreated_image, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE,
+                                          offset=frame.offset)
         return contours
 
-    def find_drawing_zone_vertices(self, image: numpy.ndarray):
+    @traced
+    def find_drawing_zone_vertices(self, frame: Frame):
         self.drawing_zone_coordinates = []
 
-        contours = self.__find_drawing_zone_contours(image)
+        contours = self.__find_drawing_zone_contours(to_frame(frame))
         minimal_area = math.inf
         minimal_approximated_contour = None
         for contour in contours:
@@ -56,6 +61,33 @@ class DrawingZoneDetector:
 
         return self.drawing_zone_coordinates
 
+    @staticmethod
+    def is_drawing_zone_visible(frame: Frame, vertices) -> bool:
+        """Check that the green border lies along the edges of the given
+           drawing zone (quicker than detecting the drawing zone again).
+
+        :param frame: The frame where the drawing zone is searched
+        :param vertices: The ordered vertices of the drawing zone
+        """
+        frame = to_frame(frame)
+        vertices = numpy.asarray(vertices, dtype=float)
+        tolerance = constants.STATIC_SCENE_EDGE_TOLERANCE
+        left, top = numpy.floor(vertices.min(axis=0)).astype(int) - tolerance
+        right, bottom = numpy.ceil(vertices.max(axis=0)).astype(int) + tolerance + 1
+        region_frame = frame.crop(left, top, right, bottom)
+        kernel = numpy.ones((2 * tolerance + 1, 2 * tolerance + 1), numpy.uint8)
+        green_mask = cv2.dilate(region_frame.get_class_mask(GREEN), kernel)
+
+        steps = numpy.linspace(0, 1, constants.STATIC_SCENE_EDGE_SAMPLES, endpoint=False)[:, numpy.newaxis]
+        samples = numpy.concatenate([start + steps * (end - start)
+                                     for start, end in zip(vertices, numpy.roll(vertices, -1, axis=0))])
+        columns, rows = numpy.round(samples - region_frame.offset).astype(int).T
+        height, width = green_mask.shape
+        inside_frame = (0 <= columns) & (columns < width) & (0 <= rows) & (rows < height)
+        on_border = numpy.zeros(len(samples), bool)
+        on_border[inside_frame] = green_mask[rows[inside_frame], columns[inside_frame]] > 0
+        return numpy.mean(on_border) >= constants.STATIC_SCENE_MINIMAL_EDGE_SUPPORT
+
     def reorder_drawing_zone_vertices(self):
         approximate_center = [0, 0]
         for vertex in self.drawing_zone_coordinates:
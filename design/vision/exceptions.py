@@ -22,5 +22,9 @@ class ObstaclesNotFound(Exception):
     pass
 
 
-class PositionGap(Exception):
+class ConsensusNotReached(Exception):
+    pass
+
+
+class SceneChanged(Exception):
     pass
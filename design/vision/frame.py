@@ -0,0 +1,79 @@
+import cv2
+import numpy
+
+from typing import Tuple, Union
+
+from design.vision.segmentation import get_color_segmenter
+
+
+class Frame:
+    """A captured BGR image with its derived planes.
+
+    The derived planes (HSV, gray, RGB, color masks) are computed on first
+    access and kept, so every detector working on the same capture shares
+    them. A frame may be a view on a region of a larger capture: ``offset``
+    is then the position of its top left pixel in that capture and every
+    window and coordinate is expressed in the capture's coordinates.
+    """
+
+    def __init__(self, image: numpy.ndarray, offset: Tuple[int, int] = (0, 0)) -> None:
+        self.image = image
+        self.offset = offset
+        self._planes = {}
+        self._pyramid = {0: image}
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.image.shape
+
+    @property
+    def gray(self) -> numpy.ndarray:
+        return self._get_plane('gray', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def rgb(self) -> numpy.ndarray:
+        return self._get_plane('rgb', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB))
+
+    @property
+    def labels(self) -> numpy.ndarray:
+        """The color classes of the pixels (see
+           :class:`design.vision.segmentation.ColorSegmenter`)."""
+        return self._get_plane('labels', lambda: get_color_segmenter().label(self.image))
+
+    def get_class_mask(self, name: str) -> numpy.ndarray:
+        """Return the mask of the pixels of a color class of the world
+           camera."""
+        return self._get_plane(('class', name), lambda: get_color_segmenter().get_class_mask(self.labels, name))
+
+    def get_pyramid_image(self, level: int) -> numpy.ndarray:
+        """Return the image downscaled ``level`` times by a factor of 2."""
+        if level not in self._pyramid:
+            self._pyramid[level] = cv2.pyrDown(self.get_pyramid_image(level - 1))
+        return self._pyramid[level]
+
+    def crop(self, left: int, top: int, right: int, bottom: int) -> 'Frame':
+        """Return a view on the given window of the frame.
+
+        The window is clipped to the frame. The planes already computed are
+        shared with the returned frame.
+        """
+        offset_x, offset_y = self.offset
+        height, width = self.image.shape[:2]
+        left, right = (min(max(limit - offset_x, 0), width) for limit in (left, right))
+        top, bottom = (min(max(limit - offset_y, 0), height) for limit in (top, bottom))
+
+        cropped_frame = Frame(self.image[top:bottom, left:right], (offset_x + left, offset_y + top))
+        for key, plane in self._planes.items():
+            cropped_frame._planes[key] = plane[top:bottom, left:right]
+        return cropped_frame
+
+    def _get_plane(self, key, compute_plane) -> numpy.ndarray:
+        if key not in self._planes:
+            self._planes[key] = compute_plane()
+        return self._planes[key]
+
+
+def to_frame(image: Union[Frame, numpy.ndarray]) -> Frame:
+    if isinstance(image, Frame):
+        return image
+    return Frame(image)
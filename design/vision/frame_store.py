@@ -0,0 +1,115 @@
+import json
+import os
+
+import numpy
+
+from typing import Optional, Tuple
+
+FRAMES_FILE_NAME = 'frames.raw'
+TIMESTAMPS_FILE_NAME = 'timestamps.raw'
+HEADER_FILE_NAME = 'header.json'
+
+
+class FrameStoreWriter:
+    """Record frames in a directory readable by :class:`FrameStore`.
+
+    The frames are appended to a raw ``uint8`` file and their timestamps to a
+    raw ``float64`` file, so recording does not encode anything. A recording
+    already in the directory is continued, since the camera is opened again
+    when it reconnects.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.shape = None
+        self._frames_file = None
+        self._timestamps_file = None
+
+    def __enter__(self) -> 'FrameStoreWriter':
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.close()
+
+    def write(self, frame: numpy.ndarray, timestamp: float):
+        if self.shape is None:
+            self._open(frame.shape)
+        if frame.shape != self.shape:
+            raise ValueError('The frame\'s shape {} is not the store\'s shape {}'.format(frame.shape, self.shape))
+        self._frames_file.write(numpy.ascontiguousarray(frame, numpy.uint8).tobytes())
+        self._timestamps_file.write(numpy.float64(timestamp).tobytes())
+
+    def close(self):
+        for opened_file in (self._frames_file, self._timestamps_file):
+            if opened_file:
+                opened_file.close()
+        self._frames_file = None
+        self._timestamps_file = None
+
+    def _open(self, shape: Tuple[int, ...]):
+        os.makedirs(self.directory, exist_ok=True)
+        self.shape = tuple(shape)
+        frames_count = self._count_recorded_frames()
+        if frames_count is None:
+            with open(os.path.join(self.directory, HEADER_FILE_NAME), 'w') as header_file:
+                json.dump({"shape": self.shape}, header_file)
+            frames_count = 0
+        frame_size = int(numpy.prod(self.shape, dtype=int))
+        self._frames_file = _open_for_append(os.path.join(self.directory, FRAMES_FILE_NAME),
+                                             frames_count * frame_size)
+        self._timestamps_file = _open_for_append(os.path.join(self.directory, TIMESTAMPS_FILE_NAME),
+                                                 frames_count * numpy.dtype(numpy.float64).itemsize)
+
+    def _count_recorded_frames(self) -> Optional[int]:
+        """Return the number of complete frames already recorded in the
+           directory (``None`` when it has no recording).
+
+        :raises ValueError: When the recorded frames do not have the store's
+                            shape
+        """
+        try:
+            with open(os.path.join(self.directory, HEADER_FILE_NAME)) as header_file:
+                shape = tuple(json.load(header_file)["shape"])
+            frames_size = os.path.getsize(os.path.join(self.directory, FRAMES_FILE_NAME))
+            timestamps_size = os.path.getsize(os.path.join(self.directory, TIMESTAMPS_FILE_NAME))
+        except (OSError, ValueError, KeyError):
+            return None
+        if shape != self.shape:
+            raise ValueError('The recorded frames\' shape {} is not the store\'s shape {}'.format(shape, self.shape))
+        return min(frames_size // int(numpy.prod(shape, dtype=int)),
+                   timestamps_size // numpy.dtype(numpy.float64).itemsize)
+
+
+class FrameStore:
+    """Memory-mapped frames recorded by :class:`FrameStoreWriter`."""
+
+    def __init__(self, directory: str) -> None:
+        with open(os.path.join(directory, HEADER_FILE_NAME)) as header_file:
+            self.shape = tuple(json.load(header_file)["shape"])
+        self.timestamps = _map_file(os.path.join(directory, TIMESTAMPS_FILE_NAME), numpy.float64, ())
+        self.frames = _map_file(os.path.join(directory, FRAMES_FILE_NAME), numpy.uint8, self.shape)
+        frames_count = min(len(self.timestamps), len(self.frames))
+        self.timestamps = self.timestamps[:frames_count]
+        self.frames = self.frames[:frames_count]
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index: int) -> Tuple[float, numpy.ndarray]:
+        return float(self.timestamps[index]), self.frames[index]
+
+
+def _open_for_append(file_path: str, size: int):
+    """Open the file for appending after its first ``size`` bytes, which drops
+       a frame left incomplete by an interrupted recording."""
+    opened_file = open(file_path, 'ab')
+    opened_file.truncate(size)
+    return opened_file
+
+
+def _map_file(file_path: str, dtype, shape: Tuple[int, ...]) -> numpy.ndarray:
+    item_size = int(numpy.prod(shape, dtype=int)) * numpy.dtype(dtype).itemsize
+    items_count = os.path.getsize(file_path) // item_size
+    if not items_count:
+        return numpy.empty((0,) + shape, dtype)
+    return numpy.memmap(file_path, dtype, 'r', shape=(items_count,) + shape)
@@ -1,42 +1,71 @@
 import cv2
-import numpy
 import numpy as np
 import math
 import design.vision.constants as constants
+from design.utils.tracing import traced
 from design.vision.exceptions import ObstaclesNotFound
+from design.vision.frame import Frame, to_frame
 from design.vision.world_utils import (calculate_angle,
+                                       scale_to_pyramid_level,
                                        define_cardinal_point,
-                                       eliminate_duplicated_points,
+                                       find_distant_points_indices,
                                        triangle_shortest_edge,
-                                       calculate_centroid,
-                                       eliminate_close_points_in_list)
+                                       calculate_centroid)
 
 
 class ObstaclesDetector:
-    def __init__(self):
+    def __init__(self, pyramid_level: int = 0):
         self.triangular_obstacles_coordinates = []
         self.obstacles_information = []
-
-    @staticmethod
-    def __detect_obstacles_top_circles(frame: numpy.ndarray):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        image_with_circles = frame.copy()
-        circles = cv2.HoughCircles(gray, cv2.HOUGH_GRADIENT, 1.2, 200,
-                                   minRadius=constants.OBSTACLES_WHITE_CIRCLE_MIN_RADIUS)
-
-        if circles is not None:
-            circles = np.round(circles[0, :]).astype("int")
-            for (x, y, radius) in circles:
-                if constants.OBSTACLE_MIN_RADIUS < radius < constants.OBSTACLE_MAX_RADIUS:
-                    # draw the circles to make mask afterwards
-                    cv2.circle(image_with_circles, (x, y), radius, (255, 255, 0), -1)
+        #: The number of times the image is halved before searching the
+        #: obstacles' top circles (0 searches the full resolution image)
+        self.pyramid_level = pyramid_level
+
+    def __detect_obstacles_top_circles(self, frame: Frame):
+        image_with_circles = frame.image.copy()
+        if self.pyramid_level:
+            circles = self.__find_top_circles_coarse_to_fine(frame)
+        else:
+            circles = find_top_circles(frame.gray)
+
+        for (x, y, radius) in circles:
+            if constants.OBSTACLE_MIN_RADIUS < radius < constants.OBSTACLE_MAX_RADIUS:
+                # draw the circles to make mask afterwards
+                cv2.circle(image_with_circles, (x, y), radius, (255, 255, 0), -1)
         return image_with_circles
 
-    def __show_obstacles_region_of_interest(self, frame: numpy.ndarray):
+    def __find_top_circles_coarse_to_fine(self, frame: Frame):
+        scale = 2 ** self.pyramid_level
+        small_image = cv2.cvtColor(frame.get_pyramid_image(self.pyramid_level), cv2.COLOR_BGR2GRAY)
+        # The votes for a circle are its perimeter's pixels, so the
+        # threshold shrinks with the image
+        candidates = find_top_circles(
+            small_image,
+            scale_to_pyramid_level(constants.OBSTACLES_TOP_CIRCLE_MIN_DISTANCE, self.pyramid_level),
+            round(scale_to_pyramid_level(constants.OBSTACLES_WHITE_CIRCLE_MIN_RADIUS, self.pyramid_level)),
+            accumulator_threshold=round(scale_to_pyramid_level(constants.OBSTACLES_TOP_CIRCLE_VOTES,
+                                                               self.pyramid_level))
+        )
+
+        circles = []
+        for (x, y, radius) in candidates * scale:
+            margin = constants.PYRAMID_REFINEMENT_MARGIN * scale
+            left, top = max(x - radius - margin, 0), max(y - radius - margin, 0)
+            window = frame.gray[top:y + radius + margin, left:x + radius + margin]
+            refined_circles = find_top_circles(window,
+                                               minimum_radius=max(radius - margin, 0),
+                                               maximum_radius=radius + margin)
+            if len(refined_circles):
+                refined_x, refined_y, radius = refined_circles[0]
+                x, y = refined_x + left, refined_y + top
+            circles.append((x, y, radius))
+        return circles
+
+    def __show_obstacles_region_of_interest(self, frame: Frame):
         image_with_circles = self.__detect_obstacles_top_circles(frame)
         aqua = np.array([255, 255, 0], dtype=np.uint8)
         masked_img = cv2.inRange(image_with_circles, aqua, aqua)
-        masked_img = cv2.bitwise_and(frame, frame, mask=masked_img)
+        masked_img = cv2.bitwise_and(frame.image, frame.image, mask=masked_img)
         return masked_img
 
     @staticmethod
@@ -48,24 +77,23 @@ class ObstaclesDetector:
         morphed_image = cv2.morphologyEx(filtered_image, cv2.MORPH_OPEN, kernel)
         return morphed_image
 
-    def __refine_image_contours(self, frame: numpy.ndarray):
+    def __refine_image_contours(self, frame: Frame):
         masked_image = self.__show_obstacles_region_of_interest(frame)
         denoised_image = self.__denoise_image(masked_image)
         canny_image = cv2.Canny(denoised_image, 100, 300, 3)
         return canny_image
 
-    def __find_obstacles_contours(self, frame: numpy.ndarray):
+    def __find_obstacles_contours(self, frame: Frame):
         image = self.__refine_image_contours(frame)
-        _, contours, _ = cv2.findContours(image, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+        _, contours, _ = cv2.findContours(image, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE, offset=frame.offset)
         return contours
 
-    def __detect_triangles(self, frame: numpy.ndarray):
-        contours = self.__find_obstacles_contours(frame)
+    @staticmethod
+    def __classify_contours(contours):
         triangles_obstacles = []
-
+        circles = []
         for contour in contours:
             x, y, w, h = cv2.boundingRect(contour)
-            cx, cy = calculate_centroid(contour)
 
             high = constants.HIGHER_TRIANGLE_BOX_SIZE
             low = constants.LOWER_TRIANGLE_BOX_SIZE
@@ -73,12 +101,22 @@ class ObstaclesDetector:
                 perimeter = cv2.arcLength(contour, True)
                 approximated_points = cv2.approxPolyDP(contour, 0.1 * perimeter, True)
 
-                new_approximated_points = eliminate_duplicated_points(approximated_points, 5)
+                approximated_points = approximated_points.reshape(-1, 2)
+                new_approximated_points = [tuple(point) for point in approximated_points[
+                    find_distant_points_indices(approximated_points, 5)]]
 
                 if len(new_approximated_points) == 3:
+                    cx, cy = calculate_centroid(contour)
                     triangles_obstacles.append([[cx, cy], [new_approximated_points]])
 
-        self.triangular_obstacles_coordinates = eliminate_duplicated_points(np.asarray(triangles_obstacles), 10)
+            # The hole of an obstacle's top edge is a contour of its own, so
+            # the top is found even when the cylinder's sides touch its edge
+            (cx, cy), radius = cv2.minEnclosingCircle(contour)
+            area_of_circle = 2 * math.pi * radius
+            if 150 > area_of_circle > 120:
+                circles.append((int(round(cx)), int(round(cy))))
+
+        return triangles_obstacles, circles
 
     def __determine_obstacle_orientation(self):
         for t in range(len(self.triangular_obstacles_coordinates)):
@@ -90,29 +128,23 @@ class ObstaclesDetector:
                     self.triangular_obstacles_coordinates[t] += tuple(
                         define_cardinal_point(calculate_angle(centroid, coordinate)))
 
-    def __detect_circles(self, frame: numpy.ndarray):
-        contours = self.__find_obstacles_contours(frame)
-        circles = []
-        for contour in contours:
-            (cx, cy), radius = cv2.minEnclosingCircle(contour)
-            area_of_circle = 2 * math.pi * radius
-            if 150 > area_of_circle > 120:
-                circles.append((int(round(cx)), int(round(cy))))
-        round_obstacles_information = eliminate_close_points_in_list(circles, 200)
-        new_informations = []
-        for information in round_obstacles_information:
-            new_informations.append([information, "O"])
-        self.obstacles_information.extend(new_informations)
+    def __add_round_obstacles(self, circles):
+        for index in find_distant_points_indices(circles, 200):
+            self.obstacles_information.append([list(circles[index]), "O"])
 
-        return self.obstacles_information
-
-    def calculate_obstacles_information(self, frame: numpy.ndarray):
+    @traced
+    def calculate_obstacles_information(self, frame: Frame):
         self.obstacles_information = []
-        self.triangular_obstacles_coordinates = []
+        frame = to_frame(frame)
+
+        contours = self.__find_obstacles_contours(frame)
+        triangles_obstacles, circles = self.__classify_contours(contours)
 
-        self.__detect_triangles(frame)
+        centroids = [triangle[0] for triangle in triangles_obstacles]
+        self.triangular_obstacles_coordinates = [tuple(triangles_obstacles[index]) for index
+                                                 in find_distant_points_indices(centroids, 10)]
         self.__determine_obstacle_orientation()
-        self.__detect_circles(frame)
+        self.__add_round_obstacles(circles)
 
         for triangle in self.triangular_obstacles_coordinates:
             self.obstacles_information.append([triangle[0], triangle[2]])
@@ -121,3 +153,15 @@ class ObstaclesDetector:
             raise ObstaclesNotFound
 
         return self.obstacles_information
+
+
+def find_top_circles(gray_image,
+                     minimum_distance=constants.OBSTACLES_TOP_CIRCLE_MIN_DISTANCE,
+                     minimum_radius=constants.OBSTACLES_WHITE_CIRCLE_MIN_RADIUS,
+                     maximum_radius=0,
+                     accumulator_threshold=constants.OBSTACLES_TOP_CIRCLE_VOTES):
+    circles = cv2.HoughCircles(gray_image, cv2.HOUGH_GRADIENT, 1.2, minimum_distance,
+                               param2=accumulator_threshold, minRadius=minimum_radius, maxRadius=maximum_radius)
+    if circles is None:
+        return np.empty((0, 3), int)
+    return np.round(circles[0, :]).astype("int")
@@ -0,0 +1,95 @@
+import cv2
+import numpy
+
+from typing import Tuple
+
+from design.utils.tracing import traced
+from design.vision.constants import (RECTIFIED_PIXELS_PER_CENTIMETER,
+                                     RECTIFIED_TABLE_MARGIN,
+                                     TABLE_WIDTH,
+                                     TABLE_HEIGHT)
+from design.vision.conversion import Converter
+from design.vision.frame import Frame
+
+
+class RectifiedFrame(Frame):
+    """A top-down view of a horizontal plane of the table at a fixed scale.
+
+    Its pixel (u, v) shows the point (u / scale + left, v / scale + top) of
+    the plane in the table's world coordinates, so the detections map to
+    the world with a scale and an offset.
+    """
+
+    def __init__(self, image: numpy.ndarray, height: float, pixels_per_centimeter: float,
+                 origin: Tuple[float, float]) -> None:
+        super().__init__(image)
+        #: The height (in centimeters) of the rectified plane
+        self.height = height
+        self.pixels_per_centimeter = pixels_per_centimeter
+        #: The (left, top) world coordinates shown by the top left pixel
+        self.origin = origin
+
+    def to_world(self, pixels) -> numpy.ndarray:
+        pixels = numpy.asarray(pixels, dtype=numpy.float64).reshape(-1, 2)
+        return pixels / self.pixels_per_centimeter + self.origin
+
+    def to_pixels(self, coordinates) -> numpy.ndarray:
+        coordinates = numpy.asarray(coordinates, dtype=numpy.float64).reshape(-1, 2)
+        return (coordinates - self.origin) * self.pixels_per_centimeter
+
+
+class TableRectifier:
+    """Warp the table seen by the world camera into a top-down view of one of
+       its horizontal planes.
+
+    The view is sampled through the converter's projection at the plane's
+    height, which includes the lens distortion. The sampling maps depend on
+    the region of the capture that is warped, so they are computed once for
+    every region and then reused.
+    """
+
+    def __init__(self, converter: Converter, height: float,
+                 pixels_per_centimeter: float = RECTIFIED_PIXELS_PER_CENTIMETER,
+                 margin: float = RECTIFIED_TABLE_MARGIN) -> None:
+        """
+        :param converter: The calibrated converter of the table (its origin
+                          must be set)
+        :param height: The height (in centimeters) of the rectified plane
+        :param pixels_per_centimeter: The scale of the top-down view
+        :param margin: The margin (in centimeters) kept around the table
+        """
+        self.converter = converter
+        self.height = height
+        self.pixels_per_centimeter = pixels_per_centimeter
+        self.origin = (-margin, -margin)
+        self.size = (int(round((TABLE_WIDTH + 2 * margin) * pixels_per_centimeter)),
+                     int(round((TABLE_HEIGHT + 2 * margin) * pixels_per_centimeter)))
+        self.maps = {}
+
+    @traced
+    def rectify(self, frame: Frame) -> RectifiedFrame:
+        """Return the top-down view of the plane seen in the frame.
+
+        :param frame: A capture of the world camera (or a view on it)
+        :returns: The view (black where the frame does not show the plane)
+        """
+        map_x, map_y = self.get_maps(frame)
+        image = cv2.remap(frame.image, map_x, map_y, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+        return RectifiedFrame(image, self.height, self.pixels_per_centimeter, self.origin)
+
+    def get_maps(self, frame: Frame):
+        key = (frame.offset, frame.shape[:2], self.converter.translation_x, self.converter.translation_y)
+        if key not in self.maps:
+            self.maps[key] = self.calculate_maps(frame.offset)
+        return self.maps[key]
+
+    def calculate_maps(self, offset: Tuple[int, int]):
+        """Return the fixed point maps from the view's pixels to the pixels of
+           a frame at the given offset."""
+        width, height = self.size
+        rows, columns = numpy.mgrid[0:height, 0:width]
+        coordinates = numpy.column_stack((columns.ravel(), rows.ravel())) / self.pixels_per_centimeter + self.origin
+        pixels = self.converter.get_image_coordinates_translated_array(coordinates, self.height) - offset
+        map_x = pixels[:, 0].reshape(height, width).astype(numpy.float32)
+        map_y = pixels[:, 1].reshape(height, width).astype(numpy.float32)
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
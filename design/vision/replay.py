@@ -0,0 +1,106 @@
+import time
+from enum import Enum
+
+import numpy
+
+from typing import Iterator
+
+from design.vision.camera import CameraSettings
+from design.vision.frame_store import FrameStore
+
+
+class Playback(Enum):
+    #: The frames are delivered with their recorded timing
+    REAL_TIME = 0
+    #: The frames are delivered at a given frame rate
+    FIXED_RATE = 1
+    #: The frames are delivered as soon as they are requested
+    FAST = 2
+
+
+class ReplayCamera:
+    """A :class:`design.vision.camera.Camera` replaying a recorded session.
+
+    :param directory: The directory of the recorded frames
+    :param playback: How the frames are timed
+    :param frame_rate: The frames per second of the ``FIXED_RATE`` playback
+    :param loop: Whether the session restarts once every frame was delivered
+    """
+
+    def __init__(self,
+                 directory: str,
+                 playback: Playback = Playback.REAL_TIME,
+                 frame_rate: float = None,
+                 loop: bool = False) -> None:
+        if playback == Playback.FIXED_RATE and not frame_rate:
+            raise ValueError('The fixed rate playback needs a frame rate')
+        self.directory = directory
+        self.playback = playback
+        self.frame_rate = frame_rate
+        self.loop = loop
+        self.frame_store = None
+        self.settings = None
+        self.position = 0
+        self.start_time = None
+
+    def __enter__(self) -> 'ReplayCamera':
+        self.open()
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.close()
+
+    def open(self):
+        self.frame_store = FrameStore(self.directory)
+        height, width = self.frame_store.shape[:2]
+        self.settings = CameraSettings(width=width, height=height)
+        self.rewind()
+
+    def close(self):
+        self.frame_store = None
+
+    def rewind(self):
+        self.position = 0
+        self.start_time = time.monotonic()
+
+    def take_pictures(self, pictures_number: int) -> Iterator[numpy.ndarray]:
+        for _ in range(pictures_number):
+            yield from self.take_picture()
+
+    def stream_pictures(self) -> Iterator[numpy.ndarray]:
+        while self.frame_store is not None and self.has_pictures():
+            yield from self.take_picture()
+
+    def take_picture(self) -> Iterator[numpy.ndarray]:
+        if self.frame_store is None or not self.has_pictures():
+            return
+        index = self._get_next_frame_index()
+        self.position = index + 1
+        _, frame = self.frame_store[index]
+        yield numpy.array(frame)
+
+    def has_pictures(self) -> bool:
+        if self.position >= len(self.frame_store) and self.loop and len(self.frame_store):
+            self.rewind()
+        return self.position < len(self.frame_store)
+
+    def calculate_due_times(self) -> numpy.ndarray:
+        """Return when (in seconds after the start) each frame is delivered."""
+        if self.playback == Playback.REAL_TIME:
+            return self.frame_store.timestamps - self.frame_store.timestamps[0]
+        if self.playback == Playback.FIXED_RATE:
+            return numpy.arange(len(self.frame_store)) / self.frame_rate
+        return numpy.zeros(len(self.frame_store))
+
+    def _get_next_frame_index(self) -> int:
+        # Like a live camera, the frames that were due while the consumer was
+        # busy are skipped and the consumer waits for the next frame
+        if self.playback == Playback.FAST:
+            return self.position
+        due_times = self.calculate_due_times()
+        elapsed_time = time.monotonic() - self.start_time
+        latest_due_index = numpy.searchsorted(due_times, elapsed_time, side='right') - 1
+        if latest_due_index >= self.position:
+            return int(latest_due_index)
+        time.sleep(due_times[self.position] - elapsed_time)
+        return self.position
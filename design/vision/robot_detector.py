@@ -1,38 +1,71 @@
+from itertools import chain, combinations
+
 import cv2
 import numpy
+from scipy.spatial import distance
 
 import design.vision.constants as constants
+from design.utils.tracing import traced
+from design.vision.blobs import Blobs, find_blobs
 from design.vision.exceptions import RobotNotFound
+from design.vision.frame import Frame, to_frame
+from design.vision.rectification import RectifiedFrame
+from design.vision.segmentation import MAGENTA
 from design.vision.world_utils import (calculate_angle,
-                                       triangle_shortest_edge,
-                                       apply_segmentation,
-                                       convert_to_degrees,
-                                       calculate_norm)
+                                       scale_to_pyramid_level,
+                                       convert_to_degrees)
+
+#: The window covers a marker's edges, which its flat center lacks
+ROBOT_FLOW_PARAMETERS = {'winSize': (31, 31), 'maxLevel': 3}
 
 
 class RobotDetector:
-    def __init__(self):
+    def __init__(self, pyramid_level: int = 0):
         self.robot_position = (0, 0)
         self.robot_orientation = 0.0
         self.circles_coordinates = []
+        #: The number of times the image is halved before searching the
+        #: markers (0 searches the full resolution image)
+        self.pyramid_level = pyramid_level
 
     @staticmethod
-    def segment_frame(frame: numpy.ndarray):
-        segmented_frame = apply_segmentation(frame, constants.MIN_MAGENTA, constants.MAX_MAGENTA)
-        masked_image = cv2.bitwise_and(frame, frame, mask=segmented_frame)
+    def segment_frame(frame: Frame):
+        segmented_frame = frame.get_class_mask(MAGENTA)
+        masked_image = cv2.bitwise_and(frame.image, frame.image, mask=segmented_frame)
         threshed_image = cv2.cvtColor(masked_image, cv2.COLOR_HSV2BGR)
         eroded_image = cv2.erode(threshed_image, (5, 5), iterations=5)
         dilated_image = cv2.dilate(eroded_image, (5, 5), iterations=5)
         return dilated_image
 
-    def find_circles(self, frame: numpy.ndarray):
-        frame = self.segment_frame(frame)
-        gray_image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        _, contours, _ = cv2.findContours(gray_image, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
-        for contour in contours:
-            (cx, cy), radius = cv2.minEnclosingCircle(contour)
-            if radius > constants.MIN_ROBOT_CIRCLE_RADIUS:
-                self.circles_coordinates.append((cx, cy))
+    def find_circles(self, frame: Frame):
+        if self.pyramid_level:
+            self.find_circles_coarse_to_fine(frame)
+            return
+
+        segmented_image = self.segment_frame(frame)
+        gray_image = cv2.cvtColor(segmented_image, cv2.COLOR_BGR2GRAY)
+        blobs = find_blobs(gray_image, frame.offset).filter_by_radius(constants.MIN_ROBOT_CIRCLE_RADIUS)
+        self.circles_coordinates.extend(tuple(centroid) for centroid in blobs.centroids.tolist())
+
+    def find_circles_coarse_to_fine(self, frame: Frame):
+        scale = 2 ** self.pyramid_level
+        segmented_image = self.segment_frame(Frame(frame.get_pyramid_image(self.pyramid_level)))
+        gray_image = cv2.cvtColor(segmented_image, cv2.COLOR_BGR2GRAY)
+        blobs = find_blobs(gray_image).filter_by_radius(
+            scale_to_pyramid_level(constants.MIN_ROBOT_CIRCLE_RADIUS, self.pyramid_level))
+        for (cx, cy), radius in zip(blobs.centroids * scale + frame.offset, blobs.radii):
+            half_size = (radius + constants.PYRAMID_REFINEMENT_MARGIN) * scale
+            self.circles_coordinates.append(self.refine_circle_center(frame, cx, cy, half_size))
+
+    @staticmethod
+    def refine_circle_center(frame: Frame, cx: float, cy: float, half_size: float):
+        window_frame = frame.crop(int(cx - half_size), int(cy - half_size),
+                                  int(cx + half_size), int(cy + half_size))
+        moments = cv2.moments(window_frame.get_class_mask(MAGENTA), True)
+        if not moments['m00']:
+            return cx, cy
+        return (moments['m10'] / moments['m00'] + window_frame.offset[0],
+                moments['m01'] / moments['m00'] + window_frame.offset[1])
 
     def detect_robot_position(self):
         if 3 < len(self.circles_coordinates):
@@ -45,45 +78,36 @@ class RobotDetector:
                 cy += point[1]
             self.robot_position = (round(cx / 3), round(cy / 3))
 
-    def keep_valid_coordinates(self):
-        for i, _ in enumerate(self.circles_coordinates):
-            for j in range(i + 1, len(self.circles_coordinates)):
-                if i != j:
-                    for k in range(j + 1, len(self.circles_coordinates)):
-                        if k != i and k != j:
-                            first_side = calculate_norm(self.circles_coordinates[i][0], self.circles_coordinates[i][1],
-                                                        self.circles_coordinates[j][0], self.circles_coordinates[j][1])
-                            second_side = calculate_norm(self.circles_coordinates[i][0], self.circles_coordinates[i][1],
-                                                         self.circles_coordinates[k][0], self.circles_coordinates[k][1])
-                            third_side = calculate_norm(self.circles_coordinates[j][0], self.circles_coordinates[j][1],
-                                                        self.circles_coordinates[k][0], self.circles_coordinates[k][1])
-
-                            semi_perimeter = (first_side + second_side + third_side) / 2
-                            area = (semi_perimeter * (semi_perimeter - first_side) * (semi_perimeter - second_side) * (
-                                semi_perimeter - third_side)) ** 0.5
-                            if constants.ROBOT_TRIANGLE_MINIMAL_AREA < area < constants.ROBOT_TRIANGLE_MAXIMAL_AREA:
-                                self.circles_coordinates = [
-                                    (self.circles_coordinates[i][0], self.circles_coordinates[i][1]),
-                                    (self.circles_coordinates[j][0], self.circles_coordinates[j][1]),
-                                    (self.circles_coordinates[k][0], self.circles_coordinates[k][1])]
-                                return
+    def keep_valid_coordinates(self,
+                               minimal_area: float = constants.ROBOT_TRIANGLE_MINIMAL_AREA,
+                               maximal_area: float = constants.ROBOT_TRIANGLE_MAXIMAL_AREA):
+        """Keep the three circles forming the triangle closest to the robot's
+           markers."""
+        points = numpy.array(self.circles_coordinates, dtype=float)
+        triplets = numpy.fromiter(chain.from_iterable(combinations(range(len(points)), 3)), int).reshape(-1, 3)
+        sides = calculate_triangles_sides(distance.cdist(points, points), triplets)
+        areas = calculate_triangles_areas(sides)
+
+        valid = (minimal_area < areas) & (areas < maximal_area)
+        if not numpy.any(valid):
+            return
+        scores = calculate_markers_geometry_scores(sides[valid], areas[valid], minimal_area, maximal_area)
+        best_triplet = triplets[valid][numpy.argmin(scores)]
+        self.circles_coordinates = [tuple(self.circles_coordinates[index]) for index in best_triplet]
 
     def detect_robot_orientation(self):
         if self.robot_position != (0, 0):
-            shortest_edge_vertices = triangle_shortest_edge(self.circles_coordinates)
-            for coordinate in self.circles_coordinates:
-                if coordinate not in shortest_edge_vertices:
-                    self.robot_orientation = round((180 - convert_to_degrees(calculate_angle(self.robot_position,
-                                                                                             coordinate))) * -1, 2)
+            self.robot_orientation = calculate_robot_orientation(self.robot_position, self.circles_coordinates)
 
     def reset_information(self):
         self.circles_coordinates = []
         self.robot_position = (0, 0)
         self.robot_orientation = 0.0
 
-    def detect_robot(self, frame: numpy.ndarray):
+    @traced
+    def detect_robot(self, frame: Frame):
         self.reset_information()
-        self.find_circles(frame)
+        self.find_circles(to_frame(frame))
         self.detect_robot_position()
         self.detect_robot_orientation()
         robot_information = [self.robot_position, self.robot_orientation]
@@ -92,3 +116,259 @@ class RobotDetector:
             raise RobotNotFound
 
         return robot_information
+
+    def detect_robot_in_window(self, frame: Frame, window: tuple):
+        """Detect the robot only within the given (left, top, right, bottom)
+           window of the frame.
+        """
+        return self.detect_robot(to_frame(frame).crop(*window))
+
+    @traced
+    def detect_robot_on_table(self, frame: RectifiedFrame):
+        """Detect the robot on a top-down view of the plane of its markers.
+
+        The markers' thresholds are physical, so they hold at every height
+        and on every table. The markers found are kept in world coordinates.
+
+        :param frame: The table rectified at the robot's height
+        :returns: The robot's world position and its orientation in the
+                  world's axes
+        :raises RobotNotFound: When the three markers are not found
+        """
+        self.reset_information()
+        pixels_per_centimeter = frame.pixels_per_centimeter
+        blobs = find_markers_blobs(frame).filter_by_radius(
+            constants.ROBOT_MARKER_MINIMAL_RADIUS * pixels_per_centimeter)
+        self.select_markers(blobs.centroids, pixels_per_centimeter)
+        return self.locate_robot_on_table(frame.to_world(self.circles_coordinates))
+
+    def detect_robot_in_window_on_table(self, frame: Frame, window: tuple, to_world):
+        """Detect the robot within the given (left, top, right, bottom)
+           window of a capture, like :meth:`detect_robot_on_table`.
+
+        The markers are found in the capture's pixels, then measured with the
+        physical thresholds once on the plane of the markers.
+
+        :param to_world: Converts the capture's pixels to the world
+                         coordinates of the plane of the markers
+        :returns: The robot's world position and its orientation in the
+                  world's axes
+        :raises RobotNotFound: When the three markers are not found
+        """
+        self.reset_information()
+        blobs = find_markers_blobs(to_frame(frame).crop(*window))
+        if not len(blobs):
+            raise RobotNotFound
+        markers = to_world(blobs.centroids)
+        # The radii are measured along the image's rows, on the plane
+        edges = blobs.centroids.copy()
+        edges[:, 0] += blobs.radii
+        radii = numpy.linalg.norm(to_world(edges) - markers, axis=1)
+        self.select_markers(markers[radii > constants.ROBOT_MARKER_MINIMAL_RADIUS])
+        return self.locate_robot_on_table(numpy.array(self.circles_coordinates))
+
+    def select_markers(self, markers: numpy.ndarray, pixels_per_centimeter: float = 1):
+        """Keep the three markers of the robot.
+
+        :param markers: The candidate markers, at the given scale of the plane
+                        of the markers
+        :raises RobotNotFound: When the three markers are not found
+        """
+        self.circles_coordinates = [tuple(marker) for marker in markers.tolist()]
+        if 3 < len(self.circles_coordinates):
+            self.keep_valid_coordinates(constants.ROBOT_MARKERS_MINIMAL_AREA * pixels_per_centimeter ** 2,
+                                        constants.ROBOT_MARKERS_MAXIMAL_AREA * pixels_per_centimeter ** 2)
+        if len(self.circles_coordinates) != 3:
+            raise RobotNotFound
+
+    def locate_robot_on_table(self, markers: numpy.ndarray):
+        """Return the robot's world position and its orientation in the
+           world's axes from the world coordinates of its three markers (kept
+           in ``circles_coordinates``)."""
+        self.circles_coordinates = [tuple(marker) for marker in markers.tolist()]
+        position = tuple(markers.mean(axis=0).tolist())
+        return [position, calculate_robot_orientation(position, self.circles_coordinates)]
+
+
+class RobotMarkersTracker:
+    """Follow the robot's markers with pyramidal Lucas-Kanade optical flow
+       between full detections.
+
+    The flow is only computed on the gray window around the markers. The
+    tracking stops when a marker is lost, when the markers no longer form
+    the detected triangle or after a number of tracked frames, and the
+    robot must then be detected again.
+    """
+
+    def __init__(self,
+                 robot_detector: RobotDetector,
+                 redetection_interval: int = constants.ROBOT_FLOW_REDETECTION_INTERVAL) -> None:
+        self.robot_detector = robot_detector
+        self.redetection_interval = redetection_interval
+        self.markers = None
+        self.markers_sides = None
+        self.previous_window_frame = None
+        self.tracked_frames_count = 0
+
+    @property
+    def is_tracking(self) -> bool:
+        return self.markers is not None
+
+    def reset(self):
+        self.markers = None
+        self.markers_sides = None
+        self.previous_window_frame = None
+        self.tracked_frames_count = 0
+
+    def detect_robot(self, frame: Frame):
+        """Track the robot, or detect it when it can not be tracked."""
+        frame = to_frame(frame)
+        if self.is_tracking:
+            try:
+                return self.track(frame)
+            except RobotNotFound:
+                pass
+        robot_information = self.robot_detector.detect_robot(frame)
+        self.seed(frame, self.robot_detector.circles_coordinates)
+        return robot_information
+
+    def seed(self, frame: Frame, markers):
+        """Start tracking the markers detected in the frame."""
+        frame = to_frame(frame)
+        if len(markers) != 3:
+            self.reset()
+            return
+        self.markers = numpy.array(markers, dtype=numpy.float32).reshape(3, 2)
+        self.markers_sides = calculate_markers_sides(self.markers)
+        self.previous_window_frame = frame.crop(*self.calculate_window())
+        self.tracked_frames_count = 0
+
+    @traced
+    def track(self, frame: Frame):
+        """Return the robot's position and orientation in the frame.
+
+        :raises RobotNotFound: When the markers can not be tracked anymore
+        """
+        frame = to_frame(frame)
+        if not self.is_tracking or self.tracked_frames_count >= self.redetection_interval:
+            self.reset()
+            raise RobotNotFound
+
+        window_frame = frame.crop(*self.calculate_window())
+        if (window_frame.offset, window_frame.shape) != (self.previous_window_frame.offset,
+                                                         self.previous_window_frame.shape):
+            self.reset()
+            raise RobotNotFound
+
+        markers = self.follow_markers(self.previous_window_frame.gray, window_frame.gray,
+                                      self.markers - window_frame.offset)
+        if markers is None:
+            self.reset()
+            raise RobotNotFound
+        if not self.are_markers_colored(window_frame, markers):
+            self.reset()
+            raise RobotNotFound
+        markers += window_frame.offset
+        side_changes = numpy.abs(calculate_markers_sides(markers) - self.markers_sides) / self.markers_sides
+        if numpy.any(side_changes > constants.ROBOT_FLOW_MAXIMAL_SIDE_CHANGE):
+            self.reset()
+            raise RobotNotFound
+
+        self.markers = markers
+        self.previous_window_frame = frame.crop(*self.calculate_window())
+        self.tracked_frames_count += 1
+
+        self.robot_detector.reset_information()
+        self.robot_detector.circles_coordinates = [tuple(marker) for marker in markers.tolist()]
+        self.robot_detector.detect_robot_position()
+        self.robot_detector.detect_robot_orientation()
+        return [self.robot_detector.robot_position, self.robot_detector.robot_orientation]
+
+    @staticmethod
+    def follow_markers(previous_gray: numpy.ndarray, gray: numpy.ndarray, markers: numpy.ndarray):
+        """Return where the markers moved, or ``None`` when one of them was
+           lost (its flow failed or tracking it back misses its start)."""
+        markers = markers.reshape(-1, 1, 2).astype(numpy.float32)
+        moved_markers, status, _ = cv2.calcOpticalFlowPyrLK(previous_gray, gray, markers, None,
+                                                            **ROBOT_FLOW_PARAMETERS)
+        if moved_markers is None or not numpy.all(status):
+            return None
+        returned_markers, status, _ = cv2.calcOpticalFlowPyrLK(gray, previous_gray, moved_markers, None,
+                                                               **ROBOT_FLOW_PARAMETERS)
+        if returned_markers is None or not numpy.all(status):
+            return None
+        if numpy.any(numpy.linalg.norm(returned_markers - markers, axis=2) > constants.ROBOT_FLOW_MAXIMAL_ERROR):
+            return None
+        return moved_markers.reshape(-1, 2)
+
+    @staticmethod
+    def are_markers_colored(window_frame: Frame, markers: numpy.ndarray) -> bool:
+        """Return whether the markers (in the window's coordinates) are still
+           on magenta pixels, since the flow of a hidden marker may stick to
+           the background."""
+        columns, rows = numpy.round(markers).astype(int).T
+        height, width = window_frame.shape[:2]
+        if numpy.any((columns < 0) | (columns >= width) | (rows < 0) | (rows >= height)):
+            return False
+        return bool(numpy.all(window_frame.get_class_mask(MAGENTA)[rows, columns]))
+
+    def calculate_window(self):
+        left, top = numpy.floor(self.markers.min(axis=0)) - constants.ROBOT_FLOW_MARGIN
+        right, bottom = numpy.ceil(self.markers.max(axis=0)) + constants.ROBOT_FLOW_MARGIN
+        return int(left), int(top), int(right), int(bottom)
+
+
+def find_markers_blobs(frame: Frame) -> Blobs:
+    """Find the blobs of the markers' color, without their isolated pixels."""
+    markers_mask = cv2.morphologyEx(frame.get_class_mask(MAGENTA), cv2.MORPH_OPEN, numpy.ones((3, 3), numpy.uint8))
+    return find_blobs(markers_mask, frame.offset)
+
+
+def calculate_robot_orientation(position, markers) -> float:
+    """Return the orientation of the robot from its center and its three
+       markers."""
+    points = numpy.array(markers, dtype=float)
+    sides = calculate_triangles_sides(distance.cdist(points, points), numpy.array([[0, 1, 2]]))
+    # The marker facing the front is the one opposite to the shortest edge
+    front_marker = markers[numpy.argmin(sides[0])]
+    return round((180 - convert_to_degrees(calculate_angle(position, front_marker))) * -1, 2)
+
+
+def calculate_markers_sides(markers: numpy.ndarray) -> numpy.ndarray:
+    points = numpy.asarray(markers, dtype=float)
+    return calculate_triangles_sides(distance.cdist(points, points), numpy.array([[0, 1, 2]]))[0]
+
+
+def calculate_triangles_sides(distances: numpy.ndarray, triplets: numpy.ndarray) -> numpy.ndarray:
+    """Return the length of the side opposite to each vertex of the triangles.
+
+    :param distances: The distances between every pair of points
+    :param triplets: The indices of the three points of every triangle
+    """
+    first, second, third = triplets.T
+    return numpy.column_stack((distances[second, third], distances[first, third], distances[first, second]))
+
+
+def calculate_triangles_areas(sides: numpy.ndarray) -> numpy.ndarray:
+    semi_perimeters = sides.sum(axis=1) / 2
+    products = semi_perimeters * numpy.prod(semi_perimeters[:, numpy.newaxis] - sides, axis=1)
+    return numpy.sqrt(numpy.maximum(products, 0))
+
+
+def calculate_markers_geometry_scores(sides: numpy.ndarray,
+                                      areas: numpy.ndarray,
+                                      minimal_area: float = constants.ROBOT_TRIANGLE_MINIMAL_AREA,
+                                      maximal_area: float = constants.ROBOT_TRIANGLE_MAXIMAL_AREA) -> numpy.ndarray:
+    """Score how far the triangles are from the robot's markers (lower is
+       closer).
+
+    The markers form an isosceles triangle (the front marker is opposite to
+    its shortest edge) whose area is within the expected range.
+    """
+    expected_area = (minimal_area + maximal_area) / 2
+    area_tolerance = (maximal_area - minimal_area) / 2
+    area_errors = numpy.abs(areas - expected_area) / area_tolerance
+
+    long_sides = numpy.sort(sides, axis=1)[:, 1:]
+    symmetry_errors = (long_sides[:, 1] - long_sides[:, 0]) / long_sides.mean(axis=1)
+    return area_errors + symmetry_errors
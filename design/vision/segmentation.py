@@ -0,0 +1,82 @@
+import sys
+from functools import lru_cache
+
+import cv2
+import numpy
+
+from typing import Tuple
+
+from design.vision.constants import MAX_GREEN, MAX_MAGENTA, MIN_GREEN, MIN_MAGENTA
+
+MAGENTA = 'magenta'
+GREEN = 'green'
+PAINTING_FRAME_GREEN = 'painting_frame_green'
+
+#: The (class, lower HSV bound, upper HSV bound) segmented in the world
+#: camera's frames
+WORLD_COLOR_RANGES = ((MAGENTA, tuple(MIN_MAGENTA), tuple(MAX_MAGENTA)),
+                      (GREEN, tuple(MIN_GREEN), tuple(MAX_GREEN)))
+DEFAULT_BITS_PER_CHANNEL = 6
+
+
+class ColorSegmenter:
+    """Label the pixels of BGR images with the color classes they belong to.
+
+    The HSV ranges of the classes are evaluated once on the quantized BGR
+    colors and stored in a lookup table, so labelling an image needs
+    neither a HSV conversion nor a ``cv2.inRange`` per class. A label holds
+    one bit per class since the ranges may overlap.
+    """
+
+    def __init__(self, color_ranges: Tuple[Tuple[str, tuple, tuple], ...],
+                 bits_per_channel: int = DEFAULT_BITS_PER_CHANNEL) -> None:
+        if len(color_ranges) > 8:
+            raise ValueError('A segmenter can not hold more than 8 color classes')
+        self.bits_per_channel = bits_per_channel
+        self.class_bits = {name: 1 << index for index, (name, _, _) in enumerate(color_ranges)}
+        self.lookup_table = self.__build_lookup_table(color_ranges)
+
+    def __build_lookup_table(self, color_ranges):
+        shift = 8 - self.bits_per_channel
+        levels = numpy.arange(1 << self.bits_per_channel, dtype=numpy.uint8)
+        # Every quantized color is represented by the center of its bin
+        centers = (levels << shift) + (1 << shift >> 1)
+        blue, green, red = numpy.meshgrid(centers, centers, centers, indexing='ij')
+        colors = numpy.dstack((blue.ravel(), green.ravel(), red.ravel()))
+        hsv_colors = cv2.cvtColor(colors, cv2.COLOR_BGR2HSV)
+
+        indices = self.__quantize(colors).ravel()
+        lookup_table = numpy.zeros(self.__quantize(numpy.full((1, 1, 3), 255, numpy.uint8))[0, 0] + 1, numpy.uint8)
+        for name, minimal_color_range, maximal_color_range in color_ranges:
+            mask = cv2.inRange(hsv_colors, tuple(minimal_color_range), tuple(maximal_color_range))
+            lookup_table[indices[mask.ravel() > 0]] |= self.class_bits[name]
+        return lookup_table
+
+    def __quantize(self, image):
+        # The quantized channels are packed in an integer by viewing the
+        # BGRA pixels as 32 bits integers, which is cheaper than combining the
+        # channels with NumPy
+        packed_image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA).view(numpy.uint32)[..., 0]
+        packed_image >>= 8 - self.bits_per_channel
+        packed_image &= int.from_bytes(bytes([(1 << self.bits_per_channel) - 1] * 3 + [0]), sys.byteorder)
+        return packed_image
+
+    def label(self, image: numpy.ndarray) -> numpy.ndarray:
+        """Return the classes (one bit per class) of every pixel of the BGR
+           image."""
+        return self.lookup_table.take(self.__quantize(image))
+
+    def get_class_mask(self, labels: numpy.ndarray, name: str) -> numpy.ndarray:
+        """Return the mask (255 within the class, 0 elsewhere) of a class
+           from the labels of an image."""
+        return cv2.compare(cv2.bitwise_and(labels, self.class_bits[name]), 0, cv2.CMP_GT)
+
+    def segment(self, image: numpy.ndarray, name: str) -> numpy.ndarray:
+        return self.get_class_mask(self.label(image), name)
+
+
+@lru_cache(maxsize=None)
+def get_color_segmenter(color_ranges: Tuple[Tuple[str, tuple, tuple], ...] = WORLD_COLOR_RANGES) -> ColorSegmenter:
+    """Return the segmenter of the given color ranges, building its lookup
+       table on the first call only."""
+    return ColorSegmenter(color_ranges)
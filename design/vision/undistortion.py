@@ -0,0 +1,122 @@
+import cv2
+import numpy
+
+from typing import Tuple
+
+_undistorters = {}
+
+
+class Undistorter:
+    """Remove the lens distortion of the images of a camera.
+
+    The remap maps are computed once for the calibration and resolution and
+    stored in fixed point (``CV_16SC2``), the fastest format for
+    ``cv2.remap``.
+    """
+
+    def __init__(self, camera_matrix, distortion_coefficients, resolution: Tuple[int, int]) -> None:
+        self.camera_matrix = numpy.asarray(camera_matrix, dtype=numpy.float64)
+        self.distortion_coefficients = numpy.asarray(distortion_coefficients, dtype=numpy.float64)
+        #: The (width, height) of the images
+        self.resolution = tuple(resolution)
+        self.undistorted_camera_matrix, self.region_of_interest = cv2.getOptimalNewCameraMatrix(
+            self.camera_matrix, self.distortion_coefficients, self.resolution, 1, self.resolution)
+        self.map1 = None
+        self.map2 = None
+
+    def get_maps(self):
+        if self.map1 is None:
+            self.map1, self.map2 = cv2.initUndistortRectifyMap(self.camera_matrix, self.distortion_coefficients,
+                                                               None, self.undistorted_camera_matrix,
+                                                               self.resolution, cv2.CV_16SC2)
+        return self.map1, self.map2
+
+    def undistort_image(self, image: numpy.ndarray, crop: bool = True) -> numpy.ndarray:
+        """Return the undistorted image.
+
+        :param image: The image, of the undistorter's resolution
+        :param crop: Whether the image is cropped to its region without
+                     invalid pixels
+        """
+        map1, map2 = self.get_maps()
+        undistorted_image = cv2.remap(image, map1, map2, cv2.INTER_LINEAR)
+        if crop:
+            x, y, width, height = self.region_of_interest
+            undistorted_image = undistorted_image[y:y + height, x:x + width]
+        return undistorted_image
+
+    def undistort_points(self, points) -> numpy.ndarray:
+        """Return where the pixels of a distorted image are in the undistorted
+           (uncropped) image."""
+        return undistort_points(points, self.camera_matrix, self.distortion_coefficients,
+                                self.undistorted_camera_matrix)
+
+    def is_made_for(self, camera_matrix, distortion_coefficients, resolution) -> bool:
+        if tuple(resolution) != self.resolution or not numpy.allclose(camera_matrix, self.camera_matrix):
+            return False
+        return bool(numpy.allclose(distortion_coefficients, self.distortion_coefficients))
+
+    def save(self, file_path: str):
+        map1, map2 = self.get_maps()
+        numpy.savez(file_path,
+                    camera_matrix=self.camera_matrix,
+                    distortion_coefficients=self.distortion_coefficients,
+                    resolution=self.resolution,
+                    map1=map1,
+                    map2=map2)
+
+    def load(self, file_path: str) -> bool:
+        """Load the maps saved for the same calibration and resolution.
+
+        :returns: Whether the maps were loaded
+        """
+        try:
+            with numpy.load(file_path) as data:
+                if self.is_made_for(data["camera_matrix"], data["distortion_coefficients"], data["resolution"]):
+                    self.map1, self.map2 = data["map1"], data["map2"]
+                    return True
+        except (OSError, KeyError, ValueError):
+            pass
+        return False
+
+
+def get_undistorter(camera_matrix, distortion_coefficients, resolution: Tuple[int, int],
+                    file_path: str = None) -> Undistorter:
+    """Return the undistorter of the calibration and resolution, building its
+       maps once per process.
+
+    :param file_path: Where the maps are loaded from (and saved to when they
+                      are missing or outdated)
+    """
+    key = (numpy.asarray(camera_matrix, dtype=numpy.float64).tobytes(),
+           numpy.asarray(distortion_coefficients, dtype=numpy.float64).tobytes(),
+           tuple(resolution))
+    if key not in _undistorters:
+        undistorter = Undistorter(camera_matrix, distortion_coefficients, resolution)
+        if file_path and not undistorter.load(file_path):
+            try:
+                undistorter.save(file_path)
+            except OSError:
+                pass
+        _undistorters[key] = undistorter
+    return _undistorters[key]
+
+
+def undistort_points(points, camera_matrix, distortion_coefficients, new_camera_matrix=None) -> numpy.ndarray:
+    """Return where the pixels of a distorted image are once the distortion
+       is removed.
+
+    :param points: The (x, y) pixels
+    :param new_camera_matrix: The camera matrix of the undistorted image (the
+                              original camera matrix when ``None``)
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 1, 2)
+    if not len(points):
+        return points.reshape(-1, 2)
+    camera_matrix = numpy.asarray(camera_matrix, dtype=numpy.float64)
+    if new_camera_matrix is None:
+        new_camera_matrix = camera_matrix
+    undistorted_points = cv2.undistortPoints(points, camera_matrix,
+                                             numpy.asarray(distortion_coefficients, dtype=numpy.float64),
+                                             P=numpy.asarray(new_camera_matrix, dtype=numpy.float64))
+    return undistorted_points.reshape(-1, 2)
@@ -4,6 +4,8 @@ import numpy as np
 from functools import partial
 from math import inf
 
+from design.utils.tracing import traced, tracer
+
 from .contours import (PaintingFrameFinder,
                        filter_contours_with_predicates,
                        find_contour_with_lowest_point_distance_to_image_center,
@@ -25,6 +27,7 @@ class VerticesFinder:
         self.painting_frame_finder = kwargs.get('painting_frame_finder',
                                                 PaintingFrameFinder())
 
+    @traced
     def find_vertices(self, image):
         with StdErrOutputDisplayManager():
             try:
@@ -35,14 +38,16 @@ class VerticesFinder:
 
     def _find_vertices(self, image):
         frame_vertices = self.painting_frame_finder.find_frame_coordinates(image)
-        warped_image = self.perspective_warper.change_image_perspective(
-            image,
-            frame_vertices
-        )
+        with tracer.stage('VerticesFinder.warp'):
+            warped_image = self.perspective_warper.change_image_perspective(
+                image,
+                frame_vertices
+            )
         filtered_image = self.filter_object.filter_image(warped_image)
-        return Figure(
-            self._find_figure_vertices_from_filtered_image(filtered_image)
-        )
+        with tracer.stage('VerticesFinder.figure'):
+            return Figure(
+                self._find_figure_vertices_from_filtered_image(filtered_image)
+            )
 
     def _find_figure_vertices_from_filtered_image(self, filtered_image):
         _, contours, hierarchies = cv2.findContours(filtered_image,
@@ -65,6 +70,7 @@ class HighFrequencyFilter:
     def __init__(self):
         pass
 
+    @traced
     def filter_image(self, image):
         blurred_image = cv2.bilateralFilter(image, 9, 75, 75)
         gray_image = cv2.cvtColor(blurred_image, cv2.COLOR_BGR2GRAY)
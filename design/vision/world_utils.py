@@ -1,9 +1,9 @@
 import math
 import cv2
 import numpy as np
+from scipy.spatial import cKDTree
 
-from design.vision.constants import (MAXIMUM_ANGLE_BETWEEN_SIMILAR_ANGLES,
-                                     MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES)
+from design.vision.undistortion import get_undistorter
 
 
 def calculate_angle(point1, point2):
@@ -23,66 +23,30 @@ def calculate_norm(x1, y1, x2, y2):
     return norm
 
 
+def find_distant_points_indices(points, minimum_distance):
+    """Find the points that are not too close to a previous point.
+
+    A point is dropped when any point before it (dropped or not) is closer
+    than the minimum distance.
+
+    :param points: The points, of any shape ending with the two coordinates
+    :param minimum_distance: The minimum distance between the kept points
+    :returns: The sorted indices of the kept points
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    # `query_pairs` includes the pairs at exactly the given distance
+    close_pairs = cKDTree(points).query_pairs(np.nextafter(minimum_distance, 0), output_type='ndarray')
+    return np.setdiff1d(np.arange(len(points)), close_pairs[:, 1])
+
+
 def eliminate_duplicated_points(array, minimum_distance):
-    keep = np.ones(array.shape, dtype=bool)
-    for i, point_a in enumerate(array):
-        x1, y1 = point_a[0]
-        for k in range(i, len(array)):
-            if i != k:
-                x2, y2 = array[k][0]
-                if calculate_norm(x1, y1, x2, y2) < minimum_distance:
-                    keep[k] = False
-    array = array[keep]
-    new = list(zip(*[array[i::2] for i in range(2)]))
-    return new
+    points = np.asarray(array).reshape(-1, 2)
+    return [tuple(point) for point in points[find_distant_points_indices(points, minimum_distance)]]
 
 
 def eliminate_close_points_in_list(list_of_points, minimum_distance):
-    array = np.asarray(list_of_points)
-    keep = np.ones(array.shape, dtype=bool)
-    for i, point_a in enumerate(array):
-        x1, y1 = point_a
-        for j in range(i, len(array)):
-            if i != j:
-                x2, y2 = array[j]
-                if calculate_norm(x1, y1, x2, y2) < minimum_distance:
-                    keep[j] = False
-    array = array[keep]
-    new = list(zip(*[array[i::2] for i in range(2)]))
-    new = [list(row) for row in new]
-    return new
-
-
-def get_best_information(list_of_information):
-    already_associated_information = []
-    associated_information = {}
-    most_popular_information = 0
-    number_of_set_of_coordinates = len(list_of_information)
-    for i in range(number_of_set_of_coordinates):
-        if i not in already_associated_information:
-            associated_information[i] = []
-            for j in range(i + 1, number_of_set_of_coordinates):
-                if j not in already_associated_information:
-                    result = check_if_both_information_are_similar(list_of_information[i],
-                                                                   list_of_information[j])
-                    if result:
-                        associated_information[i].append(j)
-                        already_associated_information.append(j)
-    for key, value in associated_information.items():
-        if len(value) > len(associated_information[most_popular_information]):
-            most_popular_information = key
-
-    return list_of_information[most_popular_information]
-
-
-def check_if_both_information_are_similar(information1, information2):
-    if type(information1[0]) == list:
-        return are_obstacles_information_similar(information1, information2)
-    if type(information1[0]) == tuple:
-        if type(information1[1]) == tuple:
-            return are_drawing_zone_information_similar(information1, information2)
-        if type(information1[1]) == float:
-            return are_robot_information_similar(information1, information2)
+    points = np.asarray(list_of_points).reshape(-1, 2)
+    return points[find_distant_points_indices(points, minimum_distance)].tolist()
 
 
 def undistort_image(image, camera_matrix, distortion_coefficients):
@@ -90,12 +54,8 @@ def undistort_image(image, camera_matrix, distortion_coefficients):
         Code edited from OpenCV samples documentation
     """
     height, width = image.shape[:2]
-    undistorted_camera_matrix, region_of_interest = \
-        cv2.getOptimalNewCameraMatrix(camera_matrix, distortion_coefficients, (width, height), 1, (width, height))
-    undistorted_image = cv2.undistort(image, camera_matrix, distortion_coefficients, None, undistorted_camera_matrix)
-    x, y, width, height = region_of_interest
-    undistorted_image = undistorted_image[y:y + height, x:x + width]
-    return undistorted_image, undistorted_camera_matrix
+    undistorter = get_undistorter(camera_matrix, distortion_coefficients, (width, height))
+    return undistorter.undistort_image(image), undistorter.undistorted_camera_matrix
 
 
 def triangle_shortest_edge(triangle_coordinates):
@@ -113,14 +73,6 @@ def triangle_shortest_edge(triangle_coordinates):
     return shortest_edge
 
 
-def apply_segmentation(image, minimal_color_range, maximal_color_range):
-    hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-    segmented_image = cv2.inRange(hsv_image,
-                                  np.array(minimal_color_range, np.uint8),
-                                  np.array(maximal_color_range, np.uint8))
-    return segmented_image
-
-
 def calculate_centroid(contour):
     moment = cv2.moments(contour)
     cx, cy = 0, 0
@@ -137,69 +89,9 @@ def calculate_minimal_box_area(contour):
     return cv2.contourArea(box)
 
 
-def convert_to_degrees(angle_in_radians):
-    return (math.degrees(angle_in_radians) + 360) % 360
+def scale_to_pyramid_level(length, level):
+    return length / 2 ** level
 
 
-def are_robot_information_similar(information1, information2):
-    x1 = information1[0][0]
-    y1 = information1[0][1]
-    orientation1 = information1[1]
-    x2 = information2[0][0]
-    y2 = information2[0][1]
-    orientation2 = information2[1]
-    if abs(orientation1 - orientation2) >= MAXIMUM_ANGLE_BETWEEN_SIMILAR_ANGLES:
-        return False
-    if calculate_norm(x1, y1, x2, y2) >= MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES:
-        return False
-    return True
-
-
-def are_drawing_zone_information_similar(information1, information2):
-    answer = False
-    similar_information = {}
-    eliminated_information = []
-    if len(information1) != len(information2):
-        return False
-    else:
-        for i in range(len(information1)):
-            x1 = information1[i][0]
-            y1 = information1[i][1]
-            for j in range(i, len(information2)):
-                if j not in eliminated_information:
-                    x2 = information2[j][0]
-                    y2 = information2[j][1]
-                    if calculate_norm(x1, y1, x2, y2) <= MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES:
-                        similar_information[i] = j
-                        eliminated_information.append(j)
-                        break
-        if len(similar_information) == len(information1):
-            answer = True
-    return answer
-
-
-def are_obstacles_information_similar(information1, information2):
-    answer = False
-    similar_informations = {}
-    eliminated_information = []
-    if len(information1) != len(information2):
-        return False
-    else:
-        for i in range(len(information1)):
-            x1 = information1[i][0][0]
-            y1 = information1[i][0][1]
-            orientation1 = information1[i][1]
-            for j in range(i, len(information2)):
-                if j not in eliminated_information:
-                    x2 = information2[j][0][0]
-                    y2 = information2[j][0][1]
-                    orientation2 = information2[j][1]
-                    if orientation1 != orientation2:
-                        continue
-                    if calculate_norm(x1, y1, x2, y2) <= MAXIMUM_DISTANCE_BETWEEN_SIMILAR_COORDINATES:
-                        similar_informations[i] = j
-                        eliminated_information.append(j)
-                        break
-        if len(similar_informations) == len(information1):
-            answer = True
-    return answer
+def convert_to_degrees(angle_in_radians):
+    return (math.degrees(angle_in_radians) + 360) % 360
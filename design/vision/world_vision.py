@@ -1,15 +1,28 @@
-import cv2
+import json
 import numpy
+import time
 
+from design.utils.tracing import traced
 from design.vision.drawing_zone_detector import DrawingZoneDetector
-from design.vision.robot_detector import RobotDetector
+from design.vision.robot_detector import RobotDetector, RobotMarkersTracker, calculate_robot_orientation
 from design.vision.obstacles_detector import ObstaclesDetector
 from design.vision.conversion import Converter, calculate_table_rotation, set_top_left_world_game_zone_coordinate
 from design.vision.camera import Camera
+from design.vision.frame import Frame
 from design.vision.constants import NUMBER_OF_CAPTURES_TO_COMPARE, OBSTACLES_HEIGHT, ROBOT_HEIGHT, TABLE_WIDTH, \
-    TABLE_HEIGHT, CROP_MARGIN
-from design.vision.world_utils import get_best_information
-from design.vision.exceptions import GameMapNotFound, RobotNotFound, DrawingZoneNotFound, ObstaclesNotFound
+    TABLE_HEIGHT, CROP_MARGIN, ROBOT_SPEED, ROBOT_TRACKING_MARGIN, ROBOT_TRACKING_WINDOW_GROWTH, \
+    ROBOT_TRACKING_GROWTH_STEPS, OBSTACLE_FOOTPRINT_MARGIN, ROBOT_FOOTPRINT_MARGIN, \
+    STATIC_SCENE_MAXIMAL_REPROJECTION_ERROR
+from design.vision.consensus import find_obstacles_consensus, find_robot_consensus, create_drawing_zone_consensus, \
+    create_obstacles_consensus, create_robot_consensus
+from design.vision.exceptions import GameMapNotFound, RobotNotFound, DrawingZoneNotFound, ObstaclesNotFound, \
+    SceneChanged, ConsensusNotReached
+from design.vision.background import BackgroundModel
+from design.vision.rectification import TableRectifier
+from design.vision.change_detection import find_changed_regions, calculate_points_window, merge_windows, \
+    are_windows_overlapping, is_point_in_window
+
+DEFAULT_STATIC_SCENE_FILE_PATH = "config/calibration_information_{}_static_scene.json"
 
 
 class WorldVision:
@@ -17,13 +30,17 @@ class WorldVision:
                  obstacles_detector: ObstaclesDetector,
                  drawing_zone_detector: DrawingZoneDetector,
                  robot_detector: RobotDetector,
-                 camera: Camera):
+                 camera: Camera,
+                 robot_tracking: bool = True,
+                 incremental_game_map: bool = True,
+                 background_subtraction: bool = True,
+                 table_rectification: bool = True):
 
         self.camera = camera
         self.obstacles_detector = obstacles_detector
         self.drawing_zone_detector = drawing_zone_detector
         self.robot_detector = robot_detector
-        self.converter = Converter(table_number)
+        self.converter = Converter(table_number, (camera.settings.width, camera.settings.height))
         self.actual_frame = None
 
         self.game_map_pixels = {"drawing_zone": [],
@@ -37,128 +54,390 @@ class WorldVision:
                                "robot": [],
                                "table_corners": []}
 
+        #: The number of captures that agreed on each detected item
+        self.consensus_support = {"drawing_zone": 0,
+                                  "obstacles": 0,
+                                  "robot": 0}
+        #: The number of captures taken to detect the items
+        self.consensus_captures = {"drawing_zone": 0,
+                                   "game_items": 0}
+
         self.rotation_angle_of_table = 0.0
         self.top_left_table_coordinate = None
 
-    def get_world_game_map(self):
+        self.robot_tracking = robot_tracking
+        self.last_robot_detection_time = None
+        #: Follows the robot's markers between its detections
+        self.robot_markers_tracker = RobotMarkersTracker(robot_detector)
+        #: Whether the robot is first searched where the table differs from
+        #: its background
+        self.background_subtraction = background_subtraction
+        self.background_model = BackgroundModel()
+        #: Whether the whole table is searched for the robot on a top-down
+        #: view of its markers' plane, once the table is located
+        self.table_rectification = table_rectification
+        self.robot_table_rectifier = None
+
+        #: Whether the obstacles are only detected again where the table
+        #: changed since the last complete detection
+        self.incremental_game_map = incremental_game_map
+        self.reference_gray = None
+        self.reference_offset = None
+
+    @traced
+    def get_world_game_map(self, force_detection: bool = False):
         self.game_map_world["drawing_zone"] = []
         self.game_map_world["obstacles"] = []
+
+        if self.game_map_pixels["drawing_zone"]:
+            world_positions = self.converter.get_world_coordinates_translated_array(
+                0, self.game_map_pixels["drawing_zone"])
+            self.game_map_world["drawing_zone"] = [tuple(position) for position in world_positions]
+
+        self.detect_game_items(force_detection)
+
         self.game_map_pixels["base_obstacles"] = []
+        if self.game_map_pixels["obstacles"]:
+            obstacles_pixels = [information[0] for information in self.game_map_pixels["obstacles"]]
+            world_positions = self.converter.get_world_coordinates_translated_array(OBSTACLES_HEIGHT,
+                                                                                    obstacles_pixels)
+            base_pixels = self.converter.get_pixel_coordinates_translated_array(world_positions, 0)
+            for world_position, information in zip(world_positions, self.game_map_pixels["obstacles"]):
+                self.game_map_world["obstacles"].append([tuple(world_position), information[1]])
+            self.game_map_pixels["base_obstacles"] = [tuple(pixel) for pixel in base_pixels.tolist()]
 
-        for position in self.game_map_pixels["drawing_zone"]:
-            world_position = self.converter.get_world_coordinates_translated(0,
-                                                                             position[0],
-                                                                             position[1])
-
-            self.game_map_world["drawing_zone"].append((world_position[0], world_position[1]))
-
-        self.detect_game_items()
-
-        for information in self.game_map_pixels["obstacles"]:
-            world_information = self.converter.get_world_coordinates_translated(OBSTACLES_HEIGHT,
-                                                                                information[0][0],
-                                                                                information[0][1])
-            self.game_map_world["obstacles"].append([(world_information[0], world_information[1]), information[1]])
-            self.game_map_pixels["base_obstacles"].append(
-                self.converter.get_pixel_coordinates_translated(world_information[0], world_information[1], 0))
-
-        self.game_map_world["robot"] = [tuple(self.converter.get_world_coordinates_translated(ROBOT_HEIGHT,
-                                                                                              self.game_map_pixels[
-                                                                                                  "robot"][0][0],
-                                                                                              self.game_map_pixels[
-                                                                                                  "robot"][0][1])),
-                                        self.game_map_pixels["robot"][1]]
-        self.game_map_pixels["base_robot"] = self.converter.get_pixel_coordinates_translated(
-            self.game_map_world["robot"][0][0],
-            self.game_map_world["robot"][0][1], 0)
+        self.update_world_robot(self.game_map_pixels["robot"][1])
 
         return self.game_map_world
 
-    def detect_game_items(self):
-        obstacles_information = []
-        robot_information = []
+    @traced
+    def detect_game_items(self, force_detection: bool = False):
+        if self.incremental_game_map and not force_detection and self.reference_gray is not None:
+            try:
+                self.refresh_game_items()
+                return
+            except (SceneChanged, RobotNotFound):
+                pass
+            except Exception:
+                raise GameMapNotFound
+
+        obstacles_consensus = create_obstacles_consensus()
+        robot_consensus = create_robot_consensus()
         try:
             for picture in self.camera.take_pictures(NUMBER_OF_CAPTURES_TO_COMPARE):
-                self.apply_image_crop()
+                frame = self.apply_image_crop(Frame(picture))
                 try:
-                    obstacles_information.append(self.obstacles_detector.calculate_obstacles_information(picture))
-                    robot_information.append(self.robot_detector.detect_robot(picture))
-                except (RobotNotFound, ObstaclesNotFound):
-                    pass
+                    obstacles_consensus.add(self.obstacles_detector.calculate_obstacles_information(frame))
+                except ObstaclesNotFound:
+                    obstacles_consensus.add_failure()
+                try:
+                    robot_consensus.add(self.detect_robot(frame))
+                except RobotNotFound:
+                    robot_consensus.add_failure()
+
+                if obstacles_consensus.is_reached and robot_consensus.is_reached:
+                    break
+                if obstacles_consensus.is_impossible or robot_consensus.is_impossible:
+                    raise ConsensusNotReached
 
-            self.set_game_map(obstacles_information, robot_information)
+            self.consensus_captures["game_items"] = robot_consensus.captures_count
+            self.set_game_map(obstacles_consensus.information, robot_consensus.information)
+            self.reference_gray = frame.gray.copy()
+            self.reference_offset = frame.offset
+            if self.background_subtraction:
+                robot_window = calculate_points_window(self.game_map_pixels["robot"][0], ROBOT_FOOTPRINT_MARGIN)
+                self.background_model.learn(frame, [robot_window])
         except:
             raise GameMapNotFound
 
+    @traced
+    def refresh_game_items(self):
+        """Update the game map from a single capture.
+
+        The robot is tracked and the obstacles are only detected again in the
+        regions that changed since the reference capture (and in the
+        footprints of the obstacles touching these regions).
+
+        :raises SceneChanged: When the changes are not local
+        :raises RobotNotFound: When the robot is not found
+        """
+        frame = None
+        for picture in self.camera.take_picture():
+            frame = self.apply_image_crop(Frame(picture))
+        if frame is None or frame.offset != self.reference_offset:
+            raise SceneChanged('The capture can not be compared to the reference')
+
+        robot_information = self.track_robot(frame)
+        robot_window = calculate_points_window(robot_information[0], ROBOT_FOOTPRINT_MARGIN)
+        changed_regions = find_changed_regions(self.reference_gray, frame.gray, frame.offset, [robot_window])
+
+        obstacles_information = self.game_map_pixels["obstacles"]
+        if changed_regions:
+            footprints = [calculate_points_window([information[0], base], OBSTACLE_FOOTPRINT_MARGIN)
+                          for information, base in zip(obstacles_information, self.game_map_pixels["base_obstacles"])]
+            regions = [calculate_points_window([region[:2], region[2:]], OBSTACLE_FOOTPRINT_MARGIN)
+                       for region in changed_regions]
+            regions = merge_windows(regions + [footprint for footprint in footprints
+                                               if any(are_windows_overlapping(footprint, region)
+                                                      for region in regions)])
+            obstacles_information = self.detect_obstacles_in_regions(frame, regions)
+
+        self.game_map_pixels["obstacles"] = obstacles_information
+        self.game_map_pixels["robot"] = robot_information
+        self.game_map_pixels["robot"][1] -= self.rotation_angle_of_table
+        # The items are confirmed by the single capture refreshing them
+        self.consensus_support["obstacles"] = 1
+        self.consensus_support["robot"] = 1
+        self.consensus_captures["game_items"] = 1
+
+    def detect_obstacles_in_regions(self, frame: Frame, regions: list):
+        """Detect the obstacles again in the given regions of the frame and
+           make these regions part of the reference."""
+        obstacles_information = [information for information in self.game_map_pixels["obstacles"]
+                                 if not any(is_point_in_window(information[0], region) for region in regions)]
+        reference_x, reference_y = self.reference_offset
+        for region in regions:
+            region_frame = frame.crop(*region)
+            try:
+                obstacles_information.extend(self.obstacles_detector.calculate_obstacles_information(region_frame))
+            except ObstaclesNotFound:
+                pass
+            height, width = region_frame.gray.shape
+            left, top = region_frame.offset[0] - reference_x, region_frame.offset[1] - reference_y
+            self.reference_gray[top:top + height, left:left + width] = region_frame.gray
+        return obstacles_information
+
+    @traced
     def detect_static_items(self):
-        drawing_zone_information = []
+        drawing_zone_consensus = create_drawing_zone_consensus()
         try:
             for picture in self.camera.take_pictures(NUMBER_OF_CAPTURES_TO_COMPARE):
+                frame = Frame(picture)
                 try:
-                    drawing_zone_information.append(self.drawing_zone_detector.find_drawing_zone_vertices(picture))
-                    self.actual_frame = cv2.cvtColor(picture, cv2.COLOR_BGR2RGB)
+                    drawing_zone_consensus.add(self.drawing_zone_detector.find_drawing_zone_vertices(frame))
+                    self.actual_frame = frame.rgb
                 except DrawingZoneNotFound:
-                    pass
+                    drawing_zone_consensus.add_failure()
 
-            self.game_map_pixels["drawing_zone"] = get_best_information(drawing_zone_information)
-            self.rotation_angle_of_table = calculate_table_rotation(self.game_map_pixels["drawing_zone"])
-            self.adjust_converter()
-            self.get_table_coordinates()
+                if drawing_zone_consensus.is_reached:
+                    break
+                if drawing_zone_consensus.is_impossible:
+                    raise ConsensusNotReached
+
+            self.consensus_captures["drawing_zone"] = drawing_zone_consensus.captures_count
+            self.game_map_pixels["drawing_zone"], self.consensus_support["drawing_zone"] = \
+                drawing_zone_consensus.get_consensus()
+            self.set_static_items(self.game_map_pixels["drawing_zone"])
+            self.save_static_items()
         except:
             raise DrawingZoneNotFound
 
         return self.game_map_pixels["drawing_zone"]
 
+    def set_static_items(self, drawing_zone_pixels: list):
+        self.game_map_pixels["drawing_zone"] = drawing_zone_pixels
+        self.rotation_angle_of_table = calculate_table_rotation(drawing_zone_pixels)
+        self.adjust_converter()
+        self.get_table_coordinates()
+        if self.table_rectification:
+            self.robot_table_rectifier = TableRectifier(self.converter, ROBOT_HEIGHT)
+
+    def save_static_items(self):
+        """Save the drawing zone of the table so that it can be restored
+           without being detected again."""
+        drawing_zone_pixels = self.game_map_pixels["drawing_zone"]
+        if not all(drawing_zone_pixels):
+            return
+        static_scene = {
+            "drawing_zone_pixels": [[int(coordinate) for coordinate in pixel] for pixel in drawing_zone_pixels],
+            "drawing_zone_world": self.converter.get_world_coordinates_array(0, drawing_zone_pixels).tolist()
+        }
+        try:
+            with open(DEFAULT_STATIC_SCENE_FILE_PATH.format(self.converter.table_number), 'w') as static_scene_file:
+                json.dump(static_scene, static_scene_file)
+        except OSError:
+            pass
+
+    @traced
+    def restore_static_items(self) -> bool:
+        """Restore the saved drawing zone of the table if it is still where it
+           was saved.
+
+        The saved drawing zone is projected again with the current
+        calibration and its edges must lie on the green border of a capture.
+
+        :returns: Whether the static items were restored
+        """
+        try:
+            with open(DEFAULT_STATIC_SCENE_FILE_PATH.format(self.converter.table_number)) as static_scene_file:
+                static_scene = json.load(static_scene_file)
+            drawing_zone_pixels = [tuple(pixel) for pixel in static_scene["drawing_zone_pixels"]]
+            drawing_zone_world = static_scene["drawing_zone_world"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        projected_pixels = self.converter.get_pixel_coordinates_array(drawing_zone_world, 0)
+        if numpy.abs(projected_pixels - drawing_zone_pixels).max() > STATIC_SCENE_MAXIMAL_REPROJECTION_ERROR:
+            return False
+
+        for picture in self.camera.take_picture():
+            frame = Frame(picture)
+            if self.drawing_zone_detector.is_drawing_zone_visible(frame, drawing_zone_pixels):
+                self.actual_frame = frame.rgb
+                self.set_static_items(drawing_zone_pixels)
+                return True
+        return False
+
     def set_game_map(self,
                      obstacles_information: list,
                      robot_information: list):
 
-        self.game_map_pixels["obstacles"] = get_best_information(obstacles_information)
-        self.game_map_pixels["robot"] = get_best_information(robot_information)
+        self.game_map_pixels["obstacles"], self.consensus_support["obstacles"] = \
+            find_obstacles_consensus(obstacles_information)
+        self.game_map_pixels["robot"], self.consensus_support["robot"] = find_robot_consensus(robot_information)
         self.game_map_pixels["robot"][1] -= self.rotation_angle_of_table
+        self.last_robot_detection_time = time.monotonic()
 
+    @traced
     def detect_robot_fast(self):
         for picture in self.camera.take_picture():
-            self.actual_frame = cv2.cvtColor(picture, cv2.COLOR_BGR2RGB)
-            self.apply_image_crop()
-
-            self.game_map_pixels["robot"] = self.robot_detector.detect_robot(picture)
-
-            self.game_map_world["robot"] = [tuple(self.converter.get_world_coordinates_translated(ROBOT_HEIGHT,
-                                                                                                  self.game_map_pixels[
-                                                                                                      "robot"][0][0],
-                                                                                                  self.game_map_pixels[
-                                                                                                      "robot"][0][1])),
-                                            self.game_map_pixels["robot"][1] - self.rotation_angle_of_table]
-            self.game_map_pixels["base_robot"] = self.converter.get_pixel_coordinates_translated(
-                self.game_map_world["robot"][0][0],
-                self.game_map_world["robot"][0][1],
-                0)
+            frame = Frame(picture)
+            self.actual_frame = frame.rgb
+
+            self.game_map_pixels["robot"] = self.track_robot(self.apply_image_crop(frame))
+            self.update_world_robot(self.game_map_pixels["robot"][1] - self.rotation_angle_of_table)
 
         return self.game_map_world["robot"]
 
+    @traced
+    def track_robot(self, frame: Frame):
+        detection_time = time.monotonic()
+        robot_information = None
+        if self.robot_tracking and self.robot_markers_tracker.is_tracking:
+            try:
+                robot_information = self.robot_markers_tracker.track(frame)
+            except RobotNotFound:
+                pass
+        if robot_information is not None and self.robot_table_rectifier is not None:
+            robot_information = self.locate_robot_on_table(self.robot_markers_tracker.markers)
+
+        if robot_information is None:
+            robot_information = self.search_robot(frame, detection_time)
+            if self.robot_tracking:
+                self.robot_markers_tracker.seed(frame, self.robot_detector.circles_coordinates)
+        self.last_robot_detection_time = detection_time
+        if self.background_model.is_made_for(frame):
+            robot_window = calculate_points_window(robot_information[0], ROBOT_FOOTPRINT_MARGIN)
+            self.background_model.update(frame, [robot_window])
+        return robot_information
+
+    def search_robot(self, frame: Frame, detection_time: float):
+        if self.background_subtraction and self.background_model.is_made_for(frame):
+            for window in self.background_model.find_foreground_windows(frame):
+                try:
+                    return self.detect_robot_in_window(frame, window)
+                except RobotNotFound:
+                    pass
+
+        if self.robot_tracking and self.last_robot_detection_time is not None:
+            search_radius = self.calculate_robot_search_radius(detection_time - self.last_robot_detection_time)
+            x, y = self.game_map_pixels["robot"][0]
+            for _ in range(ROBOT_TRACKING_GROWTH_STEPS + 1):
+                window = (int(x - search_radius), int(y - search_radius),
+                          int(x + search_radius), int(y + search_radius))
+                try:
+                    return self.detect_robot_in_window(frame, window)
+                except RobotNotFound:
+                    search_radius *= ROBOT_TRACKING_WINDOW_GROWTH
+
+        return self.detect_robot(frame)
+
+    def detect_robot(self, frame: Frame):
+        """Detect the robot on the whole frame, on the rectified table when it
+           is located.
+
+        :returns: The robot's position and orientation in the capture's pixels
+                  (the markers found are kept in the detector's
+                  ``circles_coordinates``, in the capture's pixels too)
+        """
+        if self.robot_table_rectifier is None:
+            return self.robot_detector.detect_robot(frame)
+
+        self.robot_detector.detect_robot_on_table(self.robot_table_rectifier.rectify(frame))
+        return self.project_robot_on_capture()
+
+    def detect_robot_in_window(self, frame: Frame, window: tuple):
+        """Detect the robot within the given (left, top, right, bottom)
+           window of the frame, with the thresholds and the estimate of
+           :meth:`detect_robot` so the robot does not jump between them.
+        """
+        if self.robot_table_rectifier is None:
+            return self.robot_detector.detect_robot_in_window(frame, window)
+
+        self.robot_detector.detect_robot_in_window_on_table(frame, window, self.convert_robot_pixels_to_world)
+        return self.project_robot_on_capture()
+
+    def locate_robot_on_table(self, markers):
+        """Return the robot's position and orientation in the capture's pixels
+           from its markers' pixels, estimated like :meth:`detect_robot`."""
+        self.robot_detector.locate_robot_on_table(self.convert_robot_pixels_to_world(markers))
+        return self.project_robot_on_capture()
+
+    def convert_robot_pixels_to_world(self, pixels):
+        return self.converter.get_world_coordinates_translated_array(ROBOT_HEIGHT, pixels)
+
+    def project_robot_on_capture(self):
+        """Project the robot's markers found on the table (in the detector's
+           ``circles_coordinates``) on the capture.
+
+        :returns: The robot's position and orientation in the capture's pixels
+                  (the markers are kept in the capture's pixels too)
+        """
+        markers = numpy.array(self.robot_detector.circles_coordinates)
+        pixels = self.converter.get_image_coordinates_translated_array(
+            numpy.vstack((markers.mean(axis=0), markers)), ROBOT_HEIGHT)
+        self.robot_detector.circles_coordinates = [tuple(pixel) for pixel in pixels[1:].tolist()]
+        position = tuple(int(round(coordinate)) for coordinate in pixels[0])
+        return [position, calculate_robot_orientation(pixels[0], self.robot_detector.circles_coordinates)]
+
+    def calculate_robot_search_radius(self, elapsed_time: float):
+        x, y = self.game_map_world["robot"][0]
+        # Sample the scale over 10 cm since the pixel coordinates are truncated
+        pixels = self.converter.get_pixel_coordinates_translated_array([(x, y), (x + 10, y), (x, y + 10)], ROBOT_HEIGHT)
+        pixels_per_centimeter = numpy.linalg.norm(pixels[1:] - pixels[0], axis=1).max() / 10
+        return ROBOT_SPEED * elapsed_time * pixels_per_centimeter + ROBOT_TRACKING_MARGIN
+
+    def update_world_robot(self, orientation: float):
+        world_position = self.converter.get_world_coordinates_translated_array(ROBOT_HEIGHT,
+                                                                               self.game_map_pixels["robot"][0])
+        self.game_map_world["robot"] = [tuple(world_position[0]), orientation]
+        self.game_map_pixels["base_robot"] = tuple(
+            self.converter.get_pixel_coordinates_translated_array(world_position, 0).tolist()[0])
+
     def get_table_coordinates(self):
         self.game_map_world["table_corners"] = [(0, 0),
                                                 (TABLE_WIDTH, 0),
                                                 (TABLE_WIDTH, TABLE_HEIGHT),
                                                 (0, TABLE_HEIGHT)]
 
-        for point in self.game_map_world["table_corners"]:
-            table_pix = self.converter.get_pixel_coordinates_translated(int(point[0]), int(point[1]), 0)
-            self.game_map_pixels["table_corners"].append(table_pix)
+        table_pixels = self.converter.get_pixel_coordinates_translated_array(self.game_map_world["table_corners"], 0)
+        self.game_map_pixels["table_corners"] = [tuple(pixel) for pixel in table_pixels.tolist()]
 
     def adjust_converter(self):
-        temporary_world_drawing_zone = self.converter.get_world_coordinates(0,
-                                                                            self.game_map_pixels["drawing_zone"][0][0],
-                                                                            self.game_map_pixels["drawing_zone"][0][1])
+        temporary_world_drawing_zone = self.converter.get_world_coordinates_array(
+            0, self.game_map_pixels["drawing_zone"][0])[0]
         self.top_left_table_coordinate = set_top_left_world_game_zone_coordinate(
             temporary_world_drawing_zone, self.rotation_angle_of_table)
         self.converter.set_origin(self.top_left_table_coordinate[0], self.top_left_table_coordinate[1])
 
-    def apply_image_crop(self):
-        top_limit = self.game_map_pixels["table_corners"][0][1] - CROP_MARGIN
-        bottom_limit = self.game_map_pixels["table_corners"][2][1] + CROP_MARGIN
-        left_limit = self.game_map_pixels["table_corners"][0][0] - CROP_MARGIN
-        mask = numpy.zeros(self.actual_frame.shape, numpy.uint8)
-        mask[top_limit:bottom_limit, left_limit:1600] = self.actual_frame[top_limit:bottom_limit, left_limit:1600]
-        self.actual_frame = mask
+    def apply_image_crop(self, frame: Frame) -> Frame:
+        """Return a view on the table's bounding box (and a margin).
+
+        The detectors' results on the view stay in the capture's coordinates.
+        """
+        if not self.game_map_pixels["table_corners"]:
+            return frame
+        table_corners = numpy.array(self.game_map_pixels["table_corners"])
+        left, top = table_corners.min(axis=0) - CROP_MARGIN
+        right, bottom = table_corners.max(axis=0) + CROP_MARGIN
+        return frame.crop(left, top, right, bottom)
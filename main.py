@@ -25,10 +25,12 @@ from design.telemetry.commands import CommandHandler
 from design.telemetry.selectors import (ClientSelectorFactory,
                                         ServerSelectorFactory)
 from design.utils.execution_logger import ExecutionLogger
+from design.utils.tracing import tracer
 from design.vision.camera import Camera, CameraSettings
 from design.vision.drawing_zone_detector import DrawingZoneDetector
 from design.vision.obstacles_detector import ObstaclesDetector
 from design.vision.onboard_vision import OnboardVision
+from design.vision.replay import Playback, ReplayCamera
 from design.vision.robot_detector import RobotDetector
 from design.vision.vertices import HighFrequencyFilter, VerticesFinder
 from design.vision.world_vision import WorldVision
@@ -81,6 +83,11 @@ def _create_parent_parser():
                               type=int,
                               metavar='CAMERA_PORT',
                               help='The port of the camera to connect to')
+    vision_group.add_argument('-t',
+                              '--trace',
+                              action='store_true',
+                              help='Measure the durations of the vision\'s '
+                                   'stages')
     return parent_parser
 
 
@@ -105,6 +112,28 @@ def _create_main_station_parser(subparser, parent_parser):
                                      dest='host',
                                      help='The host address on which to bind '
                                           'the socket')
+    recording_group = main_station_parser.add_mutually_exclusive_group()
+    recording_group.add_argument('--record',
+                                 default=None,
+                                 type=str,
+                                 metavar='DIRECTORY',
+                                 dest='recording_directory',
+                                 help='Record the world camera\'s frames in '
+                                      'the directory')
+    recording_group.add_argument('--replay',
+                                 default=None,
+                                 type=str,
+                                 metavar='DIRECTORY',
+                                 dest='replay_directory',
+                                 help='Replay the frames recorded in the '
+                                      'directory instead of using the camera')
+    main_station_parser.add_argument('--fourcc',
+                                     default=None,
+                                     choices=('MJPG', 'YUYV'),
+                                     help='The pixel format of the world '
+                                          'camera (the device\'s default '
+                                          'when omitted, see '
+                                          'scripts/benchmark_camera.py)')
     main_station_parser.set_defaults(function=start_main_station)
     return main_station_parser
 
@@ -134,7 +163,7 @@ def start_main_station(arguments):
     obstacles_detector = ObstaclesDetector()
     robot_detector = RobotDetector()
     drawing_zone_detector = DrawingZoneDetector()
-    with Camera(arguments.camera_port, CameraSettings(width=1600, height=1200), True) as camera:
+    with create_world_camera(arguments) as camera:
         world_vision = WorldVision(arguments.table_number,
                                    obstacles_detector,
                                    drawing_zone_detector,
@@ -144,6 +173,16 @@ def start_main_station(arguments):
         sys.exit(app.exec_())
 
 
+def create_world_camera(arguments):
+    if arguments.replay_directory:
+        return ReplayCamera(arguments.replay_directory, Playback.REAL_TIME)
+    return Camera(arguments.camera_port,
+                  CameraSettings(width=1600, height=1200, fourcc=arguments.fourcc),
+                  manual_configuration=True,
+                  threaded_capture=True,
+                  recording_directory=arguments.recording_directory)
+
+
 def start_robot(arguments):
 
     logger = ExecutionLogger()
@@ -207,7 +246,7 @@ def create_command_handler(host: str,
 
 def create_onboard_vision(camera_port: int,
                           approximation_ratio: float) -> OnboardVision:
-    camera = Camera(camera_port, CameraSettings())
+    camera = Camera(camera_port, CameraSettings(), threaded_capture=True)
     vertices_finder = VerticesFinder(HighFrequencyFilter(), approximation_ratio)
     return OnboardVision(vertices_finder, camera)
 
@@ -215,4 +254,6 @@ def create_onboard_vision(camera_port: int,
 if __name__ == '__main__':
 
     arguments = parse_arguments()
+    if arguments.trace:
+        tracer.enable()
     arguments.function(arguments)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Script that measures the frame rate and the grab latency of the world
+   camera in every capture configuration.
+
+Every combination of the given pixel formats, frame rates and buffer sizes
+is opened in turn, so the fastest configuration of a table's camera can be
+chosen.
+"""
+
+import json
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from itertools import product
+
+import cv2
+
+from design.vision.camera import Camera, CameraSettings, format_capture_summary
+
+DEFAULT_FRAMES = 100
+#: The frames read before measuring, while the device adjusts its exposure
+DEFAULT_WARM_UP_FRAMES = 10
+
+
+def parse_arguments():
+    parser = ArgumentParser(formatter_class=ArgumentDefaultsHelpFormatter,
+                            prog='benchmark_camera',
+                            description='Benchmark the world camera\'s '
+                                        'capture configurations.')
+    parser.add_argument('-c',
+                        '--camera_port',
+                        default=cv2.CAP_ANY,
+                        type=int,
+                        help='The port of the camera to connect to.')
+    parser.add_argument('--resolution',
+                        nargs=2,
+                        default=(1600, 1200),
+                        type=int,
+                        metavar=('WIDTH', 'HEIGHT'),
+                        help='The captured resolution.')
+    parser.add_argument('--fourcc',
+                        nargs='+',
+                        default=['MJPG', 'YUYV'],
+                        help='The pixel formats to compare.')
+    parser.add_argument('--fps',
+                        nargs='+',
+                        default=[None],
+                        type=int,
+                        help='The frame rates to request (the device\'s '
+                             'default when omitted).')
+    parser.add_argument('--buffer-size',
+                        nargs='+',
+                        default=[None],
+                        type=int,
+                        dest='buffer_sizes',
+                        help='The driver\'s buffer sizes to compare (its '
+                             'default when omitted).')
+    parser.add_argument('-f',
+                        '--frames',
+                        default=DEFAULT_FRAMES,
+                        type=int,
+                        help='The number of frames measured per '
+                             'configuration.')
+    parser.add_argument('-o',
+                        '--output',
+                        default=None,
+                        type=str,
+                        dest='output_path',
+                        help='The JSON file in which the results are saved.')
+    return parser.parse_args()
+
+
+def measure_configuration(port: int, settings: CameraSettings, frames: int) -> dict:
+    """Capture frames with the settings and return the camera's capture
+       summary."""
+    with Camera(port, settings) as camera:
+        for _ in camera.take_pictures(DEFAULT_WARM_UP_FRAMES):
+            pass
+        camera.capture_statistics.reset()
+        for _ in camera.take_pictures(frames):
+            pass
+        return camera.summarize_capture()
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    width, height = arguments.resolution
+    results = []
+    for fourcc, fps, buffer_size in product(arguments.fourcc, arguments.fps, arguments.buffer_sizes):
+        settings = CameraSettings(width=width, height=height, fourcc=fourcc, fps=fps, buffer_size=buffer_size)
+        summary = measure_configuration(arguments.camera_port, settings, arguments.frames)
+        summary['requested'] = {'fourcc': fourcc, 'fps': fps, 'buffer_size': buffer_size}
+        results.append(summary)
+        print('{0} (requested {1}, {2} fps, buffer of {3})'.format(
+            format_capture_summary(summary), fourcc, fps, buffer_size))
+
+    fastest = max(results, key=lambda summary: summary['measured_fps'])
+    print('Fastest: {0}'.format(format_capture_summary(fastest)))
+    if arguments.output_path:
+        with open(arguments.output_path, 'w') as output_file:
+            json.dump(results, output_file, indent=4)
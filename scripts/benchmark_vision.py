@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+"""Script that measures the latency and the accuracy of the world camera's
+   detectors on the labelled sample images.
+
+The results can be saved as JSON and compared with the results of a previous
+run to flag the regressions.
+"""
+
+import json
+import sys
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from os import walk
+from os.path import isfile, join
+from timeit import default_timer
+
+import cv2
+import numpy
+from scipy.optimize import linear_sum_assignment
+
+from design.vision.camera import CameraSettings
+from design.vision.drawing_zone_detector import DrawingZoneDetector
+from design.vision.exceptions import DrawingZoneNotFound, GameMapNotFound, ObstaclesNotFound, RobotNotFound
+from design.vision.frame import Frame
+from design.vision.obstacles_detector import ObstaclesDetector
+from design.vision.robot_detector import RobotDetector
+from design.vision.world_vision import WorldVision
+
+DEFAULT_SAMPLES_DIRECTORY = join('samples', 'world_camera_samples')
+DEFAULT_REPETITIONS = 3
+DEFAULT_TABLE_NUMBER = 1
+#: The maximum distance (in pixels) between a detection and its label
+MAXIMUM_LABEL_DISTANCE = 25
+#: The relative increase of a latency percentile flagged as a regression
+DEFAULT_LATENCY_TOLERANCE = 0.1
+#: The decrease of an accuracy flagged as a regression
+DEFAULT_ACCURACY_TOLERANCE = 0.02
+
+OBSTACLES_LABELS = ('obstacle1', 'obstacle2', 'obstacle3')
+DRAWING_ZONE_LABELS = ('upper-right', 'upper-left', 'lower-right', 'lower-left')
+ROBOT_LABEL = 'robot'
+PERCENTILES = (50, 95, 99)
+COMPARED_LATENCIES = ('p50_ms', 'p95_ms', 'p99_ms')
+
+DETECTION_ERRORS = (DrawingZoneNotFound, GameMapNotFound, ObstaclesNotFound, RobotNotFound)
+
+
+def parse_arguments():
+    parser = ArgumentParser(formatter_class=ArgumentDefaultsHelpFormatter,
+                            prog='benchmark_vision',
+                            description='Benchmark the world camera\'s '
+                                        'detectors.')
+    parser.add_argument('-d',
+                        '--directory',
+                        default=DEFAULT_SAMPLES_DIRECTORY,
+                        type=str,
+                        dest='samples_directory',
+                        help='The directory containing the sample images.')
+    parser.add_argument('-r',
+                        '--repetitions',
+                        default=DEFAULT_REPETITIONS,
+                        type=int,
+                        dest='repetitions',
+                        help='The number of times each image is processed.')
+    parser.add_argument('-n',
+                        '--table-number',
+                        default=DEFAULT_TABLE_NUMBER,
+                        type=int,
+                        dest='table_number',
+                        help='The table whose calibration is used to '
+                             'benchmark the complete game map detection.')
+    parser.add_argument('-o',
+                        '--output',
+                        default=None,
+                        type=str,
+                        dest='output_path',
+                        help='The JSON file in which the results are saved.')
+    parser.add_argument('-b',
+                        '--baseline',
+                        default=None,
+                        type=str,
+                        dest='baseline_path',
+                        help='The JSON results of a previous run to which '
+                             'the results are compared.')
+    parser.add_argument('--latency-tolerance',
+                        default=DEFAULT_LATENCY_TOLERANCE,
+                        type=float,
+                        dest='latency_tolerance',
+                        help='The relative latency increase flagged as a '
+                             'regression.')
+    parser.add_argument('--accuracy-tolerance',
+                        default=DEFAULT_ACCURACY_TOLERANCE,
+                        type=float,
+                        dest='accuracy_tolerance',
+                        help='The accuracy decrease flagged as a regression.')
+    return parser.parse_args()
+
+
+class Sample:
+    """A sample image and its labelled coordinates (``None`` when it is not
+       labelled)."""
+
+    def __init__(self, path: str, image: numpy.ndarray, labels: dict = None) -> None:
+        self.path = path
+        self.image = image
+        self.labels = labels
+
+    def has_labels(self, keys) -> bool:
+        return self.labels is not None and any(key in self.labels for key in keys)
+
+    def get_labelled_points(self, keys):
+        return [tuple(self.labels[key]) for key in keys if key in self.labels]
+
+
+class SampleCamera:
+    """A camera whose every picture is the current sample image."""
+
+    def __init__(self, image: numpy.ndarray) -> None:
+        self.image = image
+        height, width = image.shape[:2]
+        self.settings = CameraSettings(width=width, height=height)
+
+    def take_pictures(self, pictures_number: int):
+        for _ in range(pictures_number):
+            yield from self.take_picture()
+
+    def take_picture(self):
+        yield self.image
+
+
+def load_samples(directory: str):
+    """Load the sample images found recursively in the given directory with
+       their labels (stored next to them in ``<image>.json``).
+
+    :param directory: The directory containing the images
+    :type directory: str
+    :return: The loaded samples
+    :rtype: list
+    """
+    samples = []
+    for root, _, files in walk(directory):
+        for filename in sorted(files):
+            if filename.endswith(('.png', '.jpg', '.jpeg')):
+                image_path = join(root, filename)
+                labels = None
+                if isfile(image_path + '.json'):
+                    with open(image_path + '.json') as labels_file:
+                        labels = json.load(labels_file)
+                samples.append(Sample(image_path, cv2.imread(image_path), labels))
+    return samples
+
+
+def measure_stage(samples, repetitions: int, detect, score=None, labels_keys=()) -> dict:
+    """Measure the latency and the accuracy of a stage on every sample.
+
+    :param samples: The samples to process
+    :param repetitions: The number of times each sample is processed
+    :param detect: The function detecting the stage's items in a sample's
+                   image (a detection error means nothing was found)
+    :param score: The function returning the distances (in pixels) between
+                  the detected items and a sample's labels, or ``None`` when
+                  the detection does not match the labels
+    :param labels_keys: The labels of the stage's items (only the samples
+                        with one of them are scored)
+    :return: The stage's results
+    :rtype: dict
+    """
+    durations = []
+    distances = []
+    matched_samples_count = 0
+    scored_samples_count = 0
+    for repetition in range(repetitions):
+        for sample in samples:
+            start = default_timer()
+            try:
+                detection = detect(sample.image)
+            except DETECTION_ERRORS:
+                detection = None
+            durations.append(default_timer() - start)
+
+            # The detectors are deterministic, the first repetition is enough
+            if repetition or score is None or not sample.has_labels(labels_keys):
+                continue
+            scored_samples_count += 1
+            sample_distances = score(detection, sample) if detection is not None else None
+            if sample_distances is not None:
+                matched_samples_count += 1
+                distances.extend(sample_distances)
+
+    results = summarize_durations(durations)
+    if scored_samples_count:
+        results['accuracy'] = matched_samples_count / scored_samples_count
+        results['mean_error_px'] = float(numpy.mean(distances)) if distances else None
+    return results
+
+
+def summarize_durations(durations) -> dict:
+    durations = numpy.array(durations) * 1000
+    results = {'frames': len(durations),
+               'mean_ms': float(durations.mean()),
+               'frames_per_second': float(1000 / durations.mean())}
+    for percentile, value in zip(PERCENTILES, numpy.percentile(durations, PERCENTILES)):
+        results['p{0}_ms'.format(percentile)] = float(value)
+    return results
+
+
+def match_points(detected_points, labelled_points):
+    """Return the distances between the labelled points and their closest
+       detected point, or ``None`` when they do not all match.
+
+    :param detected_points: The (x, y) detected points
+    :param labelled_points: The (x, y) labelled points
+    """
+    detected_points = numpy.array(detected_points, dtype=float).reshape(-1, 2)
+    labelled_points = numpy.array(labelled_points, dtype=float).reshape(-1, 2)
+    if len(detected_points) != len(labelled_points):
+        return None
+    distances = numpy.linalg.norm(labelled_points[:, numpy.newaxis] - detected_points[numpy.newaxis], axis=2)
+    labelled_indices, detected_indices = linear_sum_assignment(distances)
+    matched_distances = distances[labelled_indices, detected_indices]
+    if numpy.any(matched_distances > MAXIMUM_LABEL_DISTANCE):
+        return None
+    return matched_distances.tolist()
+
+
+def score_obstacles(obstacles_information, sample: Sample):
+    return match_points([information[0] for information in obstacles_information],
+                        sample.get_labelled_points(OBSTACLES_LABELS))
+
+
+def score_robot(robot_information, sample: Sample):
+    return match_points([robot_information[0]], [sample.labels[ROBOT_LABEL]])
+
+
+def score_drawing_zone(drawing_zone_vertices, sample: Sample):
+    return match_points(drawing_zone_vertices, sample.get_labelled_points(DRAWING_ZONE_LABELS))
+
+
+def score_game_map(game_map_pixels, sample: Sample):
+    obstacles_distances = score_obstacles(game_map_pixels['obstacles'], sample)
+    robot_distances = score_robot(game_map_pixels['robot'], sample)
+    if obstacles_distances is None or robot_distances is None:
+        return None
+    return obstacles_distances + robot_distances
+
+
+def compute_frame_planes(image: numpy.ndarray):
+    frame = Frame(image)
+    return frame.gray, frame.labels
+
+
+def create_game_map_detector(table_number: int, samples):
+    """Return the function detecting the complete game map with a table's
+       calibration, or ``None`` when the table is not calibrated."""
+    camera = SampleCamera(samples[0].image)
+    try:
+        world_vision = WorldVision(table_number, ObstaclesDetector(), DrawingZoneDetector(), RobotDetector(),
+                                   camera, incremental_game_map=False)
+    except (OSError, KeyError, ValueError):
+        return None
+
+    def detect_game_map(image: numpy.ndarray):
+        camera.image = image
+        world_vision.get_world_game_map(force_detection=True)
+        return world_vision.game_map_pixels
+
+    return detect_game_map
+
+
+def run_benchmark(samples, repetitions: int, table_number: int) -> dict:
+    """Measure every stage of the world camera's detection.
+
+    :return: The results of every stage
+    :rtype: dict
+    """
+    obstacles_detector = ObstaclesDetector()
+    robot_detector = RobotDetector()
+    drawing_zone_detector = DrawingZoneDetector()
+    # Every stage gets a new frame so its latency includes the planes it needs
+    stages = {'Frame planes': measure_stage(samples, repetitions, compute_frame_planes),
+              'DrawingZoneDetector': measure_stage(
+                  samples, repetitions,
+                  lambda image: drawing_zone_detector.find_drawing_zone_vertices(Frame(image)),
+                  score_drawing_zone, DRAWING_ZONE_LABELS),
+              'ObstaclesDetector': measure_stage(
+                  samples, repetitions,
+                  lambda image: obstacles_detector.calculate_obstacles_information(Frame(image)),
+                  score_obstacles, OBSTACLES_LABELS),
+              'RobotDetector': measure_stage(
+                  samples, repetitions,
+                  lambda image: robot_detector.detect_robot(Frame(image)),
+                  score_robot, (ROBOT_LABEL,))}
+
+    detect_game_map = create_game_map_detector(table_number, samples)
+    if detect_game_map is None:
+        print('No calibration for table {0}, the complete game map is not '
+              'benchmarked'.format(table_number), file=sys.stderr)
+    else:
+        stages['WorldVision.get_world_game_map'] = measure_stage(samples, repetitions, detect_game_map,
+                                                                 score_game_map, (ROBOT_LABEL,))
+    return stages
+
+
+def find_regressions(results: dict, baseline: dict, latency_tolerance: float, accuracy_tolerance: float):
+    """Compare the stages' results with the results of a previous run.
+
+    :param results: The stages' results
+    :param baseline: The stages' results of the previous run
+    :param latency_tolerance: The relative latency increase flagged as a
+                              regression
+    :param accuracy_tolerance: The accuracy decrease flagged as a regression
+    :return: The descriptions of the regressions
+    :rtype: list
+    """
+    regressions = []
+    for name, stage in results.items():
+        if name not in baseline:
+            continue
+        baseline_stage = baseline[name]
+        for key in COMPARED_LATENCIES:
+            if stage[key] > baseline_stage[key] * (1 + latency_tolerance):
+                regressions.append('{0}: {1} went from {2:.1f} to {3:.1f}'.format(
+                    name, key, baseline_stage[key], stage[key]))
+        if stage.get('accuracy') is not None and baseline_stage.get('accuracy') is not None:
+            if stage['accuracy'] < baseline_stage['accuracy'] - accuracy_tolerance:
+                regressions.append('{0}: accuracy went from {1:.1%} to {2:.1%}'.format(
+                    name, baseline_stage['accuracy'], stage['accuracy']))
+    return regressions
+
+
+def print_results(stages: dict):
+    for name, stage in stages.items():
+        line = ('{0}: {1} frames, p50 {2:.1f} ms, p95 {3:.1f} ms, p99 {4:.1f} ms, '
+                '{5:.1f} frames per second').format(name,
+                                                    stage['frames'],
+                                                    stage['p50_ms'],
+                                                    stage['p95_ms'],
+                                                    stage['p99_ms'],
+                                                    stage['frames_per_second'])
+        if 'accuracy' in stage:
+            line += ', accuracy {0:.1%}'.format(stage['accuracy'])
+            if stage['mean_error_px'] is not None:
+                line += ' (mean error {0:.1f} px)'.format(stage['mean_error_px'])
+        print(line)
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    sample_images = load_samples(arguments.samples_directory)
+    if not sample_images:
+        raise SystemExit('No image found in {0}'.format(arguments.samples_directory))
+    stages_results = run_benchmark(sample_images, arguments.repetitions, arguments.table_number)
+    print_results(stages_results)
+
+    if arguments.output_path:
+        with open(arguments.output_path, 'w') as output_file:
+            json.dump({'samples_directory': arguments.samples_directory,
+                       'images': len(sample_images),
+                       'repetitions': arguments.repetitions,
+                       'stages': stages_results}, output_file, indent=4)
+
+    if arguments.baseline_path:
+        with open(arguments.baseline_path) as baseline_file:
+            baseline_stages = json.load(baseline_file)['stages']
+        found_regressions = find_regressions(stages_results, baseline_stages,
+                                             arguments.latency_tolerance, arguments.accuracy_tolerance)
+        for regression in found_regressions:
+            print('REGRESSION {0}'.format(regression), file=sys.stderr)
+        if found_regressions:
+            sys.exit(1)
@@ -155,20 +155,22 @@ def create_directory(path: str):
             raise
 
 
-def write_json_file(table_number, intrinsic_matrix, rotation_vector, translation_vector):
+def write_json_file(table_number, intrinsic_matrix, rotation_vector, translation_vector, distortion_coefficients):
     calibration_data = {"intrinsic_matrix": intrinsic_matrix,
                         "rotation_vector": rotation_vector,
-                        "translation_vector": translation_vector}
+                        "translation_vector": translation_vector,
+                        "distortion_coefficients": distortion_coefficients}
     data_file_name = 'calibration_information_{}.json'.format(table_number)
     with open(data_file_name, 'w', encoding='utf-8') as output_file:
         json.dump(calibration_data, output_file)
 
 
 if __name__ == '__main__':
-    rms, matrix_camera, _, rotation_vectors, translation_vectors = calibrate(
+    rms, matrix_camera, distortion, rotation_vectors, translation_vectors = calibrate(
         './calib/*.png')
     print("The root mean square is {}\nIt should be between 0.1 and 1.0 pixels in a good calibration".format(rms))
     write_json_file(5,
                     matrix_camera.tolist(),
                     rotation_vectors[0].tolist(),
-                    translation_vectors[0].tolist())
+                    translation_vectors[0].tolist(),
+                    distortion.tolist())
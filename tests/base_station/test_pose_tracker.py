@@ -0,0 +1,65 @@
+import numpy
+
+from design.base_station.pose_tracker import MAXIMUM_CONSECUTIVE_REJECTIONS, PoseTracker, wrap_angle
+
+
+def track_straight_line(pose_tracker, speed=10, period=0.25, measurements=8):
+    for index in range(measurements):
+        timestamp = index * period
+        assert pose_tracker.update((speed * timestamp, 50), 90, timestamp)
+    return (measurements - 1) * period
+
+
+def test_that_given_constant_velocity_when_predict_pose_then_pose_is_extrapolated():
+    pose_tracker = PoseTracker()
+    last_timestamp = track_straight_line(pose_tracker)
+
+    position, heading, covariance = pose_tracker.predict_pose(last_timestamp + 0.5)
+
+    assert numpy.allclose((10 * (last_timestamp + 0.5), 50), position, atol=1)
+    assert abs(heading - 90) < 1
+    assert (3, 3) == covariance.shape
+
+
+def test_that_given_outlier_when_update_then_measurement_is_rejected_and_state_is_kept():
+    pose_tracker = PoseTracker()
+    last_timestamp = track_straight_line(pose_tracker)
+
+    accepted = pose_tracker.update((200, 50), 90, last_timestamp + 0.25)
+
+    assert not accepted
+    position, _, _ = pose_tracker.predict_pose(last_timestamp + 0.25)
+    assert abs(position[0] - 10 * (last_timestamp + 0.25)) < 1
+
+
+def test_that_given_consecutive_outliers_when_update_then_tracker_restarts_on_new_position():
+    pose_tracker = PoseTracker()
+    last_timestamp = track_straight_line(pose_tracker)
+
+    for index in range(MAXIMUM_CONSECUTIVE_REJECTIONS + 1):
+        pose_tracker.update((200, 80), 0, last_timestamp + 0.25 * (index + 1))
+
+    position, heading, _ = pose_tracker.predict_pose(pose_tracker.timestamp)
+    assert numpy.allclose((200, 80), position)
+    assert 0 == heading
+
+
+def test_that_given_time_without_measurement_when_predict_pose_then_uncertainty_grows():
+    pose_tracker = PoseTracker()
+    last_timestamp = track_straight_line(pose_tracker)
+
+    _, _, covariance = pose_tracker.predict_pose(last_timestamp)
+    _, _, later_covariance = pose_tracker.predict_pose(last_timestamp + 0.5)
+
+    assert numpy.all(numpy.diag(later_covariance) > numpy.diag(covariance))
+    assert pose_tracker.is_tracking(last_timestamp + 0.5)
+    assert not pose_tracker.is_tracking(last_timestamp + 5)
+
+
+def test_that_given_heading_crossing_half_turn_when_update_then_measurement_is_accepted():
+    pose_tracker = PoseTracker()
+    pose_tracker.update((0, 0), 178, 0)
+
+    assert pose_tracker.update((0, 0), -179, 0.25)
+    _, heading, _ = pose_tracker.predict_pose(0.25)
+    assert abs(wrap_angle(heading + 179)) < 3
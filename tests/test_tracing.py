@@ -0,0 +1,59 @@
+from design.utils.tracing import DurationHistogram, Tracer, format_summary
+
+
+def test_that_given_disabled_tracer_when_running_stages_then_nothing_is_recorded():
+    tracer = Tracer()
+
+    @tracer.traced
+    def detect():
+        return 42
+
+    with tracer.stage('stage'):
+        pass
+
+    assert 42 == detect()
+    assert {} == tracer.summarize()
+    assert tracer.take_summary() is None
+
+
+def test_that_given_enabled_tracer_when_running_stages_then_durations_are_recorded_by_name():
+    tracer = Tracer(enabled=True)
+
+    @tracer.traced
+    def detect():
+        return 42
+
+    for _ in range(3):
+        detect()
+    with tracer.stage('stage'):
+        pass
+
+    summary = tracer.summarize()
+    assert 3 == summary[detect.__qualname__]['count']
+    assert 1 == summary['stage']['count']
+
+
+def test_that_given_taken_summary_when_nothing_is_recorded_then_no_summary_is_taken():
+    tracer = Tracer(enabled=True)
+    tracer.record('stage', 0.01)
+
+    assert tracer.take_summary() is not None
+    assert tracer.take_summary() is None
+
+
+def test_that_given_durations_when_calculate_percentile_then_percentile_is_within_a_bin():
+    histogram = DurationHistogram()
+    for duration in range(1, 101):
+        histogram.record(duration / 1000)
+
+    assert 0.05 <= histogram.calculate_percentile(50) <= 0.05 * 1.3
+    assert 0.095 <= histogram.calculate_percentile(95) <= 0.1
+    assert 0.1 == histogram.calculate_percentile(100)
+
+
+def test_that_given_summary_when_format_summary_then_one_line_per_stage_is_returned():
+    tracer = Tracer(enabled=True)
+    tracer.record('first', 0.01)
+    tracer.record('second', 0.02)
+
+    assert 2 == len(format_summary(tracer.summarize()).splitlines())
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from design.vision.conversion import Converter
+
+#: A camera 2.4 m above a table, looking down on it
+CALIBRATION_INFORMATION = {"intrinsic_matrix": [[1400.0, 0.0, 800.0],
+                                                [0.0, 1400.0, 600.0],
+                                                [0.0, 0.0, 1.0]],
+                           "rotation_vector": [[3.1], [0.05], [0.02]],
+                           "translation_vector": [[-110.0], [-60.0], [240.0]]}
+
+
+@pytest.fixture
+def calibrate_table(tmpdir, monkeypatch):
+    """Return a function saving the calibration of a table in the working
+       directory (a temporary one) and returning the table's converter.
+
+    The function takes the table's number and the origin of its world
+    coordinates (the calibration's origin when ``None``).
+    """
+    tmpdir.mkdir('config')
+    monkeypatch.chdir(tmpdir)
+
+    def calibrate(table_number=1, origin=None):
+        tmpdir.join('config', 'calibration_information_{}.json'.format(table_number)).write(
+            json.dumps(CALIBRATION_INFORMATION))
+        converter = Converter(table_number)
+        if origin is not None:
+            converter.set_origin(*origin)
+        return converter
+
+    return calibrate
+
+
+@pytest.fixture
+def calibrated_table(calibrate_table):
+    return calibrate_table()
@@ -0,0 +1,73 @@
+import cv2
+import numpy
+
+from design.vision.background import BackgroundModel
+from design.vision.change_detection import is_point_in_window
+from design.vision.frame import Frame
+
+
+def create_table_image(objects=()):
+    image = numpy.full((480, 640, 3), 120, numpy.uint8)
+    cv2.rectangle(image, (100, 100), (540, 380), (40, 160, 40), 8)
+    for center in objects:
+        cv2.circle(image, center, 30, (230, 230, 230), -1)
+    return image
+
+
+def test_that_given_object_on_learned_table_when_find_foreground_windows_then_object_window_is_found():
+    background_model = BackgroundModel()
+    background_model.learn(Frame(create_table_image()))
+
+    windows = background_model.find_foreground_windows(Frame(create_table_image([(300, 200)])))
+
+    assert 1 == len(windows)
+    assert is_point_in_window((300, 200), windows[0])
+
+
+def test_that_given_cropped_frames_when_find_foreground_windows_then_windows_are_in_capture_coordinates():
+    background_model = BackgroundModel()
+    background_model.learn(Frame(create_table_image()).crop(40, 20, 600, 460))
+
+    frame = Frame(create_table_image([(450, 300)])).crop(40, 20, 600, 460)
+    windows = background_model.find_foreground_windows(frame)
+
+    assert background_model.is_made_for(frame)
+    assert not background_model.is_made_for(Frame(create_table_image()))
+    assert 1 == len(windows)
+    assert is_point_in_window((450, 300), windows[0])
+
+
+def test_that_given_updates_when_object_stays_in_ignored_window_then_object_stays_in_foreground():
+    background_model = BackgroundModel()
+    background_model.learn(Frame(create_table_image()))
+    frame = Frame(create_table_image([(300, 200)]))
+
+    for _ in range(150):
+        background_model.update(frame, [(250, 150, 350, 250)])
+
+    assert 1 == len(background_model.find_foreground_windows(frame))
+
+
+def test_that_given_updates_when_lighting_changes_then_background_follows_it():
+    background_model = BackgroundModel()
+    background_model.learn(Frame(create_table_image()))
+    brighter_frame = Frame(cv2.add(create_table_image(), numpy.full((480, 640, 3), 40, numpy.uint8)))
+
+    assert background_model.find_foreground_windows(brighter_frame)
+    for _ in range(40):
+        background_model.update(brighter_frame)
+
+    assert [] == background_model.find_foreground_windows(brighter_frame)
+
+
+def test_that_given_object_ignored_when_learn_then_object_leaving_leaves_no_ghost():
+    background_model = BackgroundModel()
+    background_model.learn(Frame(create_table_image([(300, 200)])), [(250, 150, 350, 250)])
+    empty_frame = Frame(create_table_image())
+
+    assert [] == background_model.find_foreground_windows(empty_frame)
+    background_model.update(empty_frame)
+
+    windows = background_model.find_foreground_windows(Frame(create_table_image([(300, 200)])))
+    assert 1 == len(windows)
+    assert is_point_in_window((300, 200), windows[0])
@@ -0,0 +1,31 @@
+import cv2
+import numpy
+
+from design.vision.blobs import find_blobs
+
+
+def create_image():
+    image = numpy.zeros((300, 400), numpy.uint8)
+    cv2.circle(image, (100, 120), 21, 255, 1)
+    cv2.circle(image, (250, 200), 12, 255, -1)
+    image[20:24, 300:380] = 255
+    return image
+
+
+def test_that_given_image_when_find_blobs_then_every_blob_is_found_with_offset():
+    blobs = find_blobs(create_image(), (10, 5))
+    assert 3 == len(blobs)
+    assert [[310, 25, 80, 4], [89, 104, 43, 43], [248, 193, 25, 25]] == blobs.boxes.tolist()
+    assert [[349.5, 26.5], [110.0, 125.0], [260.0, 205.0]] == blobs.centroids.tolist()
+    assert [39.5, 21.0, 12.0] == blobs.radii.tolist()
+
+
+def test_that_given_blobs_when_filter_by_radius_then_only_blobs_within_radius_are_kept():
+    blobs = find_blobs(create_image()).filter_by_radius(10, 30)
+    assert [[100.0, 120.0], [250.0, 200.0]] == blobs.centroids.tolist()
+
+
+def test_that_given_blobs_when_filter_by_area_then_only_filled_blobs_are_kept():
+    blobs = find_blobs(create_image()).filter_by_area(200)
+    assert 2 == len(blobs)
+    assert [[339.5, 21.5], [250.0, 200.0]] == blobs.centroids.tolist()
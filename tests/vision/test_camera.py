@@ -0,0 +1,178 @@
+import time
+
+import cv2
+import numpy
+import pytest
+
+import design.vision.camera as camera_module
+from design.vision.camera import FRAME_TIMEOUT, Camera, CameraSettings, CaptureStatistics, FrameRingBuffer
+
+
+def create_frame(value):
+    return numpy.full((4, 4, 3), value, numpy.uint8)
+
+
+def test_that_given_frames_when_get_latest_frame_then_latest_frame_is_returned():
+    frame_buffer = FrameRingBuffer(3)
+    for timestamp in range(5):
+        frame_buffer.put(create_frame(timestamp), timestamp)
+    timestamp, frame = frame_buffer.get_latest_frame()
+    assert 4 == timestamp
+    assert numpy.all(frame == 4)
+
+
+def test_that_given_empty_buffer_when_get_latest_frame_then_no_frame_is_returned():
+    frame_buffer = FrameRingBuffer(3)
+    _, frame = frame_buffer.get_latest_frame()
+    assert frame is None
+
+
+def test_that_given_old_frame_when_get_latest_frame_with_maximum_age_then_no_frame_is_returned():
+    frame_buffer = FrameRingBuffer(3)
+    frame_buffer.put(create_frame(0), time.monotonic() - 5)
+    _, frame = frame_buffer.get_latest_frame(max_age=1)
+    assert frame is None
+
+
+def test_that_given_full_buffer_when_put_frame_then_oldest_frame_is_recycled():
+    frame_buffer = FrameRingBuffer(2)
+    first_frame = create_frame(0)
+    assert frame_buffer.put(first_frame, 0) is None
+    assert frame_buffer.put(create_frame(1), 1) is None
+    assert frame_buffer.put(create_frame(2), 2) is first_frame
+
+
+def test_that_given_frames_when_get_frames_newer_than_timestamp_then_newer_frames_are_returned_in_order():
+    frame_buffer = FrameRingBuffer(3)
+    for timestamp in range(5):
+        frame_buffer.put(create_frame(timestamp), timestamp)
+    frames = frame_buffer.get_frames_newer_than(2)
+    assert [3, 4] == [timestamp for timestamp, _ in frames]
+    assert [3, 4] == [frame[0, 0, 0] for _, frame in frames]
+
+
+def test_that_given_no_newer_frame_when_waiting_for_frame_then_no_frame_is_returned():
+    frame_buffer = FrameRingBuffer(3)
+    frame_buffer.put(create_frame(1), 1)
+    _, frame = frame_buffer.wait_for_frame_newer_than(1, 0.01)
+    assert frame is None
+
+
+class FakeVideoCapture:
+    def __init__(self, port):
+        self.properties = {cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*'YUYV'),
+                           cv2.CAP_PROP_FRAME_WIDTH: 640,
+                           cv2.CAP_PROP_FRAME_HEIGHT: 480,
+                           cv2.CAP_PROP_FPS: 30,
+                           cv2.CAP_PROP_BUFFERSIZE: 4}
+        self.set_properties = []
+
+    def set(self, capture_property, value):
+        self.set_properties.append(capture_property)
+        self.properties[capture_property] = value
+        return True
+
+    def get(self, capture_property):
+        return self.properties.get(capture_property, 0)
+
+    def isOpened(self):
+        return True
+
+    def read(self, frame=None):
+        return True, create_frame(0)
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def video_capture(monkeypatch):
+    monkeypatch.setattr(camera_module, '_applied_device_controls', {})
+    monkeypatch.setattr(camera_module.cv2, 'VideoCapture', FakeVideoCapture)
+
+
+def test_that_given_capture_format_when_open_then_format_is_set_before_resolution_and_read_back(video_capture):
+    camera = Camera(0, CameraSettings(width=1600, height=1200, fourcc='MJPG', fps=30, buffer_size=1))
+    camera.open()
+
+    set_properties = camera.camera.set_properties
+    assert set_properties.index(cv2.CAP_PROP_FOURCC) < set_properties.index(cv2.CAP_PROP_FRAME_WIDTH)
+    assert {'fourcc': 'MJPG', 'width': 1600, 'height': 1200, 'fps': 30, 'buffer_size': 1} == camera.capture_format
+
+
+def test_that_given_unchanged_controls_when_open_again_then_controls_are_not_applied_again(video_capture):
+    camera = Camera(0, CameraSettings())
+    camera.open()
+    assert cv2.CAP_PROP_EXPOSURE in camera.camera.set_properties
+    camera.close()
+
+    camera.open()
+    assert cv2.CAP_PROP_EXPOSURE not in camera.camera.set_properties
+    camera.close()
+
+    camera.settings.exposure = 200
+    camera.open()
+    assert cv2.CAP_PROP_EXPOSURE in camera.camera.set_properties
+
+
+class RejectingVideoCapture(FakeVideoCapture):
+    def set(self, capture_property, value):
+        super().set(capture_property, value)
+        return capture_property != cv2.CAP_PROP_EXPOSURE
+
+
+def test_that_given_rejected_control_when_open_again_then_controls_are_applied_again(video_capture, monkeypatch):
+    monkeypatch.setattr(camera_module.cv2, 'VideoCapture', RejectingVideoCapture)
+    camera = Camera(0, CameraSettings())
+    camera.open()
+    camera.close()
+
+    camera.open()
+    assert cv2.CAP_PROP_EXPOSURE in camera.camera.set_properties
+
+
+def test_that_given_error_while_open_when_close_then_controls_are_applied_again(video_capture):
+    camera = Camera(0, CameraSettings())
+    with pytest.raises(RuntimeError):
+        with camera:
+            raise RuntimeError()
+
+    camera.open()
+    assert cv2.CAP_PROP_EXPOSURE in camera.camera.set_properties
+
+
+class FailingVideoCapture(FakeVideoCapture):
+    def __init__(self, port):
+        super().__init__(port)
+        self.reads = 0
+
+    def read(self, frame=None):
+        self.reads += 1
+        return False, None
+
+
+def test_that_given_failing_reads_when_capture_in_thread_then_thread_stops(video_capture, monkeypatch):
+    monkeypatch.setattr(camera_module.cv2, 'VideoCapture', FailingVideoCapture)
+    monkeypatch.setattr(camera_module, 'CAPTURE_RETRY_DELAY', 0.001)
+    camera = Camera(0, CameraSettings(), threaded_capture=True)
+    camera.open()
+    camera._capture_thread.join(FRAME_TIMEOUT)
+
+    assert not camera._capture_thread.is_alive()
+    assert camera_module.MAXIMUM_CAPTURE_FAILURES == camera.camera.reads
+    assert [] == list(camera.take_picture())
+    assert [] == list(camera.stream_pictures())
+    camera.close()
+
+
+def test_that_given_captured_frames_when_summarize_then_frame_rate_and_grab_latency_are_measured():
+    capture_statistics = CaptureStatistics()
+    for index in range(11):
+        capture_statistics.record(0.004, index * 0.05)
+
+    summary = capture_statistics.summarize()
+
+    assert 11 == summary['frames']
+    assert 20 == pytest.approx(summary['measured_fps'])
+    assert 11 == summary['grab_latency']['count']
+    assert summary['grab_latency']['mean_ms'] == pytest.approx(4)
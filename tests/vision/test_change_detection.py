@@ -0,0 +1,42 @@
+import numpy
+import pytest
+
+from design.vision.change_detection import find_changed_regions, merge_windows
+from design.vision.exceptions import SceneChanged
+
+
+def create_gray_image():
+    return numpy.full((300, 400), 100, numpy.uint8)
+
+
+def test_that_given_same_images_when_find_changed_regions_then_no_region_is_found():
+    assert [] == find_changed_regions(create_gray_image(), create_gray_image())
+
+
+def test_that_given_moved_object_when_find_changed_regions_then_changes_are_found_in_capture_coordinates():
+    reference_gray = create_gray_image()
+    reference_gray[50:80, 50:80] = 255
+    gray = create_gray_image()
+    gray[150:180, 250:280] = 255
+
+    regions = find_changed_regions(reference_gray, gray, (10, 20))
+
+    assert 2 == len(regions)
+    for (left, top, right, bottom), (x, y) in zip(sorted(regions), [(75, 85), (275, 185)]):
+        assert left < x < right and top < y < bottom
+
+
+def test_that_given_change_in_ignored_window_when_find_changed_regions_then_change_is_ignored():
+    gray = create_gray_image()
+    gray[150:180, 250:280] = 255
+    assert [] == find_changed_regions(create_gray_image(), gray, (10, 20), [(250, 160, 300, 210)])
+
+
+def test_that_given_global_change_when_find_changed_regions_then_scene_changed_is_raised():
+    with pytest.raises(SceneChanged):
+        find_changed_regions(create_gray_image(), create_gray_image() + 50)
+
+
+def test_that_given_overlapping_windows_when_merge_windows_then_they_are_merged():
+    windows = [(0, 0, 10, 10), (20, 0, 30, 10), (5, 5, 25, 8), (100, 100, 110, 110)]
+    assert [(0, 0, 30, 10), (100, 100, 110, 110)] == merge_windows(windows)
@@ -0,0 +1,74 @@
+import pytest
+
+import design.vision.consensus as consensus
+from design.vision.exceptions import ConsensusNotReached
+
+
+def test_that_given_list_of_robot_information_when_finding_consensus_then_similar_information_is_fused():
+    robot_information = [[(124, 127), 124.00],
+                         [(124, 125), 125.10],
+                         [(125, 126), 122.00],
+                         [(100, 127), 124.00]]
+    information, support = consensus.find_robot_consensus(robot_information)
+    assert [(124, 126), 124.0] == information
+    assert 3 == support
+
+
+def test_that_given_robot_orientations_around_half_turn_when_finding_consensus_then_orientations_are_similar():
+    robot_information = [[(124, 127), 179.00],
+                         [(124, 125), -179.00],
+                         [(125, 126), 178.00]]
+    information, support = consensus.find_robot_consensus(robot_information)
+    assert 179.0 == information[1]
+    assert 3 == support
+
+
+def test_that_given_list_of_drawing_zone_information_when_finding_consensus_then_vertices_are_fused():
+    drawing_zone_information = [[(412, 414), (200, 395), (244, 500), (123, 372)],
+                                [(413, 415), (203, 396), (245, 505), (125, 375)],
+                                [(412, 415), (202, 395), (244, 504), (122, 375)],
+                                [(312, 415), (202, 395), (244, 504), (122, 375)]]
+    information, support = consensus.find_drawing_zone_consensus(drawing_zone_information)
+    assert [(412, 415), (202, 395), (244, 504), (123, 375)] == information
+    assert 3 == support
+
+
+def test_that_given_list_of_obstacles_information_when_finding_consensus_then_obstacles_are_fused():
+    obstacles_information = [[[[499, 432], 'O'], [[1150, 820], 'S'], [[1407, 435], 'N']],
+                             [[[500, 428], 'O'], [[1146, 819], 'S']],
+                             [[[1143, 819], 'S'], [[505, 428], 'O'], [[1402, 436], 'N']],
+                             [[[501, 428], 'O'], [[1146, 818], 'S'], [[1407, 435], 'N']],
+                             [[[1145, 815], 'S'], [[1405, 433], 'N']],
+                             [[[503, 428], 'O'], [[1147, 818], 'N'], [[1406, 432], 'N']]]
+    information, support = consensus.find_obstacles_consensus(obstacles_information)
+    assert [[[501, 428], 'O'], [[1146, 819], 'S'], [[1407, 435], 'N']] == information
+    assert 3 == support
+
+
+def test_that_given_no_information_when_finding_consensus_then_consensus_is_not_reached():
+    with pytest.raises(ConsensusNotReached):
+        consensus.find_robot_consensus([])
+
+
+def test_that_given_agreeing_captures_when_adding_them_then_consensus_is_reached_at_required_support():
+    robot_consensus = consensus.create_robot_consensus(required_support=3)
+    robot_consensus.add([(124, 127), 124.00])
+    robot_consensus.add_failure()
+    robot_consensus.add([(300, 127), 10.00])
+    robot_consensus.add([(124, 125), 125.10])
+    assert not robot_consensus.is_reached
+    robot_consensus.add([(125, 126), 122.00])
+
+    assert robot_consensus.is_reached
+    assert 5 == robot_consensus.captures_count
+    assert ([(124, 126), 124.0], 3) == robot_consensus.get_consensus()
+
+
+def test_that_given_disagreeing_captures_when_adding_them_then_consensus_is_impossible_before_last_capture():
+    drawing_zone_consensus = consensus.create_drawing_zone_consensus(required_support=3, maximum_captures=4)
+    drawing_zone_consensus.add([(412, 414), (200, 395), (244, 500), (123, 372)])
+    assert not drawing_zone_consensus.is_impossible
+    drawing_zone_consensus.add([(312, 415), (202, 395), (244, 504), (122, 375)])
+    drawing_zone_consensus.add_failure()
+
+    assert drawing_zone_consensus.is_impossible
@@ -1,4 +1,9 @@
-from design.vision.conversion import (calculate_table_rotation,
+import numpy
+import pytest
+
+from design.vision.constants import OBSTACLES_HEIGHT, ROBOT_HEIGHT
+from design.vision.conversion import (Converter,
+                                      calculate_table_rotation,
                                       set_top_left_world_game_zone_coordinate)
 from design.vision.world_utils import calculate_norm
 
@@ -15,3 +20,99 @@ def test_that_given_drawing_zone_coordinates_when_calculate_table_angle_then_tab
     drawing_zone_coordinates2 = [(365, 342), (660, 290), (712, 585), (417, 637)]
     assert -2.86 == calculate_table_rotation(drawing_zone_coordinates)
     assert -10 == calculate_table_rotation(drawing_zone_coordinates2)
+
+
+@pytest.fixture
+def converter(calibrated_table):
+    return calibrated_table
+
+
+def test_that_given_pixels_when_get_world_coordinates_array_then_coordinates_project_back_on_pixels(converter):
+    pixels = numpy.array([[100, 200], [800, 600], [1500, 1100], [412, 977]])
+    for height in (0, OBSTACLES_HEIGHT, ROBOT_HEIGHT):
+        world_coordinates = converter.get_world_coordinates_array(height, pixels)
+        for pixel, world_coordinate in zip(pixels, world_coordinates):
+            projected_pixel = numpy.dot(converter.complete_matrix, [world_coordinate[0], world_coordinate[1],
+                                                                    -height, 1])
+            assert numpy.allclose(projected_pixel[:2] / projected_pixel[2], pixel)
+
+
+def test_that_given_pixels_and_heights_when_get_world_coordinates_array_then_each_height_is_used(converter):
+    pixels = numpy.array([[100, 200], [800, 600], [1500, 1100]])
+    heights = numpy.array([0, OBSTACLES_HEIGHT, ROBOT_HEIGHT])
+    world_coordinates = converter.get_world_coordinates_array(heights, pixels)
+    for pixel, height, world_coordinate in zip(pixels, heights, world_coordinates):
+        assert numpy.allclose(converter.get_world_coordinates_array(height, pixel)[0], world_coordinate)
+
+
+def test_that_given_lookup_maps_when_get_world_coordinates_array_then_coordinates_match_projection(converter):
+    converter.lookup_map_resolution = (1600, 1200)
+    pixels = numpy.array([[100, 200], [800, 600], [1599, 1199], [-20, 1300]])
+    expected_coordinates = converter.project_on_plane(OBSTACLES_HEIGHT, pixels)
+    assert numpy.allclose(converter.get_world_coordinates_array(OBSTACLES_HEIGHT, pixels),
+                          expected_coordinates,
+                          atol=1e-3)
+
+
+def test_that_given_lookup_maps_when_get_world_coordinates_of_fractional_pixels_then_coordinates_match_single_conversion(
+        converter):
+    pixels = numpy.array([[100.5, 200.25], [800.75, 600.5], [1598.9, 3.1]])
+    expected_coordinates = converter.project_on_plane(ROBOT_HEIGHT, pixels)
+    converter.lookup_map_resolution = (1600, 1200)
+
+    coordinates = converter.get_world_coordinates_array(ROBOT_HEIGHT, pixels)
+
+    assert numpy.allclose(coordinates, expected_coordinates, atol=1e-3)
+    for pixel, coordinate in zip(pixels, coordinates):
+        assert numpy.array_equal(coordinate, converter.get_world_coordinates(ROBOT_HEIGHT, *pixel))
+
+
+def test_that_given_saved_lookup_map_when_converter_is_created_then_lookup_map_is_loaded(converter, monkeypatch):
+    converter.lookup_map_resolution = (160, 120)
+    map_x, map_y = converter.get_lookup_map(ROBOT_HEIGHT)
+
+    new_converter = Converter(1, (160, 120))
+    monkeypatch.setattr(new_converter, 'calculate_lookup_map', pytest.fail)
+    loaded_map_x, loaded_map_y = new_converter.get_lookup_map(ROBOT_HEIGHT)
+    assert numpy.array_equal(map_x, loaded_map_x)
+    assert numpy.array_equal(map_y, loaded_map_y)
+
+
+def test_that_given_world_coordinates_when_get_pixel_coordinates_translated_array_then_pixels_match_single_conversion(
+        converter):
+    converter.set_origin(-10.5, 7.25)
+    coordinates = numpy.array([[0, 0], [230, 0], [230, 112], [0, 112], [45.3, 78.9]])
+    pixels = converter.get_pixel_coordinates_translated_array(coordinates, 0)
+    for coordinate, pixel in zip(coordinates, pixels.tolist()):
+        assert converter.get_pixel_coordinates_translated(coordinate[0], coordinate[1], 0) == tuple(pixel)
+
+
+def test_that_given_pixels_when_converting_back_and_forth_then_pixels_are_preserved(converter):
+    converter.set_origin(-10.5, 7.25)
+    pixels = numpy.array([[100, 200], [800, 600], [1500, 1100]])
+    world_coordinates = converter.get_world_coordinates_translated_array(OBSTACLES_HEIGHT, pixels)
+    pixels_back = converter.get_pixel_coordinates_translated_array(world_coordinates, OBSTACLES_HEIGHT)
+    assert numpy.abs(pixels_back - pixels).max() <= 1
+
+
+def test_that_given_distorted_calibration_when_converting_coordinates_then_coordinates_project_back(converter):
+    converter.distortion_coefficients = numpy.array([-0.2, 0.05, 0.0, 0.0, 0.0])
+    coordinates = [(10.0, 20.0), (120.0, 60.0), (200.0, 100.0)]
+
+    pixels = converter.get_pixel_coordinates_array(coordinates, OBSTACLES_HEIGHT)
+    world_coordinates = converter.get_world_coordinates_array(OBSTACLES_HEIGHT, pixels)
+
+    assert numpy.allclose(coordinates, world_coordinates, atol=0.5)
+
+
+def test_that_given_distorted_calibration_when_get_pixel_coordinates_then_pixels_match_array_conversion(converter):
+    converter.distortion_coefficients = numpy.array([-0.2, 0.05, 0.0, 0.0, 0.0])
+    converter.set_origin(-10.5, 7.25)
+    coordinates = numpy.array([[10.0, 20.0], [120.0, 60.0], [200.0, 100.0]])
+
+    pixels = converter.get_pixel_coordinates_array(coordinates, OBSTACLES_HEIGHT)
+    translated_pixels = converter.get_pixel_coordinates_translated_array(coordinates, OBSTACLES_HEIGHT)
+    for coordinate, pixel, translated_pixel in zip(coordinates, pixels.tolist(), translated_pixels.tolist()):
+        assert converter.get_pixel_coordinates(coordinate[0], coordinate[1], -OBSTACLES_HEIGHT) == tuple(pixel)
+        assert converter.get_pixel_coordinates_translated(coordinate[0], coordinate[1],
+                                                          -OBSTACLES_HEIGHT) == tuple(translated_pixel)
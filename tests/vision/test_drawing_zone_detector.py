@@ -1,6 +1,7 @@
 import json
 import os.path as path
 import cv2
+import numpy
 import pytest
 
 from design.vision.drawing_zone_detector import DrawingZoneDetector
@@ -62,3 +63,19 @@ def test_that_given_drawing_zone_coordinates_when_reorder_then_coordinates_are_r
     drawing_zone_detector.drawing_zone_coordinates = [(0, 0), (0, 100), (100, 0), (100, 100)]
     drawing_zone_detector.reorder_drawing_zone_vertices()
     assert [(0, 0), (100, 0), (100, 100), (100, 0)] == drawing_zone_detector.drawing_zone_coordinates
+
+
+def create_image_with_drawing_zone():
+    image = numpy.zeros((600, 800, 3), numpy.uint8)
+    cv2.polylines(image, [numpy.array([[200, 100], [600, 110], [590, 500], [210, 490]])], True, (0, 255, 0), 8)
+    return image
+
+
+def test_that_given_drawing_zone_on_border_when_check_visibility_then_drawing_zone_is_visible():
+    vertices = [(203, 104), (597, 113), (587, 497), (213, 486)]
+    assert DrawingZoneDetector.is_drawing_zone_visible(create_image_with_drawing_zone(), vertices)
+
+
+def test_that_given_moved_drawing_zone_when_check_visibility_then_drawing_zone_is_not_visible():
+    vertices = [(253, 144), (647, 153), (637, 537), (263, 526)]
+    assert not DrawingZoneDetector.is_drawing_zone_visible(create_image_with_drawing_zone(), vertices)
@@ -0,0 +1,55 @@
+import cv2
+import numpy
+
+from design.vision.frame import Frame, to_frame
+
+
+def create_image():
+    image = numpy.zeros((100, 200, 3), numpy.uint8)
+    image[20:40, 50:80] = (255, 0, 255)
+    return image
+
+
+def test_that_given_frame_when_getting_planes_then_planes_are_converted_once(monkeypatch):
+    frame = Frame(create_image())
+    conversions = []
+    cvt_color = cv2.cvtColor
+
+    def count_conversions(image, code):
+        conversions.append(code)
+        return cvt_color(image, code)
+
+    monkeypatch.setattr(cv2, 'cvtColor', count_conversions)
+    for _ in range(3):
+        frame.gray
+        frame.rgb
+    assert [cv2.COLOR_BGR2GRAY, cv2.COLOR_BGR2RGB] == conversions
+
+
+def test_that_given_window_when_crop_then_view_with_offset_is_returned():
+    frame = Frame(create_image())
+    frame.gray
+    cropped_frame = frame.crop(40, 10, 250, 50)
+    assert (40, 10) == cropped_frame.offset
+    assert (40, 160, 3) == cropped_frame.shape
+    assert numpy.shares_memory(frame.image, cropped_frame.image)
+    assert numpy.array_equal(frame.gray[10:50, 40:200], cropped_frame.gray)
+
+
+def test_that_given_cropped_frame_when_crop_then_window_is_in_capture_coordinates():
+    cropped_frame = Frame(create_image()).crop(40, 10, 250, 50).crop(50, 20, 80, 40)
+    assert (50, 20) == cropped_frame.offset
+    assert numpy.all(cropped_frame.image == (255, 0, 255))
+
+
+def test_that_given_frame_when_to_frame_then_same_frame_is_returned():
+    frame = Frame(create_image())
+    assert frame is to_frame(frame)
+    assert isinstance(to_frame(create_image()), Frame)
+
+
+def test_that_given_frame_when_get_pyramid_image_then_image_is_halved_at_each_level():
+    frame = Frame(create_image())
+    assert frame.image is frame.get_pyramid_image(0)
+    assert (50, 100, 3) == frame.get_pyramid_image(1).shape
+    assert (25, 50, 3) == frame.get_pyramid_image(2).shape
@@ -2,6 +2,7 @@ import json
 import os.path as path
 
 import cv2
+import numpy
 import pytest
 
 from design.vision.obstacles_detector import ObstaclesDetector
@@ -19,6 +20,19 @@ SAMPLE_JSON = list_files(WORLD_CAMERA_SAMPLES_PATH,
 SAMPLES_IMAGES_AND_JSON = dict(zip(SAMPLE_IMAGES, SAMPLE_JSON))
 
 
+@pytest.fixture
+def contours_finder(monkeypatch):
+    """Give ``cv2.findContours`` the OpenCV 3 signature used by the detectors
+       when a newer OpenCV returns the contours without the image."""
+    find_contours = cv2.findContours
+
+    def find_contours_with_image(*args, **kwargs):
+        result = find_contours(*args, **kwargs)
+        return (None,) + tuple(result) if len(result) == 2 else result
+
+    monkeypatch.setattr(cv2, 'findContours', find_contours_with_image)
+
+
 @pytest.mark.skip(reason='The images can not be extracted')
 def test_that_given_images_with_obstacles_when_find_obstacles_positions_then_all_obstacles_positions_are_found():
     image_assertion_helper = ImageAssertionHelper(0.12)  # 0.12 is the maximum error percentage (so min is 87)
@@ -59,3 +73,43 @@ def test_that_given_images_with_obstacles_when_find_obstacles_positions_then_all
             expected_coordinates=obstacles_coordinates
         )
     image_assertion_helper.assert_below_threshold()
+
+
+def create_obstacles_image():
+    image = numpy.full((600, 800, 3), 40, numpy.uint8)
+    cv2.circle(image, (200, 300), 40, (255, 255, 255), -1)
+    cv2.circle(image, (550, 250), 40, (255, 255, 255), -1)
+    image = cv2.GaussianBlur(image, (9, 9), 0)
+    cv2.fillPoly(image, [numpy.array([(180, 280), (180, 320), (235, 300)])], (0, 0, 0))
+    cv2.circle(image, (550, 250), 21, (0, 0, 0), 2)
+    return image
+
+
+def test_that_given_triangular_and_round_obstacles_when_calculate_obstacles_information_then_both_are_found(
+        contours_finder):
+    obstacles_information = ObstaclesDetector().calculate_obstacles_information(create_obstacles_image())
+
+    # The obstacles found by the detector before it was made a single pass
+    assert [[[550, 250], 'O'], [[198, 299], 'N']] == obstacles_information
+
+
+@pytest.mark.parametrize('pyramid_level', [1, 2])
+def test_that_given_pyramid_level_when_calculate_obstacles_information_then_full_resolution_obstacles_are_found(
+        contours_finder, pyramid_level):
+    obstacles_information = ObstaclesDetector(pyramid_level).calculate_obstacles_information(create_obstacles_image())
+
+    assert ObstaclesDetector().calculate_obstacles_information(create_obstacles_image()) == obstacles_information
+
+
+def test_that_given_obstacle_top_edge_touching_side_edge_when_calculate_obstacles_information_then_top_is_found(
+        contours_finder, monkeypatch):
+    edges_image = numpy.zeros((300, 300), numpy.uint8)
+    cv2.circle(edges_image, (100, 100), 21, 255, 1)
+    cv2.line(edges_image, (121, 100), (121, 180), 255, 1)
+    obstacles_detector = ObstaclesDetector()
+    monkeypatch.setattr(obstacles_detector, '_ObstaclesDetector__refine_image_contours', lambda frame: edges_image)
+
+    obstacles_information = obstacles_detector.calculate_obstacles_information(
+        cv2.cvtColor(edges_image, cv2.COLOR_GRAY2BGR))
+
+    assert [[[100, 100], 'O']] == obstacles_information
@@ -0,0 +1,55 @@
+import cv2
+import numpy
+import pytest
+
+from design.vision.blobs import find_blobs
+from design.vision.constants import ROBOT_HEIGHT
+from design.vision.frame import Frame
+from design.vision.rectification import TableRectifier
+
+
+@pytest.fixture
+def converter(calibrate_table):
+    # Put the table within the captures
+    return calibrate_table(origin=(0, -150))
+
+
+def create_picture(converter, world_points, height):
+    picture = numpy.zeros((1200, 1600, 3), numpy.uint8)
+    for pixel in converter.get_image_coordinates_translated_array(world_points, height):
+        cv2.circle(picture, tuple(int(round(coordinate)) for coordinate in pixel), 8, (255, 255, 255), -1)
+    return picture
+
+
+def find_spots(rectified_frame):
+    blobs = find_blobs(cv2.threshold(rectified_frame.gray, 127, 255, cv2.THRESH_BINARY)[1])
+    return rectified_frame.to_world(blobs.centroids)
+
+
+def test_that_given_spots_on_plane_when_rectify_then_spots_are_at_their_world_coordinates(converter):
+    world_points = [(30, 20), (200, 95)]
+    rectifier = TableRectifier(converter, ROBOT_HEIGHT)
+
+    rectified_frame = rectifier.rectify(Frame(create_picture(converter, world_points, ROBOT_HEIGHT)))
+
+    assert rectifier.size == rectified_frame.shape[1::-1]
+    assert numpy.allclose(world_points, find_spots(rectified_frame), atol=0.5)
+
+
+def test_that_given_cropped_frame_when_rectify_then_view_matches_full_frame(converter):
+    picture = create_picture(converter, [(110, 60)], ROBOT_HEIGHT)
+    rectifier = TableRectifier(converter, ROBOT_HEIGHT)
+
+    rectified_frame = rectifier.rectify(Frame(picture))
+    cropped_rectified_frame = rectifier.rectify(Frame(picture).crop(100, 300, 1500, 1150))
+
+    assert numpy.allclose(find_spots(rectified_frame), find_spots(cropped_rectified_frame))
+    assert 2 == len(rectifier.maps)
+
+
+def test_that_given_rectified_frame_when_to_pixels_then_world_coordinates_map_back_on_pixels(converter):
+    rectified_frame = TableRectifier(converter, 0, pixels_per_centimeter=2, margin=10).rectify(
+        Frame(numpy.zeros((1200, 1600, 3), numpy.uint8)))
+
+    assert numpy.allclose([[0, 0], [20, 20]], rectified_frame.to_pixels([(-10, -10), (0, 0)]))
+    assert numpy.allclose([[0, 0]], rectified_frame.to_world(rectified_frame.to_pixels([(0, 0)])))
@@ -0,0 +1,138 @@
+import time
+
+import numpy
+import pytest
+
+from design.vision import camera as camera_module
+from design.vision.camera import Camera, CameraSettings
+from design.vision.frame_store import FRAMES_FILE_NAME, FrameStore, FrameStoreWriter
+from design.vision.replay import Playback, ReplayCamera
+
+
+def create_frame(value):
+    return numpy.full((6, 8, 3), value, numpy.uint8)
+
+
+def record_frames(directory, timestamps):
+    with FrameStoreWriter(str(directory)) as writer:
+        for value, timestamp in enumerate(timestamps):
+            writer.write(create_frame(value), timestamp)
+
+
+class FakeVideoCapture:
+    def __init__(self, port):
+        self.frames_count = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, frame=None):
+        self.frames_count += 1
+        return True, create_frame(self.frames_count)
+
+    def set(self, property_id, value):
+        pass
+
+    def get(self, property_id):
+        return 0
+
+    def release(self):
+        pass
+
+
+def test_that_given_recorded_frames_when_reading_frame_store_then_frames_are_memory_mapped(tmpdir):
+    record_frames(tmpdir, [0.5, 1.5, 2.5])
+
+    frame_store = FrameStore(str(tmpdir))
+
+    assert 3 == len(frame_store)
+    assert isinstance(frame_store.frames, numpy.memmap)
+    timestamp, frame = frame_store[2]
+    assert 2.5 == timestamp
+    assert (6, 8, 3) == frame.shape
+    assert numpy.all(frame == 2)
+
+
+def test_that_given_frame_of_other_shape_when_write_then_error_is_raised(tmpdir):
+    with FrameStoreWriter(str(tmpdir)) as writer:
+        writer.write(create_frame(0), 0)
+        with pytest.raises(ValueError):
+            writer.write(numpy.zeros((2, 2, 3), numpy.uint8), 1)
+
+
+def test_that_given_existing_recording_when_write_then_frames_are_appended(tmpdir):
+    record_frames(tmpdir, [0.5, 1.5])
+    with open(str(tmpdir.join(FRAMES_FILE_NAME)), 'ab') as frames_file:
+        frames_file.write(b'incomplete frame')
+    record_frames(tmpdir, [2.5])
+
+    frame_store = FrameStore(str(tmpdir))
+
+    assert [0.5, 1.5, 2.5] == [timestamp for timestamp, _ in frame_store]
+    assert numpy.array_equal(create_frame(0), frame_store[2][1])
+
+
+def test_that_given_recording_of_other_shape_when_write_then_error_is_raised(tmpdir):
+    record_frames(tmpdir, [0.5])
+    with FrameStoreWriter(str(tmpdir)) as writer:
+        with pytest.raises(ValueError):
+            writer.write(numpy.zeros((2, 2, 3), numpy.uint8), 1.5)
+
+
+def test_that_given_fast_playback_when_take_pictures_then_every_frame_is_yielded_in_order(tmpdir):
+    record_frames(tmpdir, [0, 10, 20, 30])
+
+    with ReplayCamera(str(tmpdir), Playback.FAST) as camera:
+        pictures = list(camera.take_pictures(10))
+
+    assert [0, 1, 2, 3] == [picture[0, 0, 0] for picture in pictures]
+    assert 8 == camera.settings.width
+    assert 6 == camera.settings.height
+
+
+def test_that_given_loop_when_stream_pictures_then_session_restarts(tmpdir):
+    record_frames(tmpdir, [0, 1])
+
+    with ReplayCamera(str(tmpdir), Playback.FAST, loop=True) as camera:
+        pictures = list(camera.take_pictures(5))
+
+    assert [0, 1, 0, 1, 0] == [picture[0, 0, 0] for picture in pictures]
+
+
+def test_that_given_fixed_rate_playback_when_consumer_is_late_then_due_frames_are_skipped(tmpdir):
+    record_frames(tmpdir, range(5))
+
+    with ReplayCamera(str(tmpdir), Playback.FIXED_RATE, frame_rate=100) as camera:
+        first_picture = next(camera.take_picture())
+        time.sleep(0.025)
+        late_picture = next(camera.take_picture())
+
+    assert 0 == first_picture[0, 0, 0]
+    assert 2 <= late_picture[0, 0, 0]
+
+
+def test_that_given_real_time_playback_when_take_pictures_then_recorded_timing_is_kept(tmpdir):
+    record_frames(tmpdir, [100.0, 100.03, 100.06])
+
+    with ReplayCamera(str(tmpdir), Playback.REAL_TIME) as camera:
+        start_time = time.monotonic()
+        pictures = list(camera.take_pictures(3))
+        elapsed_time = time.monotonic() - start_time
+
+    assert [0, 1, 2] == [picture[0, 0, 0] for picture in pictures]
+    assert elapsed_time >= 0.055
+
+
+def test_that_given_recording_directory_when_taking_pictures_then_replay_yields_same_pictures(tmpdir, monkeypatch):
+    monkeypatch.setattr(camera_module.cv2, 'VideoCapture', FakeVideoCapture)
+    camera = Camera(0, CameraSettings(), manual_configuration=True, recording_directory=str(tmpdir))
+
+    with camera:
+        pictures = list(camera.take_pictures(3))
+
+    with ReplayCamera(str(tmpdir), Playback.FAST) as replay_camera:
+        replayed_pictures = list(replay_camera.take_pictures(3))
+
+    assert len(pictures) == len(replayed_pictures) == 3
+    for picture, replayed_picture in zip(pictures, replayed_pictures):
+        assert numpy.array_equal(picture, replayed_picture)
@@ -2,11 +2,15 @@ import json
 import os.path as path
 
 import cv2
+import numpy
 import pytest
 
 from tests.utils import (ImageAssertionHelper,
                          list_files)
-from design.vision.robot_detector import RobotDetector
+from design.vision.frame import Frame
+from design.vision.rectification import RectifiedFrame
+from design.vision.exceptions import RobotNotFound
+from design.vision.robot_detector import RobotDetector, RobotMarkersTracker
 
 WORLD_CAMERA_SAMPLES_PATH = path.join('samples', 'world_camera_samples')
 SAMPLE_IMAGES = list_files(WORLD_CAMERA_SAMPLES_PATH,
@@ -48,3 +52,124 @@ def test_that_given_circles_coordinates_when_keep_valid_coordinates_then_valid_c
                                           (478, 212)]
     robot_detector.keep_valid_coordinates()
     assert [(296, 798), (245, 741), (291, 723)] == robot_detector.circles_coordinates
+
+
+def test_that_given_window_when_detect_robot_in_window_then_only_window_is_searched(monkeypatch):
+    robot_detector = RobotDetector()
+    frame = numpy.zeros((1200, 1600, 3), numpy.uint8)
+
+    def detect_robot(window_frame):
+        assert (200, 300, 3) == window_frame.shape
+        assert (0, 1000) == window_frame.offset
+        return [(30, 1040), 45.0]
+
+    monkeypatch.setattr(robot_detector, 'detect_robot', detect_robot)
+    assert [(30, 1040), 45.0] == robot_detector.detect_robot_in_window(frame, (-100, 1000, 300, 1300))
+
+
+def test_that_given_coarse_circle_center_when_refine_circle_center_then_center_is_moved_on_marker():
+    image = numpy.zeros((200, 200, 3), numpy.uint8)
+    cv2.circle(image, (103, 97), 12, (255, 0, 255), -1)
+    cx, cy = RobotDetector.refine_circle_center(Frame(image), 100, 100, 20)
+    assert abs(cx - 103) < 0.5
+    assert abs(cy - 97) < 0.5
+
+
+def test_that_given_two_valid_triangles_when_keep_valid_coordinates_then_most_symmetric_triangle_is_kept():
+    robot_detector = RobotDetector()
+    robot_detector.circles_coordinates = [(0, 0),
+                                          (40, 0),
+                                          (100, 100),
+                                          (500, 500),
+                                          (540, 500),
+                                          (520, 597)]
+    robot_detector.keep_valid_coordinates()
+    assert [(500, 500), (540, 500), (520, 597)] == robot_detector.circles_coordinates
+
+
+def test_that_given_markers_when_detect_robot_orientation_then_front_marker_gives_orientation():
+    robot_detector = RobotDetector()
+    robot_detector.circles_coordinates = [(500, 500), (540, 500), (520, 597)]
+    robot_detector.detect_robot_position()
+    robot_detector.detect_robot_orientation()
+    assert (520, 532) == robot_detector.robot_position
+    assert 90.0 == robot_detector.robot_orientation
+
+
+def test_that_given_image_with_markers_when_find_circles_then_markers_centers_are_found(monkeypatch):
+    robot_detector = RobotDetector()
+    monkeypatch.setattr(robot_detector, 'segment_frame', lambda frame: frame.image)
+    image = numpy.zeros((300, 300, 3), numpy.uint8)
+    cv2.circle(image, (100, 100), 14, (255, 0, 255), -1)
+    cv2.circle(image, (200, 150), 14, (255, 0, 255), -1)
+    cv2.circle(image, (50, 250), 4, (255, 0, 255), -1)
+    robot_detector.find_circles(Frame(image).crop(20, 20, 300, 300))
+    assert [(100.0, 100.0), (200.0, 150.0)] == robot_detector.circles_coordinates
+
+
+def create_robot_image(markers, shape=(400, 500)):
+    image = numpy.full(shape + (3,), 90, numpy.uint8)
+    for x in range(0, shape[1], 25):
+        cv2.line(image, (x, 0), (x, shape[0] - 1), (60, 60, 60), 2)
+    for center in markers:
+        cv2.circle(image, center, 14, (255, 0, 255), -1)
+    return cv2.GaussianBlur(image, (5, 5), 0)
+
+
+def test_that_given_moved_markers_when_track_then_robot_is_followed_without_detection(monkeypatch):
+    markers = [(200, 150), (240, 150), (220, 247)]
+    tracker = RobotMarkersTracker(RobotDetector())
+    tracker.seed(Frame(create_robot_image(markers)), markers)
+    monkeypatch.setattr(tracker.robot_detector, 'find_circles', lambda frame: pytest.fail('detected'))
+
+    moved_markers = [(x + 6, y - 4) for x, y in markers]
+    position, orientation = tracker.detect_robot(Frame(create_robot_image(moved_markers)))
+
+    assert numpy.allclose((226, 178), position, atol=1)
+    assert abs(orientation - 90) < 2
+    assert 1 == tracker.tracked_frames_count
+
+
+def test_that_given_deformed_markers_triangle_when_track_then_robot_is_not_found():
+    markers = [(200, 150), (240, 150), (220, 247)]
+    tracker = RobotMarkersTracker(RobotDetector())
+    tracker.seed(Frame(create_robot_image(markers)), markers)
+
+    with pytest.raises(RobotNotFound):
+        tracker.track(Frame(create_robot_image([(200, 150), (240, 150), (220, 215)])))
+    assert not tracker.is_tracking
+
+
+def test_that_given_hidden_marker_when_track_then_robot_is_not_found():
+    markers = [(200, 150), (240, 150), (220, 247)]
+    tracker = RobotMarkersTracker(RobotDetector())
+    tracker.seed(Frame(create_robot_image(markers)), markers)
+
+    with pytest.raises(RobotNotFound):
+        tracker.track(Frame(create_robot_image(markers[:2])))
+
+
+def test_that_given_redetection_interval_when_tracked_enough_frames_then_robot_is_not_tracked():
+    markers = [(200, 150), (240, 150), (220, 247)]
+    image = create_robot_image(markers)
+    tracker = RobotMarkersTracker(RobotDetector(), redetection_interval=2)
+    tracker.seed(Frame(image), markers)
+
+    tracker.track(Frame(image))
+    tracker.track(Frame(image))
+    with pytest.raises(RobotNotFound):
+        tracker.track(Frame(image))
+
+
+def test_that_given_rectified_table_when_detect_robot_on_table_then_robot_is_found_in_world_coordinates():
+    markers = [(50, 40), (60, 40), (55, 49.7)]
+    image = numpy.full((500, 1000, 3), 90, numpy.uint8)
+    rectified_frame = RectifiedFrame(image, 15, 4, (-5, -5))
+    for pixel in rectified_frame.to_pixels(markers):
+        cv2.circle(image, tuple(int(round(coordinate)) for coordinate in pixel), 8, (255, 0, 255), -1)
+    cv2.circle(image, (600, 300), 3, (255, 0, 255), -1)
+
+    position, orientation = RobotDetector().detect_robot_on_table(rectified_frame)
+
+    assert numpy.allclose(numpy.mean(markers, axis=0), position, atol=0.3)
+    assert abs(orientation - 90) < 2
@@ -0,0 +1,51 @@
+import cv2
+import numpy
+
+from design.vision.constants import MAX_MAGENTA, MIN_MAGENTA
+from design.vision.frame import Frame
+from design.vision.segmentation import ColorSegmenter, MAGENTA, get_color_segmenter
+
+OVERLAPPING_RANGES = (('wide', (30, 50, 50), (90, 255, 255)),
+                      ('narrow', (50, 50, 50), (70, 255, 255)))
+
+
+def create_hsv_gradient_image():
+    hues = numpy.tile(numpy.linspace(0, 179, 360), (256, 1))
+    saturations = numpy.tile(numpy.arange(256)[:, numpy.newaxis], (1, 360))
+    values = numpy.full((256, 360), 200)
+    hsv_image = numpy.dstack((hues, saturations, values)).astype(numpy.uint8)
+    return cv2.cvtColor(hsv_image, cv2.COLOR_HSV2BGR)
+
+
+def test_that_given_image_when_segment_then_mask_agrees_with_in_range():
+    image = create_hsv_gradient_image()
+    expected_mask = cv2.inRange(cv2.cvtColor(image, cv2.COLOR_BGR2HSV),
+                                numpy.array(MIN_MAGENTA, numpy.uint8),
+                                numpy.array(MAX_MAGENTA, numpy.uint8))
+    mask = get_color_segmenter().segment(image, MAGENTA)
+    assert 0.99 < numpy.mean(mask == expected_mask)
+
+
+def test_that_given_overlapping_ranges_when_label_then_pixels_belong_to_every_matching_class():
+    segmenter = ColorSegmenter(OVERLAPPING_RANGES)
+    image = numpy.zeros((1, 3, 3), numpy.uint8)
+    image[0, 0] = (0, 255, 0)
+    image[0, 1] = (0, 255, 128)
+    image[0, 2] = (255, 0, 0)
+    labels = segmenter.label(image)
+    assert [255, 255, 0] == segmenter.get_class_mask(labels, 'wide').ravel().tolist()
+    assert [255, 0, 0] == segmenter.get_class_mask(labels, 'narrow').ravel().tolist()
+
+
+def test_that_given_same_ranges_when_get_color_segmenter_then_lookup_table_is_built_once():
+    assert get_color_segmenter() is get_color_segmenter()
+
+
+def test_that_given_cropped_frame_when_get_class_mask_then_labels_are_shared():
+    image = numpy.zeros((100, 200, 3), numpy.uint8)
+    image[20:40, 50:80] = (255, 0, 255)
+    frame = Frame(image)
+    frame.labels
+    cropped_frame = frame.crop(40, 10, 100, 50)
+    assert numpy.shares_memory(frame.labels, cropped_frame.labels)
+    assert 20 * 30 == numpy.count_nonzero(cropped_frame.get_class_mask(MAGENTA))
@@ -0,0 +1,60 @@
+import cv2
+import numpy
+
+from design.vision.undistortion import Undistorter, get_undistorter, undistort_points
+from design.vision.world_utils import undistort_image
+
+CAMERA_MATRIX = numpy.array([[500.0, 0.0, 320.0],
+                             [0.0, 500.0, 240.0],
+                             [0.0, 0.0, 1.0]])
+DISTORTION_COEFFICIENTS = numpy.array([-0.25, 0.08, 0.001, -0.001, 0.0])
+RESOLUTION = (640, 480)
+
+
+def create_image():
+    image = numpy.zeros((480, 640, 3), numpy.uint8)
+    for x in range(0, 640, 40):
+        cv2.line(image, (x, 0), (x, 479), (255, 255, 255), 3)
+    for y in range(0, 480, 40):
+        cv2.line(image, (0, y), (639, y), (255, 255, 255), 3)
+    return image
+
+
+def test_that_given_image_when_undistort_image_then_image_matches_opencv_undistortion():
+    image = create_image()
+    undistorter = get_undistorter(CAMERA_MATRIX, DISTORTION_COEFFICIENTS, RESOLUTION)
+    expected_image = cv2.undistort(image, CAMERA_MATRIX, DISTORTION_COEFFICIENTS, None,
+                                   undistorter.undistorted_camera_matrix)
+
+    undistorted_image = undistorter.undistort_image(image, crop=False)
+
+    assert numpy.mean(cv2.absdiff(undistorted_image, expected_image)) < 2
+
+
+def test_that_given_same_calibration_when_get_undistorter_then_maps_are_built_once():
+    undistorter = get_undistorter(CAMERA_MATRIX, DISTORTION_COEFFICIENTS, RESOLUTION)
+    undistort_image(create_image(), CAMERA_MATRIX, DISTORTION_COEFFICIENTS)
+    assert undistorter is get_undistorter(CAMERA_MATRIX.tolist(), DISTORTION_COEFFICIENTS.tolist(), RESOLUTION)
+
+
+def test_that_given_distorted_projections_when_undistort_points_then_ideal_projections_are_found():
+    object_points = numpy.array([[-0.4, -0.3, 1.0], [0.0, 0.0, 1.0], [0.35, 0.2, 1.0]])
+    zero_vector = numpy.zeros(3)
+    distorted_points, _ = cv2.projectPoints(object_points, zero_vector, zero_vector, CAMERA_MATRIX,
+                                            DISTORTION_COEFFICIENTS)
+    ideal_points, _ = cv2.projectPoints(object_points, zero_vector, zero_vector, CAMERA_MATRIX, None)
+
+    points = undistort_points(distorted_points.reshape(-1, 2), CAMERA_MATRIX, DISTORTION_COEFFICIENTS)
+
+    assert numpy.allclose(ideal_points.reshape(-1, 2), points, atol=0.05)
+
+
+def test_that_given_saved_maps_when_load_then_maps_are_loaded_only_for_same_calibration(tmpdir):
+    file_path = str(tmpdir.join('maps.npz'))
+    undistorter = Undistorter(CAMERA_MATRIX, DISTORTION_COEFFICIENTS, RESOLUTION)
+    undistorter.save(file_path)
+
+    loaded_undistorter = Undistorter(CAMERA_MATRIX, DISTORTION_COEFFICIENTS, RESOLUTION)
+    assert loaded_undistorter.load(file_path)
+    assert numpy.array_equal(undistorter.map1, loaded_undistorter.map1)
+    assert not Undistorter(CAMERA_MATRIX, DISTORTION_COEFFICIENTS * 2, RESOLUTION).load(file_path)
@@ -0,0 +1,202 @@
+import cv2
+import numpy
+import pytest
+
+from design.vision.camera import CameraSettings
+from design.vision.change_detection import is_point_in_window
+from design.vision.constants import ROBOT_HEIGHT
+from design.vision.drawing_zone_detector import DrawingZoneDetector
+from design.vision.exceptions import GameMapNotFound
+from design.vision.frame import Frame
+from design.vision.obstacles_detector import ObstaclesDetector
+from design.vision.rectification import TableRectifier
+from design.vision.robot_detector import RobotDetector
+from design.vision.world_vision import WorldVision
+
+DRAWING_ZONE_PIXELS = [(200, 100), (600, 110), (590, 500), (210, 490)]
+
+
+class FakeCamera:
+    def __init__(self, picture):
+        self.settings = CameraSettings(width=800, height=600)
+        self.picture = picture
+
+    def take_picture(self):
+        yield self.picture
+
+    def take_pictures(self, pictures_number):
+        for _ in range(pictures_number):
+            yield self.picture
+
+
+def create_picture(drawing_zone_pixels):
+    picture = numpy.zeros((600, 800, 3), numpy.uint8)
+    cv2.polylines(picture, [numpy.array(drawing_zone_pixels)], True, (0, 255, 0), 8)
+    return picture
+
+
+def create_world_vision(picture):
+    return WorldVision(1, ObstaclesDetector(), DrawingZoneDetector(), RobotDetector(), FakeCamera(picture))
+
+
+def save_drawing_zone():
+    world_vision = create_world_vision(create_picture(DRAWING_ZONE_PIXELS))
+    world_vision.set_static_items(list(DRAWING_ZONE_PIXELS))
+    world_vision.save_static_items()
+    return world_vision
+
+
+def test_that_given_saved_drawing_zone_when_restore_static_items_then_static_items_are_restored(calibrated_table):
+    saved_world_vision = save_drawing_zone()
+    world_vision = create_world_vision(create_picture(DRAWING_ZONE_PIXELS))
+
+    assert world_vision.restore_static_items()
+    assert DRAWING_ZONE_PIXELS == world_vision.game_map_pixels["drawing_zone"]
+    assert saved_world_vision.rotation_angle_of_table == world_vision.rotation_angle_of_table
+    assert saved_world_vision.game_map_pixels["table_corners"] == world_vision.game_map_pixels["table_corners"]
+
+
+def test_that_given_moved_drawing_zone_when_restore_static_items_then_static_items_are_not_restored(calibrated_table):
+    save_drawing_zone()
+    moved_drawing_zone_pixels = [(x + 60, y + 40) for x, y in DRAWING_ZONE_PIXELS]
+    world_vision = create_world_vision(create_picture(moved_drawing_zone_pixels))
+
+    assert not world_vision.restore_static_items()
+    assert [] == world_vision.game_map_pixels["drawing_zone"]
+
+
+def test_that_given_no_saved_drawing_zone_when_restore_static_items_then_static_items_are_not_restored(
+        calibrated_table):
+    assert not create_world_vision(create_picture(DRAWING_ZONE_PIXELS)).restore_static_items()
+
+
+def test_that_given_static_items_set_again_when_set_static_items_then_table_corners_are_replaced(calibrated_table):
+    world_vision = create_world_vision(create_picture(DRAWING_ZONE_PIXELS))
+    world_vision.set_static_items(list(DRAWING_ZONE_PIXELS))
+    world_vision.set_static_items([(x + 60, y + 40) for x, y in DRAWING_ZONE_PIXELS])
+
+    moved_world_vision = create_world_vision(create_picture(DRAWING_ZONE_PIXELS))
+    moved_world_vision.set_static_items([(x + 60, y + 40) for x, y in DRAWING_ZONE_PIXELS])
+    assert 4 == len(world_vision.game_map_pixels["table_corners"])
+    assert moved_world_vision.game_map_pixels["table_corners"] == world_vision.game_map_pixels["table_corners"]
+
+
+def test_that_given_learned_background_when_search_robot_then_robot_is_searched_in_foreground(calibrated_table,
+                                                                                              monkeypatch):
+    picture = create_picture(DRAWING_ZONE_PIXELS)
+    world_vision = create_world_vision(picture)
+    world_vision.background_model.learn(Frame(picture))
+    moved_picture = picture.copy()
+    cv2.circle(moved_picture, (400, 300), 40, (255, 0, 255), -1)
+    searched_windows = []
+
+    def detect_robot_in_window(frame, window):
+        searched_windows.append(window)
+        return [(400, 300), 0.0]
+
+    monkeypatch.setattr(world_vision.robot_detector, 'detect_robot_in_window', detect_robot_in_window)
+    monkeypatch.setattr(world_vision.robot_detector, 'detect_robot', lambda frame: pytest.fail('full detection'))
+
+    assert [(400, 300), 0.0] == world_vision.search_robot(Frame(moved_picture), 0)
+    assert 1 == len(searched_windows)
+    assert is_point_in_window((400, 300), searched_windows[0])
+
+
+def create_located_table_world_vision(picture):
+    world_vision = create_world_vision(picture)
+    world_vision.converter.set_origin(0, -150)
+    world_vision.robot_table_rectifier = TableRectifier(world_vision.converter, ROBOT_HEIGHT)
+    markers = world_vision.converter.get_image_coordinates_translated_array([(100, 50), (110, 50), (105, 59.7)],
+                                                                            ROBOT_HEIGHT)
+    for marker in markers:
+        cv2.circle(picture, tuple(int(round(coordinate)) for coordinate in marker), 12, (255, 0, 255), -1)
+    return world_vision, markers
+
+
+def test_that_given_located_table_when_detect_robot_then_robot_is_found_on_rectified_table(calibrated_table):
+    picture = numpy.full((1200, 1600, 3), 90, numpy.uint8)
+    world_vision, markers = create_located_table_world_vision(picture)
+
+    position, orientation = world_vision.detect_robot(Frame(picture))
+
+    assert numpy.allclose(markers.mean(axis=0), position, atol=2)
+    assert numpy.allclose(markers, world_vision.robot_detector.circles_coordinates, atol=2)
+    _, expected_orientation = RobotDetector().detect_robot(Frame(picture))
+    assert abs(orientation - expected_orientation) < 2
+
+
+def test_that_given_located_table_when_detect_robot_in_window_or_track_then_robot_is_found_like_on_whole_table(
+        calibrated_table):
+    picture = numpy.full((1200, 1600, 3), 90, numpy.uint8)
+    world_vision, _ = create_located_table_world_vision(picture)
+    frame = Frame(picture)
+    position, orientation = world_vision.detect_robot(frame)
+
+    window_position, window_orientation = world_vision.detect_robot_in_window(frame, (650, 700, 850, 950))
+    world_vision.robot_markers_tracker.seed(frame, world_vision.robot_detector.circles_coordinates)
+    tracked_position, tracked_orientation = world_vision.track_robot(frame)
+
+    assert position == window_position == tracked_position
+    assert abs(orientation - window_orientation) < 0.5
+    assert abs(orientation - tracked_orientation) < 0.5
+
+
+class FakeMarkersTracker:
+    is_tracking = True
+
+    def __init__(self, robot_information):
+        self.robot_information = robot_information
+
+    def track(self, frame):
+        return self.robot_information
+
+
+class FailingMarkersTracker:
+    is_tracking = True
+
+    def track(self, frame):
+        raise ValueError()
+
+
+def create_detected_world_vision(monkeypatch):
+    picture = create_picture(DRAWING_ZONE_PIXELS)
+    cv2.circle(picture, (250, 250), 40, (255, 0, 255), -1)
+    world_vision = create_world_vision(picture)
+    monkeypatch.setattr(world_vision.obstacles_detector, 'calculate_obstacles_information',
+                        lambda frame: [[(600, 400), 'O']])
+    monkeypatch.setattr(world_vision.robot_detector, 'detect_robot', lambda frame: [(250, 250), 0.0])
+    world_vision.detect_game_items()
+    return world_vision
+
+
+def test_that_given_detected_game_items_when_refresh_game_items_then_support_is_the_refreshing_capture(
+        calibrated_table, monkeypatch):
+    world_vision = create_detected_world_vision(monkeypatch)
+    world_vision.robot_markers_tracker = FakeMarkersTracker([(250, 250), 0.0])
+
+    world_vision.detect_game_items()
+
+    assert {"drawing_zone": 0, "obstacles": 1, "robot": 1} == world_vision.consensus_support
+
+
+def test_that_given_failing_detector_when_refresh_game_items_then_game_map_is_not_found(
+        calibrated_table, monkeypatch):
+    world_vision = create_detected_world_vision(monkeypatch)
+    world_vision.robot_markers_tracker = FailingMarkersTracker()
+
+    with pytest.raises(GameMapNotFound):
+        world_vision.detect_game_items()
+
+
+def test_that_given_robot_leaving_learned_position_when_track_robot_then_no_ghost_stays_in_background(
+        calibrated_table, monkeypatch):
+    world_vision = create_detected_world_vision(monkeypatch)
+
+    moved_picture = create_picture(DRAWING_ZONE_PIXELS)
+    cv2.circle(moved_picture, (450, 350), 40, (255, 0, 255), -1)
+    world_vision.robot_markers_tracker = FakeMarkersTracker([(450, 350), 0.0])
+    world_vision.track_robot(Frame(moved_picture))
+
+    windows = world_vision.background_model.find_foreground_windows(Frame(moved_picture))
+    assert 1 == len(windows)
+    assert is_point_in_window((450, 350), windows[0])